@@ -6,6 +6,17 @@ import os
 import Car_Insurance
 import Health_Insurance
 import Home_Insurance
+from Health_Insurance.compact import compact_path, load_mapped
+from Insurance_Core.registry import registry
+from Insurance_Core.scheduler import scheduler
+
+# Load whatever models exist once per process, later reruns of this script hit the registry cache. Health quotes map
+# the compact forest, the pickled pipeline is only loaded if that file is missing or stale.
+registry.warm({
+    compact_path("Health_Insurance/random_forest.pkl"): load_mapped,
+    "Home_Insurance/Linear_Regression.pkl": None,
+    "Home_Insurance/Feature_names.pkl": None,
+})
 
 st.set_page_config(
     page_title="Insurance Premium Predictor",
@@ -72,20 +83,24 @@ elif pills == "Home Insurance":
                 "YearBuilt" : Year_Built
             }
 
+            # Never train inside the request: a missing model is fitted by the background scheduler and swapped in
+            # atomically, the registry picks it up on a later submit
+            scheduler.ensure(["home"])
             model_exists = os.path.exists("Home_Insurance/Linear_Regression.pkl")
             features_exists = os.path.exists("Home_Insurance/Feature_names.pkl")
 
-            if model_exists and features_exists:
-                pass
+            # a failed fit is not resubmitted by ensure, show why instead of waiting for it forever
+            error = scheduler.last_error("home")
+
+            if not (model_exists and features_exists) and error is not None:
+                st.error(f"Training the home model failed: {error}")
+            elif not (model_exists and features_exists):
+                st.info("The home model is being trained in the background, please try again in a moment.")
             else:
-                x = Home_Insurance.Risk_factor.data("Home_Insurance/dataset.csv")
-                x.preprocess()
-                x.train()
-                x.save()
-            premium = Home_Insurance.Predict("Home_Insurance/Linear_Regression.pkl","Home_Insurance/Feature_names.pkl")
-            val = premium.predict_price(home_features)
+                premium = Home_Insurance.Predict("Home_Insurance/Linear_Regression.pkl","Home_Insurance/Feature_names.pkl")
+                val = premium.predict_price(home_features)
 
-            st.success(f"Estimated Home Insurance Premium: **${val:,.2f}**")
+                st.success(f"Estimated Home Insurance Premium: **${val:,.2f}**")
 
 elif pills == "Health Insurance":
     st.header("🩺 Health Insurance – Premium Prediction")
@@ -100,7 +115,9 @@ elif pills == "Health Insurance":
 
         submitted = st.form_submit_button("Predict Health Premium")
 
-        if submitted:
+        if submitted and not os.path.exists("Health_Insurance/random_forest.pkl"):
+            st.error("Health model not trained yet, run `python -m Health_Insurance.training` first.")
+        elif submitted:
             premium = Health_Insurance.result(age = age, sex = sex.lower(), bmi = bmi, children = num_children, smoker = smoker.lower(), region = region.lower())
             val = premium.predict() / 12
             val = float(val[0])
@@ -4,12 +4,14 @@ Provides functionality to compute car insurance risk factors and final premium e
 """
 
 from .training import CarInsurance, result
+from .predictor import CarPredictor
 from .preprocessing import (
     age_factor,
     mileage_factor,
     car_age_factor,
     experience_factor,
     accident_factor,
-    combined_factors
+    combined_factors,
+    combined_factors_batch
 )
 
@@ -1,2 +1,5 @@
 class InvalidInputError(Exception):
-    pass
\ No newline at end of file
+    """ Raised for bad pricing inputs. Batch functions also set `rows` to the offending row indices. """
+    def __init__(self, message="", rows=None):
+        super().__init__(message)
+        self.rows = rows
@@ -0,0 +1,42 @@
+"""
+predictor.py
+----------------------------------------
+`CarPredictor` is the shareable form of `CarInsurance`: immutable, safe to call from many threads and taking whole
+records, so the quoting code can keep one instance per base cost instead of building a CarInsurance per quote.
+Batches go through the vectorized rating tables, whose gathers and products run without the GIL.
+"""
+import numpy as np
+
+from . import preprocessing
+from .training import CarInsurance
+
+INPUTS = ("age", "annual_km", "car_age", "exp_years", "num_accidents")
+
+
+class CarPredictor:
+    """ Immutable, thread-safe car pricer. Same premiums and errors as CarInsurance. """
+    __slots__ = ("base_cost", "_model")
+
+    def __init__(self, base_cost=493.74225):
+        object.__setattr__(self, "_model", CarInsurance(base_cost))
+        object.__setattr__(self, "base_cost", self._model.base_cost)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"CarPredictor(base_cost={self.base_cost})"
+
+    def predict_one(self, record):
+        """ Premium for one record dict with age, annual_km, car_age, exp_years, num_accidents and vehicle_type. """
+        return self._model.final_premium(*(record.get(name) for name in INPUTS), record.get("vehicle_type"))
+
+    def predict_batch(self, records):
+        """ Premiums for a DataFrame, a dict of columns or a list of record dicts. """
+        if not (isinstance(records, dict) or hasattr(records, "columns")):
+            records = list(records)
+            records = {name: np.array([r.get(name) for r in records], dtype=object)
+                       for name in INPUTS + ("vehicle_type",)}
+        columns = preprocessing._frame_columns(records, INPUTS)
+        vehicle_type = records["vehicle_type"] if "vehicle_type" in records else None
+        return self._model.final_premium_batch(*columns, vehicle_type=vehicle_type)
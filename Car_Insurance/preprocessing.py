@@ -3,7 +3,32 @@ preprocessing.py
 ----------------------------------------
 This model is used to calculate the individual risk factors used in the car insurance pricing system. The multipliers are used to estimate overall customer risk, which affects the final premium.
 """
+import numbers
+
+import numpy as np
+
 from .exceptions import InvalidInputError
+from .rating_table import RatingTable
+
+# input -> (label, message for negative values), shared by the scalar and batch checks
+CHECKS = {
+    "age": ("Age", "Age cannot be negative."),
+    "annual_km": ("Mileage", "Mileage cannot be negative."),
+    "car_age": ("Car age", "Car age cannot be negative."),
+    "exp_years": ("Experience", "Experience cannot be negative."),
+    "num_accidents": ("Accidents", "Accident count cannot be negative."),
+}
+
+
+def _check_value(value, name):
+    """ Raises InvalidInputError unless `value` is a non-negative int or float. """
+    label, negative_msg = CHECKS[name]
+    if value is None or not isinstance(value, (int, float)):
+        raise InvalidInputError(f"{label} must be numeric.")
+    if value < 0:
+        raise InvalidInputError(negative_msg)
+
+
 # Real Age Multipliers
 Age_Multipliers = {
     18: 1.018341, 19: 1.016126, 20: 1.016307, 21: 1.017236, 22: 1.014096,
@@ -17,12 +42,10 @@ Age_Multipliers = {
     58: 0.991267, 59: 0.988257, 60: 0.989355, 61: 0.987712, 62: 0.984591,
     63: 0.986329, 64: 0.988128, 65: 0.988006
 }
+Age_Table = RatingTable(Age_Multipliers, default=1.0)
 def age_factor(age):
-    if age is None or not isinstance(age,(int,float)):
-        raise InvalidInputError("Age must be numeric.")
-    if age < 0:
-        raise InvalidInputError("Age cannot be negative.")
-    return Age_Multipliers.get(age, 1.0)
+    _check_value(age, "age")
+    return Age_Table.lookup(age)
 
 # Real Mileage Multiplers
 Annual_Mileage_Multipliers = {
@@ -30,13 +53,11 @@ Annual_Mileage_Multipliers = {
     16: 0.999642, 17: 1.000345, 18: 1.000652, 19: 1.000291, 20: 0.999599,
     21: 0.999225, 22: 0.998437, 23: 1.000596, 24: 1.000745, 25: 1.001651
 }
+Mileage_Table = RatingTable(Annual_Mileage_Multipliers, default=1.0)
 def mileage_factor(annual_km):
-    if annual_km is None or not isinstance(annual_km, (int, float)):
-        raise InvalidInputError("Mileage must be numeric.")
-    if annual_km < 0:
-        raise InvalidInputError("Mileage cannot be negative.")
+    _check_value(annual_km, "annual_km")
     key = int(round(annual_km / 1000))
-    return Annual_Mileage_Multipliers.get(key, 1.0)
+    return Mileage_Table.lookup(key)
 
 # Car Multiplier multiplier
 Car_Age_Multiplier = {
@@ -50,12 +71,10 @@ Car_Age_Multiplier = {
     28: 1.001361, 29: 0.999855, 30: 1.001280, 31: 1.001400,
     32: 1.003001, 33: 1.003452, 34: 1.006315, 35: 1.005208
 }
+Car_Age_Table = RatingTable(Car_Age_Multiplier, default=1.0)
 def car_age_factor(car_age):
-    if car_age is None or not isinstance(car_age, (int, float)):
-        raise InvalidInputError("Car age must be numeric.")
-    if car_age < 0:
-        raise InvalidInputError("Car age cannot be negative.")
-    return Car_Age_Multiplier.get(car_age, 1.0)
+    _check_value(car_age, "car_age")
+    return Car_Age_Table.lookup(car_age)
 
 # Experience Multipler multiplier
 Experience_Multiplier = {
@@ -69,12 +88,10 @@ Experience_Multiplier = {
     35: 0.978301, 36: 0.980407, 37: 0.979585, 38: 0.979205, 39: 0.973556,
     40: 0.979256
 }
+Experience_Table = RatingTable(Experience_Multiplier, default=1.0)
 def experience_factor(year_driving):
-    if year_driving is None or not isinstance(year_driving, (int, float)):
-        raise InvalidInputError("Experience must be numeric.")
-    if year_driving < 0:
-        raise InvalidInputError("Experience cannot be negative.")
-    return Experience_Multiplier.get(year_driving, 1.0)
+    _check_value(year_driving, "exp_years")
+    return Experience_Table.lookup(year_driving)
 
 # Accident Multiplier
 Accident_Multiplier = {
@@ -82,12 +99,10 @@ Accident_Multiplier = {
     2: 0.997017, 3: 1.001607,
     4: 1.003906, 5: 1.007272
 }
+Accident_Table = RatingTable(Accident_Multiplier, default=1.0)
 def accident_factor(num_accidents):
-    if num_accidents is None or not isinstance(num_accidents, (int, float)):
-        raise InvalidInputError("Accidents must be numeric.")
-    if num_accidents < 0:
-        raise InvalidInputError("Accident count cannot be negative.")
-    return Accident_Multiplier.get(num_accidents, 1.0)
+    _check_value(num_accidents, "num_accidents")
+    return Accident_Table.lookup(num_accidents)
 
 # Total combined risks
 def combined_factors(age, annual_km, car_age, year_driving, num_accidents):
@@ -103,4 +118,102 @@ def combined_factors(age, annual_km, car_age, year_driving, num_accidents):
         return a * mil * c * exp * aci
     except InvalidInputError as e:
         raise InvalidInputError(f"Invalid data passed to combined_factors: {e}")
-    
\ No newline at end of file
+    
+
+# Batch (vectorized) versions of the factors above
+def _as_float_column(values, n=None):
+    """
+    Converts one input column to a float64 array. Returns the array and a mask of the rows that would fail the
+    scalar `isinstance(value, (int, float))` check.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "US" and not isinstance(values, np.ndarray):
+        # mixed lists like [1, "x"] are coerced to strings by numpy, keep the original objects instead
+        arr = np.asarray(values, dtype=object)
+    if arr.ndim == 0:
+        arr = np.full(1 if n is None else n, arr.item(), dtype=arr.dtype)
+    arr = arr.ravel()
+    if arr.dtype.kind in "biuf":
+        return arr.astype(np.float64, copy=False), np.zeros(len(arr), dtype=bool)
+
+    bad = np.fromiter(
+        (v is None or not isinstance(v, numbers.Real) for v in arr),
+        dtype=bool,
+        count=len(arr),
+    )
+    out = np.full(len(arr), np.nan)
+    out[~bad] = arr[~bad].astype(np.float64)
+    return out, bad
+
+
+def _format_rows(rows, limit=10):
+    shown = ", ".join(str(r) for r in rows[:limit])
+    if len(rows) > limit:
+        shown += f", ... ({len(rows)} rows)"
+    return f"[{shown}]"
+
+
+def _check_column(values, name, n):
+    """
+    Batch form of _check_value: the float64 column for input `name`, the error messages and the arrays of bad rows.
+    Raises InvalidInputError only when the column length differs from `n`.
+    """
+    label, negative_msg = CHECKS[name]
+    arr, non_numeric = _as_float_column(values, n)
+    if len(arr) != n:
+        raise InvalidInputError("All input columns must have the same length.")
+    if name == "annual_km":
+        # int(round(nan)) / int(round(inf)) cannot be priced by the scalar path either
+        non_numeric |= ~np.isfinite(arr)
+    negative = ~non_numeric & (arr < 0)
+    errors, bad_rows = [], []
+    for mask, msg in ((non_numeric, f"{label} must be numeric."), (negative, negative_msg)):
+        rows = np.flatnonzero(mask)
+        if len(rows):
+            errors.append(f"{msg} Rows: {_format_rows(rows)}")
+            bad_rows.append(rows)
+    return arr, errors, bad_rows
+
+
+def _frame_columns(frame, names):
+    """ Pulls the named columns out of a DataFrame (or dict of arrays). """
+    try:
+        return [frame[name] for name in names]
+    except KeyError as e:
+        raise InvalidInputError(f"Missing input column: {e}")
+
+
+def combined_factors_batch(age, annual_km=None, car_age=None, year_driving=None, num_accidents=None):
+    """
+    Vectorized combined_factors. Takes equal length arrays (or a DataFrame with the columns age, annual_km, car_age,
+    exp_years and num_accidents) and returns a float64 array of risk scores. Instead of stopping at the first bad
+    value, every invalid row is collected and reported in a single InvalidInputError (see `InvalidInputError.rows`).
+    """
+    if annual_km is None and car_age is None and year_driving is None and num_accidents is None:
+        age, annual_km, car_age, year_driving, num_accidents = _frame_columns(
+            age, ["age", "annual_km", "car_age", "exp_years", "num_accidents"]
+        )
+
+    columns = [age, annual_km, car_age, year_driving, num_accidents]
+    n = max(np.size(c) for c in columns)
+
+    values, errors, bad_rows = [], [], []
+    for column, name in zip(columns, CHECKS):
+        arr, messages, rows = _check_column(column, name, n)
+        values.append(arr)
+        errors += messages
+        bad_rows += rows
+
+    if errors:
+        rows = np.unique(np.concatenate(bad_rows))
+        raise InvalidInputError(
+            "Invalid data passed to combined_factors_batch: " + " ".join(errors), rows=rows
+        )
+
+    age, annual_km, car_age, year_driving, num_accidents = values
+    a = Age_Table.gather(age)
+    mil = Mileage_Table.gather(np.rint(annual_km / 1000))
+    c = Car_Age_Table.gather(car_age)
+    exp = Experience_Table.gather(year_driving)
+    aci = Accident_Table.gather(num_accidents)
+    return a * mil * c * exp * aci
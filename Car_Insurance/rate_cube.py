@@ -0,0 +1,280 @@
+"""
+rate_cube.py
+----------------------------------------
+The car rating inputs are small and discrete, so every premium CarInsurance.final_premium can return from the
+multiplier tables is precomputed into one binary "rate cube" on disk. The cube is loaded with np.memmap, so all worker
+processes on a host share a single page-cache copy, and a quote becomes one index computation.
+
+File layout: 8 byte magic, 4 byte little-endian header length, JSON header, then (page aligned) the premiums as int32
+cents in C order over the axes [vehicle_type, age, mileage, car_age, exp_years, num_accidents]. The header carries a
+checksum of the multiplier tables and base_cost, and load_rate_cube() rebuilds the file when it no longer matches.
+
+Build from the command line with `python -m Car_Insurance.rate_cube`.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from . import preprocessing
+from .exceptions import InvalidInputError
+from .rating_table import RatingTable
+from .training import CarInsurance, _round2
+
+MAGIC = b"CARCUBE1"
+FORMAT_VERSION = 1
+DATA_ALIGNMENT = 4096
+DEFAULT_BASE_COST = 493.74225
+DEFAULT_PATH = os.environ.get(
+    "CAR_RATE_CUBE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_cube.bin")
+)
+
+# Axis order of the cube after the vehicle type axis
+AXES = [
+    ("age", preprocessing.Age_Table),
+    ("mileage", preprocessing.Mileage_Table),
+    ("car_age", preprocessing.Car_Age_Table),
+    ("exp_years", preprocessing.Experience_Table),
+    ("num_accidents", preprocessing.Accident_Table),
+]
+
+
+def tables_checksum(base_cost=DEFAULT_BASE_COST):
+    """ sha256 over every multiplier, the vehicle type multipliers and base_cost. """
+    source = {
+        "version": FORMAT_VERSION,
+        "base_cost": repr(float(base_cost)),
+        "age": sorted(preprocessing.Age_Multipliers.items()),
+        "mileage": sorted(preprocessing.Annual_Mileage_Multipliers.items()),
+        "car_age": sorted(preprocessing.Car_Age_Multiplier.items()),
+        "exp_years": sorted(preprocessing.Experience_Multiplier.items()),
+        "num_accidents": sorted(preprocessing.Accident_Multiplier.items()),
+        "vehicle_type": sorted(CarInsurance.Vehicle_Type_Multipliers.items()),
+    }
+    blob = json.dumps(source, default=repr, separators=(",", ":")).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _source_tables():
+    """ Recompiles the tables from the dicts so the cube follows any edit to a multiplier. """
+    return [RatingTable(table, default=1.0) for table in (
+        preprocessing.Age_Multipliers,
+        preprocessing.Annual_Mileage_Multipliers,
+        preprocessing.Car_Age_Multiplier,
+        preprocessing.Experience_Multiplier,
+        preprocessing.Accident_Multiplier,
+    )]
+
+
+def build_rate_cube(path=DEFAULT_PATH, base_cost=DEFAULT_BASE_COST):
+    """
+    Materializes every premium into a rate cube at `path`. The file is written next to the target and moved into
+    place with os.replace, so readers never see a partial cube.
+    """
+    model = CarInsurance(base_cost)
+    tables = _source_tables()
+    vehicle_types = list(CarInsurance.Vehicle_Type_Multipliers)
+    shape = [len(vehicle_types)] + [len(t) for t in tables]
+
+    header = {
+        "version": FORMAT_VERSION,
+        "checksum": tables_checksum(base_cost),
+        "base_cost": float(base_cost),
+        "dtype": "<i4",
+        "scale": 100,
+        "shape": shape,
+        "vehicle_types": vehicle_types,
+        "axes": [{"name": name, "offset": t.offset, "size": len(t)} for (name, _), t in zip(AXES, tables)],
+    }
+    blob = json.dumps(header).encode()
+    data_offset = -(-(len(MAGIC) + 4 + len(blob)) // DATA_ALIGNMENT) * DATA_ALIGNMENT
+
+    # Same multiplication order as combined_factors / total_risk / final_premium, so every cell is bit-identical
+    a, mil, c, exp, aci = (t.values for t in tables)
+    risk = (a[:, None, None, None, None] * mil[None, :, None, None, None]) * c[None, None, :, None, None]
+    risk = risk * exp[None, None, None, :, None]
+    risk = risk * aci[None, None, None, None, :]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".rate_cube.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+            f.write(b"\0" * (data_offset - f.tell()))
+            for vehicle_type in vehicle_types:
+                type_risk = model.vehicle_type_factor(vehicle_type)
+                premium = model.base_cost * (type_risk * risk)
+                cents = np.rint(_round2(premium.ravel()) * 100).astype("<i4")
+                f.write(cents.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_header(path):
+    """ Returns (header dict, data offset) or None when the file is missing or not a rate cube. """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+    data_offset = -(-(len(MAGIC) + 4 + length) // DATA_ALIGNMENT) * DATA_ALIGNMENT
+    return header, data_offset
+
+
+class RateCube:
+    """ Memory-mapped rate cube. Inputs outside the tables fall back to CarInsurance.final_premium. """
+
+    def __init__(self, path):
+        found = read_header(path)
+        if found is None:
+            raise InvalidInputError(f"Not a rate cube: {path}")
+        self.header, offset = found
+        self.path = path
+        self.checksum = self.header["checksum"]
+        self.base_cost = self.header["base_cost"]
+        self.scale = self.header["scale"]
+        self.cents = np.memmap(path, dtype=self.header["dtype"], mode="r", offset=offset,
+                               shape=tuple(self.header["shape"]))
+        # plain ndarray view of the mapping, item access on np.memmap itself is several times slower
+        self.flat = np.asarray(self.cents).reshape(-1)
+
+        self.offsets = [axis["offset"] for axis in self.header["axes"]]
+        self.sizes = [axis["size"] for axis in self.header["axes"]]
+        self.strides = [int(np.prod(self.header["shape"][i + 1:])) for i in range(len(self.header["shape"]))]
+        self.vehicle_index = {name: i for i, name in enumerate(self.header["vehicle_types"])}
+        self._axes = list(zip(self.offsets, self.sizes, self.strides[1:]))
+        self._fallback = CarInsurance(self.base_cost)
+
+    def __repr__(self):
+        return f"RateCube(path={self.path!r}, shape={tuple(self.header['shape'])})"
+
+    def _scalar_index(self, age, annual_km, car_age, exp_years, num_accidents, vehicle_type):
+        if not isinstance(vehicle_type, str):
+            return None
+        v = self.vehicle_index.get(vehicle_type.lower())
+        if v is None:
+            return None
+        if not isinstance(annual_km, (int, float)) or not 0 <= annual_km < math.inf:
+            return None
+        keys = (age, int(round(annual_km / 1000)), car_age, exp_years, num_accidents)
+
+        flat = v * self.strides[0]
+        for key, (offset, size, stride) in zip(keys, self._axes):
+            if not isinstance(key, (int, float)):
+                return None
+            i = key - offset
+            if not 0 <= i < size:
+                return None
+            j = int(i)
+            if j != i:
+                return None
+            flat += j * stride
+        return flat
+
+    def quote(self, age, annual_km, car_age, exp_years, num_accidents, vehicle_type=None):
+        """ Same result as CarInsurance(base_cost).final_premium(...). """
+        flat = self._scalar_index(age, annual_km, car_age, exp_years, num_accidents, vehicle_type)
+        if flat is None:
+            return self._fallback.final_premium(age, annual_km, car_age, exp_years, num_accidents, vehicle_type)
+        return self.flat.item(flat) / self.scale
+
+    def quote_batch(self, age, annual_km=None, car_age=None, exp_years=None, num_accidents=None, vehicle_type=None):
+        """ Same result as CarInsurance(base_cost).final_premium_batch(...). """
+        if annual_km is None and car_age is None and exp_years is None and num_accidents is None:
+            frame = age
+            vehicle_type = frame["vehicle_type"] if "vehicle_type" in frame else None
+            age, annual_km, car_age, exp_years, num_accidents = preprocessing._frame_columns(
+                frame, ["age", "annual_km", "car_age", "exp_years", "num_accidents"]
+            )
+        raw = (age, annual_km, car_age, exp_years, num_accidents)
+        n = max(np.size(c) for c in raw)
+
+        columns = []
+        for column in raw:
+            arr, non_numeric = preprocessing._as_float_column(column, n)
+            if len(arr) != n or non_numeric.any():
+                # Let the validating path produce the error message and row indices
+                return self._fallback.final_premium_batch(*raw, vehicle_type)
+            columns.append(arr)
+
+        with np.errstate(invalid="ignore", over="ignore"):
+            columns[1] = np.rint(columns[1] / 1000)
+        flat = self._vehicle_codes(vehicle_type, n) * self.strides[0]
+        hit = flat >= 0
+        for arr, offset, size, stride in zip(columns, self.offsets, self.sizes, self.strides[1:]):
+            i = arr - offset
+            hit &= (i >= 0) & (i < size) & (i == np.floor(i))
+            flat += np.where(hit, i, 0).astype(np.int64) * stride
+
+        premium = np.empty(n)
+        premium[hit] = self.flat[flat[hit]] / self.scale
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            subset = [np.asarray(c).ravel()[miss] if np.size(c) == n else c for c in raw]
+            vt = vehicle_type
+            if vt is not None and np.size(vt) == n:
+                vt = np.asarray(vt, dtype=object).ravel()[miss]
+            try:
+                premium[miss] = self._fallback.final_premium_batch(*subset, vt)
+            except InvalidInputError as e:
+                rows = miss[e.rows] if e.rows is not None else None
+                raise InvalidInputError(str(e), rows=rows)
+        return premium
+
+    def _vehicle_codes(self, vehicle_type, n):
+        """ Index along the vehicle type axis, -1 where the row has to take the fallback path. """
+        if vehicle_type is None:
+            return np.full(n, -1, dtype=np.int64)
+        arr = np.asarray(vehicle_type, dtype=object).ravel()
+        if arr.size == 1 and n != 1:
+            arr = np.full(n, arr[0], dtype=object)
+        codes = {
+            value: self.vehicle_index.get(value.lower(), -1) if isinstance(value, str) else -1
+            for value in dict.fromkeys(arr.tolist())
+        }
+        return np.fromiter(map(codes.__getitem__, arr.tolist()), dtype=np.int64, count=len(arr))
+
+
+def load_rate_cube(path=DEFAULT_PATH, base_cost=DEFAULT_BASE_COST, rebuild=True):
+    """
+    Opens the rate cube at `path`. When the file is missing, or its checksum no longer matches the multiplier tables
+    and base_cost, it is rebuilt first (or InvalidInputError is raised when rebuild=False).
+    """
+    found = read_header(path)
+    if found is None or found[0].get("checksum") != tables_checksum(base_cost):
+        if not rebuild:
+            raise InvalidInputError(f"Rate cube at {path} is missing or out of date.")
+        build_rate_cube(path, base_cost)
+    return RateCube(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed car insurance rate cube.")
+    parser.add_argument("--output", default=DEFAULT_PATH, help="where to write the cube")
+    parser.add_argument("--base-cost", type=float, default=DEFAULT_BASE_COST)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the checksum matches")
+    args = parser.parse_args(argv)
+
+    found = read_header(args.output)
+    if args.force or found is None or found[0].get("checksum") != tables_checksum(args.base_cost):
+        build_rate_cube(args.output, args.base_cost)
+        print(f"Built rate cube at {args.output}")
+    else:
+        print(f"Rate cube at {args.output} is up to date")
+
+
+if __name__ == "__main__":
+    main()
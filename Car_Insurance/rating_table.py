@@ -0,0 +1,64 @@
+"""
+rating_table.py
+----------------------------------------
+Compiles an integer keyed multiplier dict (like Age_Multipliers) into a dense float64 array indexed by
+`key - offset`, with an explicit default for every key outside the table. Scalars are looked up with one integer
+index and arrays with a single fancy-index gather, so no hashing happens on the pricing path.
+"""
+import numpy as np
+
+
+class RatingTable:
+    """ Dense, read-only version of a {int key: multiplier} dict. """
+
+    def __init__(self, mapping, default=1.0):
+        if not mapping:
+            raise ValueError("Cannot compile an empty rating table.")
+        if any(isinstance(k, bool) or not isinstance(k, int) for k in mapping):
+            raise TypeError("Rating table keys must be integers.")
+
+        self.offset = min(mapping)
+        self.size = max(mapping) - self.offset + 1
+        self.default = float(default)
+
+        # One extra slot at the end holds the default, misses are pointed there by gather()
+        padded = np.full(self.size + 1, self.default, dtype=np.float64)
+        for key, value in mapping.items():
+            padded[key - self.offset] = value
+        padded.flags.writeable = False
+
+        self._padded = padded
+        self.values = padded[:-1]
+        self._list = self.values.tolist()
+
+    @classmethod
+    def from_values(cls, values, offset, default=1.0):
+        """ The table whose `values` are the multipliers for keys offset, offset + 1, ... (as exported). """
+        return cls({offset + i: v for i, v in enumerate(np.asarray(values, dtype=np.float64).tolist())}, default)
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"RatingTable(keys={self.offset}..{self.offset + self.size - 1}, default={self.default})"
+
+    def lookup(self, key):
+        """ Scalar lookup, same result as `mapping.get(key, default)` for int and float keys. """
+        i = key - self.offset
+        if 0 <= i < self.size:
+            j = int(i)
+            if j == i:
+                return self._list[j]
+        return self.default
+
+    def gather(self, keys):
+        """ Vectorized lookup for an array of keys. Non-integer and out of range keys give the default. """
+        keys = np.asarray(keys)
+        if keys.dtype.kind in "iu":
+            idx = keys.astype(np.intp) - self.offset
+            hit = (idx >= 0) & (idx < self.size)
+        else:
+            shifted = keys - self.offset
+            hit = (shifted >= 0) & (shifted < self.size) & (shifted == np.floor(shifted))
+            idx = np.where(hit, shifted, 0).astype(np.intp)
+        return self._padded[np.where(hit, idx, self.size)]
@@ -3,9 +3,63 @@ training.py
 ------------------------------------
 This module calculates the final car insurance premium by combining all the risk factors present in preprocessing.py. Here we can notice inheritance -> CarInsurance extends the parent class Insurance.
 """
+import numpy as np
+
+from Insurance_Core import metrics
+
 from . import preprocessing
 from .exceptions import InvalidInputError
 
+
+def _round2(values):
+    """
+    Vectorized `round(value, 2)`. np.round scales by 100 first, which can land on the wrong side of a tie, so values
+    sitting within a few ulps of a half cent are rounded with Python's round() to stay identical to final_premium.
+    """
+    scaled = values * 100.0
+    out = np.rint(scaled) / 100.0
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 8 * np.finfo(np.float64).eps * np.abs(scaled)
+    for i in np.flatnonzero(tie):
+        out[i] = round(float(values[i]), 2)
+    return out
+
+
+def _vehicle_factor(vehicle_type, multipliers, default=1.0):
+    """ Multiplier for one vehicle type, case-insensitive. None gives 1.0, unknown types `default`. """
+    if vehicle_type is None:
+        return 1.0
+    if not isinstance(vehicle_type, str):
+        raise InvalidInputError("Vehicle type must be a string.")
+    return multipliers.get(vehicle_type.lower(), default)
+
+
+def _vehicle_factors(vehicle_type, n, multipliers, default=1.0):
+    """ Vectorized _vehicle_factor. None (or a None entry) gives 1.0, non-string entries are reported by row. """
+    if vehicle_type is None:
+        return np.ones(n)
+    arr = np.asarray(vehicle_type, dtype=object).ravel()
+    if arr.size == 1 and n != 1:
+        arr = np.full(n, arr[0], dtype=object)
+    if len(arr) != n:
+        raise InvalidInputError("All input columns must have the same length.")
+
+    # Only the distinct values go through the scalar rules
+    factors = {}
+    for value in dict.fromkeys(arr.tolist()):
+        try:
+            factors[value] = _vehicle_factor(value, multipliers, default)
+        except InvalidInputError:
+            factors[value] = np.nan
+
+    out = np.fromiter(map(factors.__getitem__, arr.tolist()), dtype=np.float64, count=n)
+    bad = np.flatnonzero(np.isnan(out))
+    if len(bad):
+        raise InvalidInputError(
+            f"Vehicle type must be a string. Rows: {preprocessing._format_rows(bad)}", rows=bad
+        )
+    return out
+
+
 class Insurance:
     """ Parent class storing the base_cost. """
     def __init__(self, base_cost=493.74225):
@@ -31,13 +85,12 @@ class CarInsurance(Insurance):
 
     def vehicle_type_factor(self, vehicle_type):
         """Return vehicle type multiplier."""
-        if vehicle_type is None:
-            return 1.0
-        if not isinstance(vehicle_type, str):
-            raise InvalidInputError("Vehicle type must be a string.")
-            
-        return self.Vehicle_Type_Multipliers.get(vehicle_type.lower(), 1.0)
+        return _vehicle_factor(vehicle_type, self.Vehicle_Type_Multipliers)
     
+    def vehicle_type_factor_batch(self, vehicle_type, n):
+        """Vectorized vehicle_type_factor. None (or a None entry) gives 1.0, non-string entries are reported by row."""
+        return _vehicle_factors(vehicle_type, n, self.Vehicle_Type_Multipliers)
+
     def total_risk(self,age,annual_km,car_age,year_driving,num_accidents,vehicle_type=None,):
         """ Combining all risk factors. """
         try:
@@ -50,13 +103,51 @@ class CarInsurance(Insurance):
     
     def final_premium(self,age,annual_km,car_age,exp_years,num_accidents,vehicle_type=None,):
         """ base premium × combined risk """
-        risk = self.total_risk(age, annual_km, car_age, exp_years, num_accidents, vehicle_type)
-        premium = round(self.base_cost * risk, 2)
+        with metrics.timed("car.final_premium"):
+            risk = self.total_risk(age, annual_km, car_age, exp_years, num_accidents, vehicle_type)
+            premium = round(self.base_cost * risk, 2)
 
         if premium < 0:
             raise InvalidInputError("Final premium cannot be negative.")
         return premium
     
+    def final_premium_batch(self,age,annual_km=None,car_age=None,exp_years=None,num_accidents=None,vehicle_type=None,):
+        """
+        Vectorized final_premium. Takes equal length arrays, or a DataFrame with the columns age, annual_km, car_age,
+        exp_years, num_accidents and (optionally) vehicle_type, and returns an array of premiums identical to calling
+        final_premium row by row.
+        """
+        if annual_km is None and car_age is None and exp_years is None and num_accidents is None:
+            frame = age
+            vehicle_type = frame["vehicle_type"] if "vehicle_type" in frame else None
+            age, annual_km, car_age, exp_years, num_accidents = preprocessing._frame_columns(
+                frame, ["age", "annual_km", "car_age", "exp_years", "num_accidents"]
+            )
+
+        n = max(np.size(c) for c in (age, annual_km, car_age, exp_years, num_accidents))
+        errors = []
+        try:
+            base_risk = preprocessing.combined_factors_batch(age, annual_km, car_age, exp_years, num_accidents)
+        except InvalidInputError as e:
+            errors.append(e)
+        try:
+            type_risk = self.vehicle_type_factor_batch(vehicle_type, n)
+        except InvalidInputError as e:
+            errors.append(e)
+        if errors:
+            rows = [e.rows for e in errors if e.rows is not None]
+            raise InvalidInputError(
+                "Cannot compute risk: " + " ".join(str(e) for e in errors),
+                rows=np.unique(np.concatenate(rows)) if rows else None,
+            )
+
+        premium = _round2(self.base_cost * (type_risk * base_risk))
+
+        negative = np.flatnonzero(premium < 0)
+        if len(negative):
+            raise InvalidInputError("Final premium cannot be negative.", rows=negative)
+        return premium
+
     def quote_display(self,age,annual_km,car_age,exp_years,num_accidents,vehicle_type=None,):
         """ Summary """
         return self.final_premium(age, annual_km, car_age, exp_years, num_accidents, vehicle_type)
@@ -1,11 +1,57 @@
+"""
+Health Insurance Sub-Package
+Importing the package has no side effects: nothing is read from disk or trained, and pandas / scikit-learn are only
+imported the first time one of the names below is used. Train the model with `python -m Health_Insurance.training`.
+"""
+import importlib
+import sys
+import types
 
-from .preprocessing import preprocess
-from .training import Training, save
-from .result import result
+# exported name -> submodule that defines it
+_exports = {
+    "preprocess": "preprocessing",
+    "Training": "training",
+    "IncrementalTraining": "training",
+    "save": "training",
+    "result": "result",
+    "predict_batch": "result",
+    "predict_with_interval": "result",
+    "compile_pipeline": "compiled",
+    "compact_pipeline": "compact",
+    "load_compact": "compact",
+    "HealthPredictor": "predictor",
+}
 
 __all__ = [
     "preprocess",
     "Training",
+    "IncrementalTraining",
     "save",
-    "result"
-]
\ No newline at end of file
+    "result",
+    "predict_batch",
+    "predict_with_interval",
+    "compile_pipeline",
+    "compact_pipeline",
+    "load_compact",
+    "HealthPredictor"
+]
+
+def __getattr__(name):
+    if name in _exports:
+        module = importlib.import_module(f".{_exports[name]}", __name__)
+        value = globals()[name] = getattr(module, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+class _LazyPackage(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing the `result` submodule binds it onto the package; keep the `result` class there instead,
+        # like the old eager `from .result import result` did.
+        if name in _exports and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -0,0 +1,199 @@
+"""
+autotune.py
+----------------------------------------
+Picks the forest size for the health pipeline from measurements instead of guesswork. Every combination of tree
+count, `max_depth` and `min_samples_leaf` in the grid is fitted with `Training()` (one process per core, so the fits
+run in parallel and go through the fit cache). Each candidate's held-out RMSE, the size of its pickle and its measured
+predict latency through `HealthPredictor` are recorded:
+
+    latency_ms   median single-row quote (the compiled forest serving path)
+    batch_ms     one `predict_batch` of `batch_rows` rows, best of three
+
+Latency is measured in this process, one candidate at a time after all fits are done, so the timings do not compete
+with the fits for the cores. The report lists every candidate, marks the Pareto front (no other candidate is at least
+as good on RMSE, latency, batch time and size and better on one), and names the most accurate candidate inside the
+budget. Everything runs offline on `insurance_data.csv`:
+
+    python -m Health_Insurance.autotune --latency-ms 0.5 --max-mb 20 --output Health_Insurance/random_forest.pkl
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from Insurance_Core.threads import set_serving_budget
+
+from .predictor import HealthPredictor
+from .training import DATA_PATH, Training, save
+
+TREES = (50, 100, 200, 500)
+DEPTHS = (None, 6, 10)
+MIN_LEAF = (1, 5, 20)
+OBJECTIVES = ("rmse", "latency_ms", "batch_ms", "bytes")
+
+
+def _fit_candidate(params, split, directory, cache):
+    """ Worker: fits one candidate with a single thread and pickles it into `directory`. """
+    start = time.perf_counter()
+    model, rmse, r2 = Training(params["n_estimators"], split, n_jobs=1, cache=cache,
+                               max_depth=params["max_depth"], min_samples_leaf=params["min_samples_leaf"])
+    seconds = time.perf_counter() - start
+    name = "candidate-{n_estimators}-{max_depth}-{min_samples_leaf}.pkl".format(**params)
+    path = os.path.join(directory, name)
+    joblib.dump(model, path)
+    return {**params, "rmse": rmse, "r2": r2, "fit_seconds": seconds, "bytes": os.path.getsize(path), "path": path}
+
+
+def measure_latency(model, records, batch, repeat=200):
+    """ (median single-row ms, best-of-three batch ms) of `model` served through HealthPredictor. """
+    predictor = HealthPredictor(set_serving_budget(model))
+    for record in records[:10]:
+        predictor.predict_one(record)
+    times = []
+    for i in range(repeat):
+        record = records[i % len(records)]
+        start = time.perf_counter()
+        predictor.predict_one(record)
+        times.append(time.perf_counter() - start)
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        predictor.predict_batch(batch)
+        best = min(best, time.perf_counter() - start)
+    return float(np.median(times)) * 1000, best * 1000
+
+
+def pareto_front(candidates, objectives=OBJECTIVES):
+    """ The candidates no other candidate dominates, all objectives minimized. """
+    front = []
+    for c in candidates:
+        dominated = any(
+            all(o[k] <= c[k] for k in objectives) and any(o[k] < c[k] for k in objectives)
+            for o in candidates
+        )
+        if not dominated:
+            front.append(c)
+    return front
+
+
+def select(candidates, max_latency_ms=None, max_batch_ms=None, max_bytes=None):
+    """ Lowest-RMSE candidate inside the budgets (None = unbounded), ties go to the faster one. None if none fits. """
+    feasible = [
+        c for c in candidates
+        if (max_latency_ms is None or c["latency_ms"] <= max_latency_ms)
+        and (max_batch_ms is None or c["batch_ms"] <= max_batch_ms)
+        and (max_bytes is None or c["bytes"] <= max_bytes)
+    ]
+    if not feasible:
+        return None
+    return min(feasible, key=lambda c: (c["rmse"], c["latency_ms"], c["bytes"]))
+
+
+def autotune(trees=TREES, depths=DEPTHS, min_leaf=MIN_LEAF, split=0.2, workers=None, max_latency_ms=None,
+             max_batch_ms=None, max_bytes=None, batch_rows=1000, output=None, cache=None):
+    """
+    Fits and measures every grid candidate and returns {"candidates", "pareto", "best", "budget"}. Candidates are
+    dicts of the parameters and measurements, sorted by RMSE. `workers` fitting processes run at once (default one
+    per core). With `output`, the best candidate inside the budget is saved there with training.save. `cache` is as for Training.
+    """
+    grid = [{"n_estimators": n, "max_depth": d, "min_samples_leaf": leaf}
+            for n, d, leaf in itertools.product(trees, depths, min_leaf)]
+    if not grid:
+        raise ValueError("the grid is empty")
+    workers = min(workers or os.cpu_count() or 1, len(grid))
+
+    data = pd.read_csv(DATA_PATH).drop(columns="charges")
+    records = data.sample(min(len(data), 200), random_state=0).to_dict("records")
+    batch = data.sample(batch_rows, replace=True, random_state=1).reset_index(drop=True)
+
+    directory = tempfile.mkdtemp(prefix="autotune.")
+    try:
+        if workers == 1:
+            candidates = [_fit_candidate(params, split, directory, cache) for params in grid]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                candidates = list(pool.map(_fit_candidate, grid, itertools.repeat(split),
+                                           itertools.repeat(directory), itertools.repeat(cache)))
+
+        for c in candidates:
+            c["latency_ms"], c["batch_ms"] = measure_latency(joblib.load(c["path"]), records, batch)
+
+        front = pareto_front(candidates)
+        best = select(candidates, max_latency_ms, max_batch_ms, max_bytes)
+        if best is not None and output:
+            # through training.save, so the compact forest single quotes map is written next to it
+            save(joblib.load(best["path"]), output)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    for c in candidates:
+        del c["path"]
+        c["pareto"] = any(c is f for f in front)
+    candidates.sort(key=lambda c: (c["rmse"], c["latency_ms"]))
+    return {
+        "candidates": candidates,
+        "pareto": [c for c in candidates if c["pareto"]],
+        "best": best,
+        "budget": {"max_latency_ms": max_latency_ms, "max_batch_ms": max_batch_ms, "max_bytes": max_bytes,
+                   "batch_rows": batch_rows},
+    }
+
+
+def _depth(value):
+    return None if value.lower() == "none" else int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep forest sizes, measure RMSE / latency / size, pick one.")
+    parser.add_argument("--trees", type=int, nargs="+", default=list(TREES))
+    parser.add_argument("--depth", type=_depth, nargs="+", default=list(DEPTHS),
+                        help="max_depth values, 'none' = unlimited")
+    parser.add_argument("--min-leaf", type=int, nargs="+", default=list(MIN_LEAF))
+    parser.add_argument("--split", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=None, help="fitting processes (default one per cpu)")
+    parser.add_argument("--latency-ms", type=float, default=None, help="budget for a single-row quote")
+    parser.add_argument("--batch-ms", type=float, default=None, help="budget for a batch of --batch-rows")
+    parser.add_argument("--max-mb", type=float, default=None, help="budget for the pickled model")
+    parser.add_argument("--batch-rows", type=int, default=1000)
+    parser.add_argument("--output", default=None, help="save the chosen model here")
+    parser.add_argument("--report", default=None, help="write the full report as JSON")
+    parser.add_argument("--no-cache", action="store_true", help="refit even if an identical fit is cached")
+    args = parser.parse_args(argv)
+
+    max_bytes = int(args.max_mb * (1 << 20)) if args.max_mb is not None else None
+    report = autotune(args.trees, args.depth, args.min_leaf, args.split, args.workers, args.latency_ms,
+                      args.batch_ms, max_bytes, args.batch_rows, args.output, False if args.no_cache else None)
+
+    print(f"  {'trees':>5} {'depth':>5} {'leaf':>4} {'RMSE':>9} {'R2':>7} {'1 row ms':>9} "
+          f"{args.batch_rows:>6} ms {'MB':>7}")
+    for c in report["candidates"]:
+        print(f"{'*' if c['pareto'] else ' '} {c['n_estimators']:5d} {str(c['max_depth']):>5} "
+              f"{c['min_samples_leaf']:4d} {c['rmse']:9.2f} {c['r2']:7.4f} {c['latency_ms']:9.3f} "
+              f"{c['batch_ms']:9.2f} {c['bytes'] / 2**20:7.2f}")
+    print("* = Pareto front (RMSE, latency, batch time, size)")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    best = report["best"]
+    if best is None:
+        print("No candidate fits the budget.")
+        return 1
+    print(f"Best inside the budget: trees={best['n_estimators']} max_depth={best['max_depth']} "
+          f"min_samples_leaf={best['min_samples_leaf']} RMSE={best['rmse']:.2f}"
+          + (f", saved to {args.output}" if args.output else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,371 @@
+"""
+compact.py
+----------------------------------------
+Compact on-disk / in-memory format for the health forest. A pickled RandomForestRegressor keeps every node of every
+tree with float64 thresholds and values, int64 child / feature indices and per-node statistics that prediction never
+reads. `compact_pipeline(model)` starts from the compiled forest (see compiled.py) and shrinks it without changing a
+prediction:
+
+- thresholds become float32. The forest compares float32 inputs, so rounding each threshold down to the largest
+  float32 not above it gives the same branch for every input.
+- identical subtrees are stored once: leaves with the same value, and then bottom up every node with the same split
+  and the same (already merged) children, inside and across trees. The trees become one shared DAG.
+- leaves come first in the node table, so leaf values are a float64 table of the distinct leaves only.
+- child indices use the smallest integer type that fits the node count, features int8.
+
+`prune=tolerance` also drops trees greedily, the one that moves the ensemble least first, while the mean relative
+drift against the full forest on the reference data stays within the tolerance. That one is not lossless.
+
+    python -m Health_Insurance.compact Health_Insurance/random_forest.pkl Health_Insurance/random_forest.npz
+    forest = load_compact("Health_Insurance/random_forest.npz")
+    forest.predict(frame)
+
+The file is a single uncompressed `.npz` with the arrays and a JSON header. `load_compact` only needs NumPy. With
+`mmap=True` the arrays are memory-mapped from the file instead of read: loading only widens the child and feature
+indices to the intp tables the traversal walks, and every process that maps the same file shares one page-cache copy
+of the thresholds and leaf values. `training.save` writes this file next to the pickle (`compact_path`) and single
+quotes in result.py use it.
+"""
+import argparse
+import json
+import os
+import struct
+import time
+import zipfile
+
+import numpy as np
+
+from .compiled import FEATURES, CompiledForest, compile_pipeline
+
+FORMAT_VERSION = 1
+
+
+class CompactForest(CompiledForest):
+    """
+    A CompiledForest whose nodes are a deduplicated DAG with small dtypes. Same `encode` / `predict` /
+    `predict_trees` / `predict_one` / `predict_with_interval` API, evaluated in float32. The file stores `left` /
+    `right`, the traversal walks the interleaved `children` of CompiledForest built from them on load.
+    """
+
+    def __init__(self, categories, source, category, feature, threshold, left, right, value, roots, depth):
+        # size and mtime of the pickle the forest was made from, when it was saved with one
+        self.origin = None
+        self.categories = {col: list(cats) for col, cats in categories.items()}
+        self.codes = {col: {c: i for i, c in enumerate(cats)} for col, cats in self.categories.items()}
+        self.source = np.asarray(source, dtype=np.intp)
+        self.category = np.asarray(category, dtype=np.float64)
+        self.is_onehot = self.category >= 0
+        # nodes 0 .. len(value) - 1 are the leaves, they point to themselves and never go right
+        # feature and roots are widened for indexing (small, a copy), arrays() writes them back in the file dtypes
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # intp like CompiledForest.children, 2 * node would overflow the small child dtype
+        self.children = np.empty(2 * len(left), dtype=np.intp)
+        self.children[0::2] = left
+        self.children[1::2] = right
+        self.value = value
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = int(depth)
+        self.n_trees = len(self.roots)
+
+    def __repr__(self):
+        return (f"CompactForest(trees={self.n_trees}, nodes={len(self.feature)}, leaves={len(self.value)}, "
+                f"depth={self.depth})")
+
+    def arrays(self):
+        return {
+            "source": self.source,
+            "category": self.category,
+            "feature": self.feature.astype(np.int8),
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots.astype(self.left.dtype),
+        }
+
+    def nbytes(self):
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def transform(self, X):
+        Xs = X[:, self.source]
+        return np.where(self.is_onehot, Xs == self.category, Xs).astype(np.float32)
+
+
+def _index_dtype(n):
+    for dtype in (np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _float32_floor(threshold):
+    """ Largest float32 <= each threshold: for a float32 x, x > t and x > _float32_floor(t) always agree. """
+    down = threshold.astype(np.float32)
+    over = down.astype(np.float64) > threshold
+    down[over] = np.nextafter(down[over], np.float32(-np.inf))
+    return down
+
+
+def compact_forest(forest, trees=None):
+    """ CompactForest of a CompiledForest, optionally keeping only the tree indices in `trees`. """
+    roots = forest.roots if trees is None else forest.roots[np.asarray(trees, dtype=np.intp)]
+    n = len(forest.feature)
+    left, right = forest.children[0::2], forest.children[1::2]
+    is_leaf = np.isinf(forest.threshold)
+    threshold = _float32_floor(forest.threshold)
+
+    # nodes reachable from the kept roots
+    reachable = np.zeros(n, dtype=bool)
+    frontier = np.unique(roots)
+    while len(frontier):
+        reachable[frontier] = True
+        frontier = np.concatenate([left[frontier], right[frontier]])
+        frontier = np.unique(frontier[~reachable[frontier]])
+
+    # height above the leaves, identical subtrees always have the same height
+    height = np.where(is_leaf, 0, -1)
+    pending = reachable & ~is_leaf
+    while pending.any():
+        nodes = np.flatnonzero(pending)
+        hl, hr = height[left[nodes]], height[right[nodes]]
+        ready = (hl >= 0) & (hr >= 0)
+        height[nodes[ready]] = np.maximum(hl[ready], hr[ready]) + 1
+        pending[nodes[ready]] = False
+
+    new_id = np.full(n, -1, dtype=np.int64)
+    leaves = np.flatnonzero(reachable & is_leaf)
+    values, inverse = np.unique(forest.value[leaves], return_inverse=True)
+    new_id[leaves] = inverse
+    count = len(values)
+    feature_parts, threshold_parts, left_parts, right_parts = [], [], [], []
+
+    for h in range(1, int(height.max(initial=0)) + 1):
+        nodes = np.flatnonzero(reachable & (height == h))
+        keys = np.stack([forest.feature[nodes], threshold[nodes].view(np.int32).astype(np.int64),
+                         new_id[left[nodes]], new_id[right[nodes]]], axis=1)
+        unique, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+        new_id[nodes] = count + inverse.ravel()
+        feature_parts.append(unique[:, 0])
+        threshold_parts.append(threshold[nodes[first]])
+        left_parts.append(unique[:, 2])
+        right_parts.append(unique[:, 3])
+        count += len(unique)
+
+    dtype = _index_dtype(count)
+    leaf_ids = np.arange(len(values))
+    return CompactForest(
+        forest.categories, forest.source, forest.category,
+        np.concatenate([np.zeros(len(values), dtype=np.int64)] + feature_parts).astype(np.int8),
+        np.concatenate([np.full(len(values), np.inf, dtype=np.float32)] + threshold_parts),
+        np.concatenate([leaf_ids] + left_parts).astype(dtype),
+        np.concatenate([leaf_ids] + right_parts).astype(dtype),
+        values,
+        new_id[roots].astype(dtype),
+        int(height.max(initial=0)),
+    )
+
+
+def prune_trees(forest, records, tolerance):
+    """
+    Indices of the trees to keep: removes trees one at a time, each time the one whose removal moves the predictions
+    on `records` least, while the mean relative drift from the full forest stays <= tolerance.
+    """
+    P = forest.predict_trees(records)
+    full = P.mean(axis=1)
+    alive = list(range(P.shape[1]))
+    total = P.sum(axis=1)
+    while len(alive) > 1:
+        k = len(alive)
+        candidate = (total[:, None] - P[:, alive]) / (k - 1)
+        drift = np.mean(np.abs(candidate - full[:, None]) / np.abs(full)[:, None], axis=0)
+        j = int(np.argmin(drift))
+        if drift[j] > tolerance:
+            break
+        total -= P[:, alive[j]]
+        del alive[j]
+    return alive
+
+
+def compact_pipeline(model, prune=None, records=None):
+    """ CompactForest of a fitted health pipeline. `prune` needs reference `records` (e.g. the training CSV). """
+    forest = compile_pipeline(model)
+    trees = None
+    if prune is not None:
+        if records is None:
+            raise ValueError("Pruning needs reference records to measure the drift on.")
+        trees = prune_trees(forest, records, prune)
+    return compact_forest(forest, trees)
+
+
+def compact_path(model_path):
+    """ Where training.save puts the compact forest of a pickled pipeline: same name, .npz. """
+    return os.path.splitext(model_path)[0] + ".npz"
+
+
+def save_compact(forest, path, source=None):
+    """
+    Writes the forest as one uncompressed npz, to a temporary file renamed into place. `source` is the pickle it was
+    made from, its size and mtime are recorded so a reader can tell when the pickle was replaced without it.
+    """
+    meta = {"format": FORMAT_VERSION, "features": FEATURES, "categories": forest.categories, "depth": forest.depth,
+            "trees": forest.n_trees, "nodes": len(forest.feature), "leaves": len(forest.value)}
+    if source is not None:
+        st = os.stat(source)
+        meta["source"] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    arrays = dict(forest.arrays())
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def _map_npz(path):
+    """
+    {name: read-only array} for every member of an uncompressed npz, located through the zip headers. The arrays are
+    plain ndarray views of np.memmap: indexing a memmap wraps every result in a memmap again, which doubles the cost of
+    a single quote's tree walk.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: {info.filename} is compressed and cannot be memory-mapped")
+            # the local file header is 30 bytes plus its own name and extra field, the .npy member follows
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+            if dtype.hasobject:
+                raise ValueError(f"{path}: {name} holds Python objects and cannot be memory-mapped")
+            if not np.prod(shape, dtype=np.int64):
+                # an empty array cannot be mapped
+                arrays[name] = np.empty(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                     order="F" if fortran else "C").view(np.ndarray)
+    return arrays
+
+
+def load_compact(path, mmap=False):
+    """ The CompactForest in `path`, with read-only arrays, memory-mapped from the file when `mmap` is set. """
+    if mmap:
+        a = _map_npz(path)
+    else:
+        with np.load(path) as data:
+            a = {name: data[name] for name in data.files}
+    meta = json.loads(a.pop("meta").tobytes())
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path} is compact format {meta.get('format')}, expected {FORMAT_VERSION}")
+    for array in a.values():
+        array.flags.writeable = False
+    forest = CompactForest(meta["categories"], a["source"], a["category"], a["feature"], a["threshold"], a["left"],
+                           a["right"], a["value"], a["roots"], meta["depth"])
+    forest.origin = meta.get("source")
+    return forest
+
+
+def load_mapped(path):
+    """ load_compact(path, mmap=True), the registry loader for compact forests. """
+    return load_compact(path, mmap=True)
+
+
+def mapped_forest(model_path):
+    """
+    The memory-mapped compact forest saved next to `model_path`, through the registry. None when there is none or
+    the pickle was replaced after it was written, then the pickle is the one to use.
+    """
+    from Insurance_Core.registry import registry
+
+    path = compact_path(model_path)
+    if not os.path.exists(path):
+        return None
+    forest = registry.get(path, loader=load_mapped)
+    st = os.stat(model_path)
+    if forest.origin != {"size": st.st_size, "mtime_ns": st.st_mtime_ns}:
+        return None
+    return forest
+
+
+def _best_time(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(model_path, compact_path, records):
+    """
+    Size on disk, load time, in-memory size and prediction drift of the compact file against the pickled pipeline
+    it was made from. `records` are the rows the drift is measured on.
+    """
+    import joblib
+
+    model = joblib.load(model_path)
+    forest = load_compact(compact_path)
+    expected = model.predict(records)
+    got = forest.predict(records)
+    drift = np.abs(got - expected)
+
+    trees = model.named_steps["rf"].estimators_
+    tree_bytes = sum(sum(getattr(t.tree_, name).nbytes for name in ("children_left", "children_right", "feature",
+                                                                    "threshold", "value", "impurity",
+                                                                    "n_node_samples", "weighted_n_node_samples"))
+                     for t in trees)
+    return {
+        "pickle_bytes": os.path.getsize(model_path),
+        "compact_bytes": os.path.getsize(compact_path),
+        "pickle_load_seconds": _best_time(lambda: joblib.load(model_path)),
+        "compact_load_seconds": _best_time(lambda: load_compact(compact_path)),
+        "tree_array_bytes": tree_bytes,
+        "compact_array_bytes": forest.nbytes(),
+        "trees": [len(trees), forest.n_trees],
+        "nodes": [int(sum(t.tree_.node_count for t in trees)), len(forest.feature)],
+        "max_abs_drift": float(drift.max()),
+        "mean_abs_drift": float(drift.mean()),
+        "max_rel_drift": float((drift / np.abs(expected)).max()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the health forest in the compact format and report on it.")
+    parser.add_argument("model", help="pickled pipeline from Health_Insurance.training")
+    parser.add_argument("output", help="compact .npz to write")
+    parser.add_argument("--prune", type=float, default=None,
+                        help="drop trees while the mean relative drift stays below this, e.g. 0.001")
+    parser.add_argument("--data", default="Health_Insurance/insurance_data.csv",
+                        help="reference rows for pruning and the drift report")
+    args = parser.parse_args(argv)
+
+    import joblib
+    import pandas as pd
+
+    records = pd.read_csv(args.data)
+    save_compact(compact_pipeline(joblib.load(args.model), args.prune, records), args.output)
+    report = compare(args.model, args.output, records)
+
+    mb = 2 ** 20
+    print(f"trees            {report['trees'][0]:>12,} -> {report['trees'][1]:,}")
+    print(f"nodes            {report['nodes'][0]:>12,} -> {report['nodes'][1]:,}")
+    print(f"file             {report['pickle_bytes'] / mb:>10.2f} MB -> {report['compact_bytes'] / mb:.2f} MB")
+    print(f"node arrays      {report['tree_array_bytes'] / mb:>10.2f} MB -> "
+          f"{report['compact_array_bytes'] / mb:.2f} MB")
+    print(f"load             {report['pickle_load_seconds'] * 1000:>10.1f} ms -> "
+          f"{report['compact_load_seconds'] * 1000:.1f} ms")
+    print(f"drift            max {report['max_abs_drift']:.3g}, mean {report['mean_abs_drift']:.3g}, "
+          f"max relative {report['max_rel_drift']:.3g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+compiled.py
+----------------------------------------
+Compiles the fitted Pipeline from `Training()` (ColumnTransformer + OneHotEncoder + RandomForestRegressor) into flat
+NumPy arrays, and evaluates every tree of the forest at once with a handful of array operations per tree level. There
+is no DataFrame, no input validation and no thread dispatch, so a single quote costs microseconds instead of
+milliseconds. Only NumPy is needed to evaluate a compiled forest.
+
+Layout: the nodes of all trees are concatenated. `feature`/`threshold` describe the split of each node and
+`children[2 * node + go_right]` is the next node. Leaves point to themselves with an infinite threshold, so after
+`depth` steps every row sits on a leaf of every tree.
+"""
+import numpy as np
+
+FEATURES = ["age", "sex", "bmi", "children", "smoker", "region"]
+# default premium range: the 5th and 95th percentile of the per-tree predictions
+QUANTILES = (0.05, 0.95)
+
+
+def _check_quantiles(quantiles):
+    q = np.asarray(quantiles, dtype=np.float64)
+    if q.ndim != 1 or not np.all((q >= 0) & (q <= 1)):
+        raise ValueError(f"quantiles must be a sequence of numbers between 0 and 1, got {quantiles!r}")
+    return q
+
+
+class CompiledForest:
+    """ Array form of a fitted health pipeline. Build one with `compile_pipeline(model)`. """
+
+    def __init__(self, categories, source, category, feature, threshold, children, value, roots, depth):
+        # categories: {input column: [category, ...]} in the OneHotEncoder's order
+        self.categories = {col: list(cats) for col, cats in categories.items()}
+        self.codes = {col: {c: i for i, c in enumerate(cats)} for col, cats in self.categories.items()}
+        # encoded feature j reads input column source[j], and is the one-hot of code category[j] (-1 = numeric)
+        self.source = np.asarray(source, dtype=np.intp)
+        self.category = np.asarray(category, dtype=np.float64)
+        self.is_onehot = self.category >= 0
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children = np.asarray(children, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = int(depth)
+        self.n_trees = len(self.roots)
+
+    def __repr__(self):
+        return f"CompiledForest(trees={self.n_trees}, nodes={len(self.feature)}, depth={self.depth})"
+
+    def arrays(self):
+        """ Every array needed to rebuild the forest, e.g. for np.savez. """
+        return {
+            "source": self.source,
+            "category": self.category,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "value": self.value,
+            "roots": self.roots,
+        }
+
+    def _code(self, col, value):
+        # same normalization as predict_batch, unknown categories one-hot to all zeros like handle_unknown="ignore"
+        return self.codes[col].get(str(value).strip().lower(), -1)
+
+    def encode(self, records):
+        """
+        Turns records into the (n, 6) float matrix the evaluator works on, categoricals replaced by their code.
+        Accepts a dict (one person), a DataFrame, a dict of columns or a list of record dicts.
+        """
+        if isinstance(records, dict) and not np.ndim(records.get("age")):
+            records = [records]
+        if hasattr(records, "columns") or isinstance(records, dict):
+            columns = [np.asarray(records[col]) for col in FEATURES]
+        else:
+            records = list(records)
+            columns = [np.array([r[col] for r in records], dtype=object) for col in FEATURES]
+
+        n = len(columns[0])
+        X = np.empty((n, len(FEATURES)))
+        for j, (col, values) in enumerate(zip(FEATURES, columns)):
+            if col in self.codes:
+                lookup = {v: self._code(col, v) for v in dict.fromkeys(values.tolist())}
+                X[:, j] = np.fromiter(map(lookup.__getitem__, values.tolist()), dtype=np.float64, count=n)
+            else:
+                X[:, j] = values
+        return X
+
+    def transform(self, X):
+        """ Encoded feature matrix, rounded through float32 like the forest does before comparing thresholds. """
+        Xs = X[:, self.source]
+        E = np.where(self.is_onehot, Xs == self.category, Xs)
+        return E.astype(np.float32).astype(np.float64)
+
+    def leaves(self, E):
+        """ Leaf node index reached in every tree, shape (n, n_trees). """
+        n, width = E.shape
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        row = (np.arange(n) * width)[:, None]
+        flat = E.ravel()
+        for _ in range(self.depth):
+            x = flat[row + self.feature[node]]
+            node = self.children[2 * node + (x > self.threshold[node])]
+        return node
+
+    def predict_trees(self, records):
+        """ Per-tree predictions, shape (n, n_trees). """
+        return self.value[self.leaves(self.transform(self.encode(records)))]
+
+    def predict(self, records):
+        """ Same result as `model.predict` (to floating-point tolerance), for one record or a batch. """
+        return self.predict_trees(records).mean(axis=1)
+
+    def predict_with_interval(self, records, quantiles=QUANTILES):
+        """
+        (mean, bounds): the prediction and the given quantiles of the per-tree predictions, shape (n,) and
+        (n, len(quantiles)). One traversal of all trees, the same one `predict` does.
+        """
+        q = _check_quantiles(quantiles)
+        P = self.predict_trees(records)
+        return P.mean(axis=1), np.quantile(P, q, axis=1).T
+
+    def tree_values_one(self, age, sex, bmi, children, smoker, region):
+        """ Per-tree predictions for one person, shape (n_trees,). """
+        x = np.array([age, self._code("sex", sex), bmi, children, self._code("smoker", smoker),
+                      self._code("region", region)], dtype=np.float64)
+        xs = x[self.source]
+        e = np.where(self.is_onehot, xs == self.category, xs).astype(np.float32).astype(np.float64)
+
+        node = self.roots
+        for _ in range(self.depth):
+            node = self.children[2 * node + (e[self.feature[node]] > self.threshold[node])]
+        return self.value[node]
+
+    def predict_one(self, age, sex, bmi, children, smoker, region):
+        """ Single quote fast path, skips the batch bookkeeping. Returns a float. """
+        return float(self.tree_values_one(age, sex, bmi, children, smoker, region).mean())
+
+    def predict_one_with_interval(self, age, sex, bmi, children, smoker, region, quantiles=QUANTILES):
+        """ (mean, bounds) for one person as floats, bounds a tuple with one value per quantile. """
+        q = _check_quantiles(quantiles)
+        values = self.tree_values_one(age, sex, bmi, children, smoker, region)
+        return float(values.mean()), tuple(np.quantile(values, q).tolist())
+
+
+def _encoder_layout(preprocessor):
+    """ Works out which input column (and category) feeds each column of the ColumnTransformer's output. """
+    categories, source, category = {}, [], []
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder":
+            if isinstance(transformer, str) and transformer == "drop":
+                continue
+            # newer scikit-learn stores a fitted passthrough as an identity FunctionTransformer
+            identity = getattr(transformer, "func", "") is None
+            if not (isinstance(transformer, str) and transformer == "passthrough") and not identity:
+                raise ValueError("Only a passthrough remainder can be compiled.")
+            for col in columns:
+                source.append(col if isinstance(col, int) else FEATURES.index(col))
+                category.append(-1)
+        elif isinstance(transformer, str) and transformer == "drop":
+            continue
+        elif hasattr(transformer, "categories_"):
+            for col, cats in zip(columns, transformer.categories_):
+                if getattr(transformer, "drop_idx_", None) is not None:
+                    raise ValueError("OneHotEncoder(drop=...) cannot be compiled.")
+                col = FEATURES[col] if isinstance(col, int) else col
+                categories[col] = [str(c) for c in cats]
+                for k in range(len(cats)):
+                    source.append(FEATURES.index(col))
+                    category.append(k)
+        else:
+            raise ValueError(f"Cannot compile transformer {name!r}.")
+    return categories, source, category
+
+
+def compile_pipeline(model):
+    """ Compiles a fitted Pipeline(("preprocess", ColumnTransformer), ("rf", RandomForestRegressor)). """
+    categories, source, category = _encoder_layout(model.named_steps["preprocess"])
+    forest = model.named_steps["rf"]
+
+    features, thresholds, children, values, roots = [], [], [], [], []
+    offset = 0
+    depth = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        left = tree.children_left
+        right = tree.children_right
+        leaf = left == -1
+        ids = np.arange(offset, offset + n)
+
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        pair = np.empty((n, 2), dtype=np.intp)
+        pair[:, 0] = np.where(leaf, ids, left + offset)
+        pair[:, 1] = np.where(leaf, ids, right + offset)
+        children.append(pair.ravel())
+        values.append(tree.value[:, 0, 0])
+        roots.append(offset)
+
+        offset += n
+        depth = max(depth, tree.max_depth)
+
+    return CompiledForest(
+        categories, source, category,
+        np.concatenate(features), np.concatenate(thresholds), np.concatenate(children),
+        np.concatenate(values), roots, depth,
+    )
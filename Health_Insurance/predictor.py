@@ -0,0 +1,95 @@
+"""
+predictor.py
+----------------------------------------
+`HealthPredictor` is a read-only scorer for the health pipeline that can be shared by any number of threads. Unlike
+`result` it keeps no request fields on the object: it holds the fitted forest and its compiled form and every call
+gets its inputs as arguments, so one instance per model file serves the whole process.
+
+    predictor = HealthPredictor.load()              # cached in the registry, reloaded when the file changes
+    predictor.predict_one({"age": 40, "sex": "male", "bmi": 27.5, "children": 1, "smoker": "no", "region": "ne"})
+    predictor.predict_batch(frame)
+    predictor.predict_with_interval(frame, quantiles=(0.05, 0.95))
+
+Single quotes use the compiled forest. Batches are encoded with NumPy (the compiled one-hot layout, no DataFrame or
+ColumnTransformer) and handed to the forest's own tree evaluation, which releases the GIL, so threads scoring batches
+run in parallel for most of the call. Intervals use the forest's `apply` the same way and read every tree's leaf
+value from the compiled arrays.
+"""
+import numpy as np
+
+from Insurance_Core.registry import registry
+from Insurance_Core.threads import load_for_serving, model_jobs, thread_cap
+
+from .compiled import QUANTILES, _check_quantiles, compile_pipeline
+
+MODEL_PATH = "Health_Insurance/random_forest.pkl"
+
+
+class HealthPredictor:
+    """ Immutable, thread-safe scorer for a fitted health pipeline. """
+    __slots__ = ("compiled", "forest", "jobs")
+
+    def __init__(self, model):
+        compiled = compile_pipeline(model)
+        for array in compiled.arrays().values():
+            array.flags.writeable = False
+        object.__setattr__(self, "compiled", compiled)
+        object.__setattr__(self, "forest", model.named_steps["rf"])
+        object.__setattr__(self, "jobs", model_jobs(model))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"HealthPredictor({self.compiled!r})"
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """ The shared predictor for the model at `path`, built once per process and rebuilt when the file changes. """
+        return registry.get(path, loader=_load_predictor)
+
+    def predict_one(self, record):
+        """ Charges for one person given as a record dict. """
+        return self.compiled.predict_one(record["age"], record["sex"], record["bmi"], record["children"],
+                                         record["smoker"], record["region"])
+
+    def predict_batch(self, records, chunk_size=10000):
+        """
+        Charges for a DataFrame, a dict of columns or a list of record dicts, same values as `predict_batch` in
+        result.py. Returns a float64 array.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        X = self.compiled.encode(records)
+        out = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            E = self.compiled.transform(X[start:start + chunk_size]).astype(np.float32)
+            with thread_cap.reserve(self.jobs):
+                out[start:start + len(E)] = self.forest.predict(E)
+        return out
+
+    def predict_with_interval(self, records, quantiles=QUANTILES, chunk_size=10000):
+        """
+        (mean, bounds) for the same inputs as `predict_batch`: the charges and the given quantiles of the per-tree
+        predictions, shape (n,) and (n, len(quantiles)). The forest's `apply` walks every tree once per chunk and
+        returns the leaf ids, the leaf values come from the compiled value table.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        q = _check_quantiles(quantiles)
+        X = self.compiled.encode(records)
+        mean, bounds = np.empty(len(X)), np.empty((len(X), len(q)))
+        for start in range(0, len(X), chunk_size):
+            E = self.compiled.transform(X[start:start + chunk_size]).astype(np.float32)
+            with thread_cap.reserve(self.jobs):
+                leaves = self.forest.apply(E)
+            # apply numbers the nodes per tree, the compiled arrays keep that order with tree t starting at roots[t]
+            P = self.compiled.value[leaves + self.compiled.roots]
+            mean[start:start + len(E)] = P.mean(axis=1)
+            bounds[start:start + len(E)] = np.quantile(P, q, axis=1).T
+        return mean, bounds
+
+
+def _load_predictor(path):
+    # shares the forest the rest of the process loaded through the registry
+    return HealthPredictor(registry.get(path, loader=load_for_serving))
@@ -1,8 +1,9 @@
-import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import OneHotEncoder
 
+from Insurance_Core.datasets import load_dataset
+
 class preprocess:
 
     def __init__(self,path):
@@ -10,7 +11,8 @@ class preprocess:
     
     def train_test(self,split=0.8):
 
-        self.data = pd.read_csv(self.file_directory)
+        # typed columns from the columnar cache, the CSV is only parsed when it changed
+        self.data = load_dataset("health", self.file_directory)
         self.X = self.data[["age", "sex", "bmi", "children", "smoker", "region"]]
         self.Y = self.data["charges"]
 
@@ -30,7 +32,3 @@ class preprocess:
         )
 
         return self.preprocessor
-
-x = preprocess("Health_Insurance/insurance_data.csv")
-x.train_test(0.8)
-preprocessor = x.preprocessing()
\ No newline at end of file
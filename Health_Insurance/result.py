@@ -1,10 +1,20 @@
+from Health_Insurance.compact import mapped_forest
+from Health_Insurance.compiled import QUANTILES, _check_quantiles
 from Health_Insurance.preprocessing import preprocess
-import joblib
+from Insurance_Core import metrics
+from Insurance_Core.registry import registry
+from Insurance_Core.threads import load_for_serving, model_jobs, thread_cap
+import itertools
+import numpy as np
 import pandas as pd
 import os
 
+MODEL_PATH = "Health_Insurance/random_forest.pkl"
+FEATURES = ["age", "sex", "bmi", "children", "smoker", "region"]
+CATEGORICAL = ["sex", "smoker", "region"]
+
 class result(preprocess):
-    def  __init__(self, age, sex, bmi, children, smoker, region, path="Health_Insurance/random_forest.pkl"):
+    def  __init__(self, age, sex, bmi, children, smoker, region, path=MODEL_PATH):
         preprocess.__init__(self,path)
         self.age = age
         self.sex = sex
@@ -15,15 +25,6 @@ class result(preprocess):
         self.file_directory = path
 
     def predict(self):
-        data = pd.DataFrame([{
-            "age": self.age,
-            "sex": self.sex,
-            "bmi": self.bmi,
-            "children": self.children,
-            "smoker": self.smoker,
-            "region": self.region
-        }])
-
         try:
             if not os.path.exists(self.file_directory):
                 raise FileNotFoundError
@@ -32,11 +33,129 @@ class result(preprocess):
         except:
             print("Unknown Error")
         else:  
-            model = joblib.load(self.file_directory)
-            prediction = model.predict(data)
+            with metrics.timed("health.predict.load"):
+                # the memory-mapped compact forest written by training.save, else the pickled pipeline
+                forest = mapped_forest(self.file_directory)
+                if forest is None:
+                    model = registry.get(self.file_directory, loader=load_for_serving)
+            if forest is not None:
+                with metrics.timed("health.predict.model"):
+                    prediction = np.array([forest.predict_one(self.age, self.sex, self.bmi, self.children,
+                                                              self.smoker, self.region)])
+            else:
+                with metrics.timed("health.predict.frame"):
+                    # normalized like predict_batch and the mapped forest, so "Male" / " Yes " price the same
+                    data = _as_frame([{
+                        "age": self.age,
+                        "sex": self.sex,
+                        "bmi": self.bmi,
+                        "children": self.children,
+                        "smoker": self.smoker,
+                        "region": self.region
+                    }])
+                with thread_cap.reserve(model_jobs(model)), metrics.timed("health.predict.model"):
+                    prediction = model.predict(data)
 
         return prediction
 
+    def predict_with_interval(self, quantiles=QUANTILES):
+        """
+        (prediction, bounds): the estimate as in predict() and the given quantiles of the per-tree predictions as a
+        premium range, shape (1,) and (1, len(quantiles)). Raises FileNotFoundError when there is no model.
+        """
+        forest = _tree_forest(self.file_directory)
+        with metrics.timed("health.predict.interval"):
+            mean, bounds = forest.predict_one_with_interval(self.age, self.sex, self.bmi, self.children, self.smoker,
+                                                            self.region, quantiles)
+        return np.array([mean]), np.array([bounds])
+
+
+def _tree_forest(path):
+    """ A forest with per-tree predictions for the model at `path`: the mapped compact one, else the compiled one. """
+    from Health_Insurance.predictor import HealthPredictor
+
+    forest = mapped_forest(path)
+    if forest is None:
+        forest = HealthPredictor.load(path).compiled
+    return forest
+
+
+def _as_frame(records):
+    """ DataFrame with the model's columns from a DataFrame, a dict of columns or a list of record dicts. """
+    if isinstance(records, pd.DataFrame):
+        frame = records
+    elif isinstance(records, dict):
+        frame = pd.DataFrame({k: np.asarray(v) for k, v in records.items()})
+    else:
+        frame = pd.DataFrame.from_records(list(records))
+
+    missing = [c for c in FEATURES if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing input columns: {missing}")
+
+    frame = frame[FEATURES].copy()
+    # "Male", " YES " etc. are normalized to the lower case categories the encoder was fitted on
+    for col in CATEGORICAL:
+        frame[col] = frame[col].astype(str).str.strip().str.lower()
+    return frame.reset_index(drop=True)
+
+
+def _chunks(records, chunk_size):
+    if isinstance(records, (pd.DataFrame, dict)):
+        frame = _as_frame(records)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+    else:
+        it = iter(records)
+        while True:
+            chunk = list(itertools.islice(it, chunk_size))
+            if not chunk:
+                return
+            yield _as_frame(chunk)
+
+
+def predict_batch(records, path=MODEL_PATH, chunk_size=10000):
+    """
+    Predicts charges for many people with one Pipeline.predict call per chunk of `chunk_size` rows. `records` is a
+    DataFrame, a dict of NumPy columns or an iterable of record dicts (consumed lazily, one chunk at a time).
+    Returns a float64 array in input order.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    with metrics.timed("health.predict_batch.load"):
+        model = registry.get(path, loader=load_for_serving)
+
+    predictions = []
+    for chunk in _chunks(records, chunk_size):
+        with thread_cap.reserve(model_jobs(model)), metrics.timed("health.predict_batch.model"):
+            predictions.append(model.predict(chunk))
+        metrics.count("health.predict_batch.rows", len(chunk))
+    if not predictions:
+        return np.empty(0)
+    return np.concatenate(predictions).astype(np.float64, copy=False)
+
+
+def predict_with_interval(records, path=MODEL_PATH, quantiles=QUANTILES, chunk_size=10000):
+    """
+    Charges plus a premium range for many people: (mean, bounds), bounds holding the given quantiles of the per-tree
+    predictions, shape (n,) and (n, len(quantiles)). Same inputs as predict_batch. The leaf of every tree is found for
+    a whole chunk in one pass (HealthPredictor.predict_with_interval), not one predict per tree.
+    """
+    from Health_Insurance.predictor import HealthPredictor
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    q = _check_quantiles(quantiles)
+    with metrics.timed("health.predict_batch.load"):
+        predictor = HealthPredictor.load(path)
 
-obj = result(age = 30,sex = "Male",bmi = 24,children = 1,smoker = "Yes",region = "Northwest",path = "Health_Insurance/Test_run.pkl")
-prediction = obj.predict()
\ No newline at end of file
+    means, bounds = [], []
+    for chunk in _chunks(records, chunk_size):
+        with metrics.timed("health.predict_batch.interval"):
+            mean, bound = predictor.predict_with_interval(chunk, q, chunk_size)
+        means.append(mean)
+        bounds.append(bound)
+        metrics.count("health.predict_batch.rows", len(chunk))
+    if not means:
+        return np.empty(0), np.empty((0, len(q)))
+    return np.concatenate(means), np.concatenate(bounds)
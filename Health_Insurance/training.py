@@ -1,38 +1,269 @@
+import argparse
+import os
+import time
+
 import joblib
+import numpy as np
 
+from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.utils import check_array
 
 from Health_Insurance.preprocessing import preprocess
+from Insurance_Core import metrics
+from Insurance_Core.datasets import SCHEMAS, dataset_hash
+from Insurance_Core.fit_cache import FitCache, default_cache, library_versions
+from Insurance_Core.threads import training_jobs
+
+DATA_PATH = "Health_Insurance/insurance_data.csv"
+RANDOM_STATE = 42
+CHECKPOINT_DIR = "Health_Insurance/forest_checkpoint"
+
+
+def _fit_key(model, split, exclude=()):
+    """ Cache key of a fit: dataset, schema, every pipeline parameter except the thread count, split and versions. """
+    params = {
+        name: value for name, value in model.get_params(deep=True).items()
+        # "steps" and the step objects repeat the nested parameters below, including n_jobs
+        if name != "steps" and not name.endswith("n_jobs") and name not in exclude
+        and not isinstance(value, (Pipeline, ColumnTransformer, RandomForestRegressor))
+    }
+    return FitCache.key(
+        dataset=dataset_hash(DATA_PATH),
+        schema=SCHEMAS["health"].digest(),
+        params=params,
+        split=split,
+        split_seed=RANDOM_STATE,
+        versions=library_versions(),
+    )
+
+
+def Training(n = 500,split = 0.2,n_jobs = None,cache = None,max_depth = None,min_samples_leaf = 1):
+    """
+    n_jobs defaults to INSURANCE_TRAIN_JOBS or all cores, loaded models are reset to the serving budget. `cache` is a
+    FitCache, None for the one INSURANCE_FIT_CACHE configures (off unless set, see Insurance_Core.fit_cache) or False
+    to always refit. A fit with the same data, parameters and library versions as a cached one is loaded instead of
+    refitted. `max_depth` and `min_samples_leaf` are passed to the forest (see Health_Insurance.autotune for picking
+    them).
+    """
+    x = preprocess(DATA_PATH)
+    model = _pipeline(x, n, n_jobs, max_depth=max_depth, min_samples_leaf=min_samples_leaf)
+
+    fit_cache = default_cache() if cache is None else cache or None
+    key = None
+    if fit_cache is not None:
+        key = _fit_key(model, split)
+        hit = fit_cache.get(key)
+        if hit is not None:
+            hit["model"].named_steps["rf"].set_params(n_jobs=training_jobs(n_jobs))
+            return hit["model"], hit["rmse"], hit["r2"]
+
+    with metrics.timed("health.train.read_csv"):
+        x.train_test(split)
 
-def Training(n = 500,split = 0.2):
-    x = preprocess("Health_Insurance/insurance_data.csv")
-    x.train_test(0.2)
-    preprocessor = x.preprocessing()
-    
-    model = Pipeline(
+    with metrics.timed("health.train.fit"):
+        model.fit(x.X_Train, x.Y_Train)
+
+    with metrics.timed("health.train.evaluate"):
+        rmse, r2 = _evaluate(model, x)
+
+    if fit_cache is not None:
+        fit_cache.put(key, {"model": model, "rmse": rmse, "r2": r2})
+    return model,rmse,r2
+
+
+def _pipeline(x, n, n_jobs=None, **forest):
+    return Pipeline(
         steps=[
-            ("preprocess", preprocessor),
+            ("preprocess", x.preprocessing()),
             ("rf", RandomForestRegressor(
                 n_estimators=n,
-                random_state=42,
-                n_jobs=-1
+                random_state=RANDOM_STATE,
+                n_jobs=training_jobs(n_jobs),
+                **forest
             )),
         ]
     )
 
-    model.fit(x.X_Train, x.Y_Train)
 
+def _evaluate(model, x):
     Predictions = model.predict(x.X_Test)
-    rmse = mean_squared_error(x.Y_Test, Predictions) ** 0.5
-    r2 = r2_score(x.Y_Test, Predictions)
+    return mean_squared_error(x.Y_Test, Predictions) ** 0.5, r2_score(x.Y_Test, Predictions)
 
-    return model,rmse,r2
 
-def save(model,path):
+def _save_atomic(value, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(value, tmp)
+    os.replace(tmp, path)
+
+
+def _load_checkpoint(directory, key):
+    """ (model, history, shards) of the checkpoint in `directory`, or None if there is none for this fit. """
+    try:
+        state = joblib.load(os.path.join(directory, "state.pkl"))
+        if state["key"] != key:
+            return None
+        trees = []
+        for _, _, name in state["shards"]:
+            trees.extend(joblib.load(os.path.join(directory, name)))
+    except Exception:
+        # missing, from another version or cut short by a crash before state.pkl was replaced
+        return None
+    model = state["model"]
+    model.named_steps["rf"].estimators_ = trees
+    return model, state["history"], state["shards"]
+
+
+def _save_checkpoint(directory, key, model, history, shards):
+    """
+    Appends the trees not yet in `shards` as a new shard file, then replaces state.pkl, which holds the model without
+    its trees, the history and the shard list. Each checkpoint writes only the new trees, and a crash leaves the
+    previous state.pkl pointing at complete shards.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rf = model.named_steps["rf"]
+    saved = shards[-1][1] if shards else 0
+    grown = len(rf.estimators_)
+    if grown > saved:
+        name = f"trees-{saved:05d}-{grown:05d}.pkl"
+        _save_atomic(rf.estimators_[saved:], os.path.join(directory, name))
+        shards = shards + [(saved, grown, name)]
+
+    trees = rf.estimators_
+    rf.estimators_ = []
+    try:
+        _save_atomic({"key": key, "model": model, "history": history, "shards": shards},
+                     os.path.join(directory, "state.pkl"))
+    finally:
+        rf.estimators_ = trees
+
+    keep = {name for _, _, name in shards}
+    for name in os.listdir(directory):
+        if name.startswith("trees-") and name not in keep:
+            os.remove(os.path.join(directory, name))
+    return shards
+
+
+def IncrementalTraining(n = 500,split = 0.2,step = 50,n_jobs = None,checkpoint = CHECKPOINT_DIR,patience = None,
+                        min_delta = 0.001,cache = None):
+    """
+    Grows the forest `step` trees at a time with warm_start instead of fitting all `n` at once. After every increment
+    the new trees, the RMSE / R² on the held-out split and the model are checkpointed to the `checkpoint` directory
+    (None to skip), and a later call with the same data and parameters resumes from there: going from 100 to 500 trees
+    only fits the 400 new ones. Tree i only depends on the seed, so the result has the same trees as Training(n).
+
+    With `patience`, growth stops early once the held-out RMSE improved by less than `min_delta` (relative) for
+    `patience` increments in a row. Returns (model, rmse, r2, history), history being one
+    {"trees", "rmse", "r2", "seconds"} per increment. The final fit is stored in the fit cache like Training's.
+    """
+    if step <= 0 or n <= 0:
+        raise ValueError("n and step must be positive")
+    x = preprocess(DATA_PATH)
+    model = _pipeline(x, n, n_jobs)
+    # everything except the size of the forest has to match to continue a checkpoint
+    key = _fit_key(model, split, exclude=("rf__n_estimators", "rf__warm_start"))
+
+    history, shards = [], []
+    resumed = _load_checkpoint(checkpoint, key) if checkpoint else None
+    if resumed is not None:
+        model, history, shards = resumed
+
+    with metrics.timed("health.train.read_csv"):
+        x.train_test(split)
+
+    rf = model.named_steps["rf"]
+    rf.set_params(warm_start=True, n_jobs=training_jobs(n_jobs))
+    grown = len(rf.estimators_) if resumed is not None else 0
+    if grown > n:
+        # a tree does not depend on the ones after it, the first n are exactly a forest of n
+        rf.estimators_ = rf.estimators_[:n]
+        rf.set_params(n_estimators=n)
+        grown = n
+        shards = [shard for shard in shards if shard[1] <= n]
+    history = [h for h in history if h["trees"] <= grown]
+
+    # the held-out predictions are kept as a running sum over trees, so each step only evaluates its new trees
+    X_test, Y_test = None, np.asarray(x.Y_Test, dtype=np.float64)
+    total, summed = np.zeros(len(Y_test)), 0
+
+    def evaluate():
+        nonlocal X_test, total, summed
+        if X_test is None:
+            X_test = check_array(model.named_steps["preprocess"].transform(x.X_Test), dtype=np.float32,
+                                 accept_sparse="csr")
+        for tree in rf.estimators_[summed:grown]:
+            total += tree.predict(X_test, check_input=False)
+        summed = grown
+        Predictions = total / grown
+        return mean_squared_error(Y_test, Predictions) ** 0.5, r2_score(Y_test, Predictions)
+
+    stalled = 0
+    while grown < n:
+        grown = min(grown + step, n)
+        start = time.perf_counter()
+        rf.set_params(n_estimators=grown)
+        with metrics.timed("health.train.increment"):
+            model.fit(x.X_Train, x.Y_Train)
+        rmse, r2 = evaluate()
+        history.append({"trees": grown, "rmse": rmse, "r2": r2, "seconds": time.perf_counter() - start})
+        if checkpoint:
+            shards = _save_checkpoint(checkpoint, key, model, history, shards)
+
+        if patience and len(history) > 1:
+            previous = history[-2]["rmse"]
+            stalled = stalled + 1 if previous - rmse < min_delta * previous else 0
+            if stalled >= patience:
+                break
+
+    if not history or history[-1]["trees"] != grown:
+        rmse, r2 = evaluate()
+        history.append({"trees": grown, "rmse": rmse, "r2": r2, "seconds": 0.0})
+    rmse, r2 = history[-1]["rmse"], history[-1]["r2"]
+
+    rf.set_params(warm_start=False)
+    fit_cache = default_cache() if cache is None else cache or None
+    if fit_cache is not None:
+        fit_cache.put(_fit_key(model, split), {"model": model, "rmse": rmse, "r2": r2})
+    return model, rmse, r2, history
+
+def save(model,path,compact=None):
+    """
+    Writes the pipeline uncompressed with joblib, then the compact forest next to it (compact.compact_path), which
+    single quotes memory-map instead of unpickling the pipeline. `compact` writes the compact forest elsewhere, for a
+    pickle saved under a temporary name that is renamed into place later.
+    """
+    from Health_Insurance.compact import compact_path, compact_pipeline, save_compact
+
     joblib.dump(model, path)
+    save_compact(compact_pipeline(model), compact or compact_path(path), source=path)
+
+def main(argv=None):
+    """ Command line entry point, training only ever happens through here or by calling Training() directly. """
+    parser = argparse.ArgumentParser(description="Train the health insurance random forest.")
+    parser.add_argument("--trees", type=int, default=500, help="number of trees in the forest")
+    parser.add_argument("--split", type=float, default=0.2, help="fraction of rows held out for the test set")
+    parser.add_argument("--jobs", type=int, default=None, help="threads used for fitting (default all cores)")
+    parser.add_argument("--output", default="Health_Insurance/random_forest.pkl", help="where to save the model")
+    parser.add_argument("--no-cache", action="store_true", help="refit even if an identical fit is cached")
+    parser.add_argument("--step", type=int, default=None,
+                        help="grow the forest this many trees at a time, checkpointing after each step")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_DIR, help="checkpoint directory for --step")
+    parser.add_argument("--patience", type=int, default=None,
+                        help="with --step, stop once RMSE stalls for this many steps")
+    args = parser.parse_args(argv)
 
-model,rmse,r2 = Training(100,0.1)
-save(model,"Health_Insurance/Test_run.pkl")
+    cache = False if args.no_cache else None
+    if args.step:
+        model,rmse,r2,history = IncrementalTraining(args.trees, args.split, args.step, args.jobs, args.checkpoint,
+                                                    args.patience, cache=cache)
+        for h in history:
+            print(f"{h['trees']:5d} trees  RMSE={h['rmse']:.2f}  R2={h['r2']:.4f}  ({h['seconds']:.1f}s)")
+    else:
+        model,rmse,r2 = Training(args.trees, args.split, args.jobs, cache=cache)
+    save(model, args.output)
+    print(f"Saved model to {args.output} (RMSE={rmse:.2f}, R2={r2:.4f})")
 
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+
+import numpy as np
 import pandas as pd
-import pickle
 import os
 
 from Home_Insurance.Risk_factor import data 
+from Insurance_Core import metrics
+from Insurance_Core.encoding import encode_row, home_encoders
+from Insurance_Core.registry import registry
 
 class ModelFileNotFoundError(Exception):
     pass
@@ -28,21 +32,73 @@ class Predict(data):
         self.model_path = model_path
         self.feature_path = feature_path
 
-        with open(self.model_path, "rb") as f:
-            self.model = pickle.load(f)
+        # Loaded once per process and shared between Predict objects
+        with metrics.timed("home.load"):
+            self.model = registry.get(self.model_path)
+            self.features = registry.get(self.feature_path)
+
+        # Linear models are scored with a plain dot product, anything else goes through the pandas path
+        self.coef = None
+        self.intercept = 0.0
+        if hasattr(self.model, "coef_") and np.ndim(self.model.coef_) == 1:
+            self.coef = np.asarray(self.model.coef_, dtype=np.float64)
+            self.intercept = float(np.ravel(self.model.intercept_)[0])
+        self.encoders = home_encoders(self.features, self.YES_NO_COLUMNS)
+
+    def encode_row(self, input_dict: dict) -> np.ndarray:
+        """ Feature vector in training order, same values as encoding() + reindex(fill_value=0) for one row. """
+        return encode_row(input_dict, self.encoders)
 
-        with open(self.feature_path, "rb") as f:
-            self.features = pickle.load(f)
+    def encode_rows(self, records) -> np.ndarray:
+        """ (n, n_features) matrix for a list of dicts or a DataFrame. """
+        if isinstance(records, pd.DataFrame):
+            records = records.to_dict("records")
+        return np.array([self.encode_row(r) for r in records]).reshape(-1, len(self.encoders))
 
     def predict_price(self, input_dict: dict) -> float:
+        if self.coef is None:
+            return self.predict_price_reference(input_dict)
+
+        with metrics.timed("home.predict.encode"):
+            x = self.encode_row(input_dict)
+        if not np.all(np.isfinite(x)):
+            raise ValueError("Input contains NaN or infinity.")
+        with metrics.timed("home.predict.model"):
+            pred = float(np.dot(x, self.coef)) + self.intercept
+
+        return round(pred, 2)
+
+    def predict_batch(self, X) -> np.ndarray:
+        """
+        Prices many homes at once. `X` is an already encoded (n, n_features) matrix in `self.features` order, or a
+        list of input dicts / DataFrame which is encoded first. Returns premiums rounded to 2 decimals.
+        """
+        if isinstance(X, pd.DataFrame) or (isinstance(X, (list, tuple)) and X and isinstance(X[0], dict)):
+            X = self.encode_rows(X)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"Expected an (n, {len(self.features)}) matrix, got shape {X.shape}.")
+        if not np.all(np.isfinite(X)):
+            raise ValueError("Input contains NaN or infinity.")
+
+        if self.coef is None:
+            pred = self.model.predict(pd.DataFrame(X, columns=self.features))
+        else:
+            pred = X @ self.coef + self.intercept
+        return np.round(pred, 2)
+
+    def predict_price_reference(self, input_dict: dict) -> float:
+        """ The original pandas implementation, kept as the reference for equivalence tests. """
         
-        df = pd.DataFrame([input_dict])
+        with metrics.timed("home.predict.frame"):
+            df = pd.DataFrame([input_dict])
 
-        df = self.encoding(df)
+        with metrics.timed("home.predict.encoding"):
+            df = self.encoding(df)
 
-        df = df.reindex(columns=self.features, fill_value=0)
+            df = df.reindex(columns=self.features, fill_value=0)
 
-        pred = self.model.predict(df)[0]
+        with metrics.timed("home.predict.model"):
+            pred = self.model.predict(df)[0]
 
         return round(pred, 2)
-    
\ No newline at end of file
@@ -1,7 +1,12 @@
 import pandas as pd
 import pickle
+
+import joblib
 from sklearn.linear_model import LinearRegression
 
+from Insurance_Core import metrics
+from Insurance_Core.datasets import load_dataset
+
 class data:
 
     CATEGORICAL_MAPS = {
@@ -15,22 +20,35 @@ class data:
         "Safe_Installed": {"Yes": 1, "No": 0}
     }
 
+    YES_NO_COLUMNS = [
+        "Claim_3_Years",
+        "Owner_Employment_Status",
+        "Accidental_Damage",
+        "Alarm_Present",
+        "Locks_Present",
+        "Flooding",
+        "Safe_Installed",
+    ]
+
     def __init__(self, dir):
         self.path = dir
 
     def encoding(self,df: pd.DataFrame) -> pd.DataFrame:
+        df = self.encode_categoricals(df)
+
+        # Handle numeric NaNs with median (Bedrooms, YearBuilt, premium if any missing)
+        numeric_cols = df.select_dtypes(include="number").columns
+        if len(numeric_cols) > 0:
+            df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+
+        return df
+
+    def encode_categoricals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """ The YES/NO and M/F mapping of encoding() without the median fill, so it can run chunk by chunk. """
         df = df.copy()
 
         # Normalize and map categorical columns
-        for col in [
-            "Claim_3_Years",
-            "Owner_Employment_Status",
-            "Accidental_Damage",
-            "Alarm_Present",
-            "Locks_Present",
-            "Flooding",
-            "Safe_Installed",
-        ]:
+        for col in self.YES_NO_COLUMNS:
             if col in df.columns:
                 df[col] = (
                     df[col]
@@ -52,16 +70,13 @@ class data:
             df["Owner_Sex"] = df["Owner_Sex"].map({"M": 1, "F": 0})
             df["Owner_Sex"] = df["Owner_Sex"].fillna(0)
 
-        # Handle numeric NaNs with median (Bedrooms, YearBuilt, premium if any missing)
-        numeric_cols = df.select_dtypes(include="number").columns
-        if len(numeric_cols) > 0:
-            df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
-
         return df
 
     def preprocess(self):
         try:
-            self.data = pd.read_csv(self.path)
+            with metrics.timed("home.train.read_csv"):
+                # typed columns from the columnar cache, the CSV is only parsed when it changed
+                self.data = load_dataset("home", self.path)
 
         except FileNotFoundError:
             raise FileNotFoundError(f"CSV file not found at path: {self.path}")
@@ -69,7 +84,8 @@ class data:
         except pd.errors.EmptyDataError:
             raise ValueError("CSV file is empty")
 
-        encoded = self.encoding(self.data)
+        with metrics.timed("home.train.encoding"):
+            encoded = self.encoding(self.data)
         self.predictors = encoded.drop("Annual_Premium_Price", axis=1)
         self.response = encoded["Annual_Premium_Price"]
         
@@ -78,13 +94,39 @@ class data:
         
     def train(self):
         self.model = LinearRegression()
-        self.model.fit(self.X, self.response)
+        with metrics.timed("home.train.fit"):
+            self.model.fit(self.X, self.response)
+
+    def train_streaming(self, chunksize=100000, state_path=None):
+        """
+        Same model as preprocess() + train(), but the CSV is read `chunksize` rows at a time. With `state_path` the
+        statistics of earlier runs are loaded from there first and the new rows are added on top, then saved back.
+        """
+        import os
+        from Home_Insurance.streaming import StreamingTrainer
+
+        if state_path and os.path.exists(state_path):
+            trainer = StreamingTrainer.load_state(state_path)
+        else:
+            trainer = StreamingTrainer()
+        try:
+            with metrics.timed("home.train.streaming"):
+                trainer.fit_csv(self.path, chunksize)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"CSV file not found at path: {self.path}")
+        except pd.errors.EmptyDataError:
+            raise ValueError("CSV file is empty")
+        if state_path:
+            trainer.save_state(state_path)
+
+        self.model = trainer.solve()
+        self.features = trainer.features
 
-    def save(self):
-        with open("Home_Insurance/Linear_Regression.pkl","wb") as f:
-            pickle.dump(self.model, f)
+    def save(self, model_path="Home_Insurance/Linear_Regression.pkl", feature_path="Home_Insurance/Feature_names.pkl"):
+        # uncompressed joblib, so the registry can memory-map the coefficient arrays (registry.mmap_load)
+        joblib.dump(self.model, model_path)
 
-        with open("Home_Insurance/Feature_names.pkl","wb") as f:
+        with open(feature_path,"wb") as f:
             pickle.dump(self.features, f)
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 from .Risk_factor import data
 from .Premium_calculator import Predict
+from .predictor import HomePredictor
 
-_all_ = ["data", "Predict"]
\ No newline at end of file
+_all_ = ["data", "Predict", "HomePredictor"]
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+predictor.py
+----------------------------------------
+`HomePredictor` is a read-only scorer for the home model that can be shared by any number of threads. `Predict`
+inherits from `data` and keeps the model path in its CSV path slot, so it is built per request; a HomePredictor is
+built once from the two artifacts and only holds the coefficients, the intercept and the encoders.
+
+    predictor = HomePredictor.load("Home_Insurance/Linear_Regression.pkl", "Home_Insurance/Feature_names.pkl")
+    predictor.predict_one({"Owner_Sex": "M", "Bedrooms": 3, ...})   # == Predict(...).predict_price(...)
+    predictor.predict_batch(frame)                                   # == Predict(...).predict_batch(frame)
+
+A DataFrame or dict of columns is encoded column by column, one lookup per distinct value, and scored with one
+matrix product that runs without the GIL.
+"""
+import math
+import os
+
+import numpy as np
+
+from Insurance_Core.encoding import encode_row, home_encoders
+from Insurance_Core.registry import registry
+
+from .Premium_calculator import FeatureFileNotFoundError, ModelFileNotFoundError
+from .Risk_factor import data
+
+
+class HomePredictor:
+    """ Immutable, thread-safe scorer for a fitted home model. """
+    __slots__ = ("features", "encoders", "coef", "intercept", "model")
+
+    def __init__(self, model, features):
+        features = tuple(features)
+        encoders = home_encoders(features, data.YES_NO_COLUMNS)
+
+        coef, intercept = None, 0.0
+        # Linear models are a dot product, anything else is handed the encoded matrix as a DataFrame
+        if hasattr(model, "coef_") and np.ndim(model.coef_) == 1:
+            coef = np.array(model.coef_, dtype=np.float64)
+            coef.flags.writeable = False
+            intercept = float(np.ravel(model.intercept_)[0])
+        object.__setattr__(self, "features", features)
+        object.__setattr__(self, "encoders", tuple(encoders))
+        object.__setattr__(self, "coef", coef)
+        object.__setattr__(self, "intercept", intercept)
+        object.__setattr__(self, "model", model)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"HomePredictor(features={len(self.features)}, linear={self.coef is not None})"
+
+    @classmethod
+    def load(cls, model_path, feature_path):
+        """ Builds a predictor from the artifacts in the registry (loaded once per process). """
+        if not os.path.exists(model_path):
+            raise ModelFileNotFoundError(f"Model file not found at: {model_path}")
+        if not os.path.exists(feature_path):
+            raise FeatureFileNotFoundError(f"Feature file not found at: {feature_path}")
+        return cls(registry.get(model_path), registry.get(feature_path))
+
+    def encode_one(self, record):
+        """ Feature vector of one record dict, same as Predict.encode_row. """
+        return encode_row(record, self.encoders)
+
+    def encode(self, records):
+        """ (n, n_features) matrix for a DataFrame, a dict of columns or a list of record dicts. """
+        if not (isinstance(records, dict) or hasattr(records, "columns")):
+            return np.array([self.encode_one(r) for r in records]).reshape(-1, len(self.encoders))
+
+        n = max((len(records[col]) for col, _ in self.encoders if col in records), default=0)
+        X = np.zeros((n, len(self.encoders)))
+        for j, (col, table) in enumerate(self.encoders):
+            if col not in records:
+                continue
+            values = np.asarray(records[col], dtype=object if table is not None else None)
+            if table is not None:
+                codes = {v: table.get(str(v).strip().upper(), 0.0) for v in dict.fromkeys(values.tolist())}
+                X[:, j] = np.fromiter(map(codes.__getitem__, values.tolist()), dtype=np.float64, count=n)
+            elif values.dtype == object:
+                X[:, j] = [math.nan if v is None else float(v) for v in values.tolist()]
+            else:
+                X[:, j] = values
+        return X
+
+    def predict_one(self, record):
+        """ Premium for one record dict, rounded to 2 decimals. """
+        x = self.encode_one(record)
+        if not np.all(np.isfinite(x)):
+            raise ValueError("Input contains NaN or infinity.")
+        if self.coef is None:
+            return round(float(self._predict_model(x[None, :])[0]), 2)
+        return round(float(np.dot(x, self.coef)) + self.intercept, 2)
+
+    def predict_batch(self, records):
+        """
+        Premiums for a DataFrame, a dict of columns, a list of record dicts or an already encoded (n, n_features)
+        matrix. Returns an array rounded to 2 decimals.
+        """
+        if isinstance(records, dict) or hasattr(records, "columns") or (
+                isinstance(records, (list, tuple)) and records and isinstance(records[0], dict)):
+            X = self.encode(records)
+        else:
+            X = np.asarray(records, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.features):
+            raise ValueError(f"Expected an (n, {len(self.features)}) matrix, got shape {X.shape}.")
+        if not np.all(np.isfinite(X)):
+            raise ValueError("Input contains NaN or infinity.")
+
+        if self.coef is None:
+            return np.round(self._predict_model(X), 2)
+        return np.round(X @ self.coef + self.intercept, 2)
+
+    def _predict_model(self, X):
+        import pandas as pd
+
+        return np.asarray(self.model.predict(pd.DataFrame(X, columns=list(self.features))), dtype=np.float64)
@@ -0,0 +1,187 @@
+"""
+streaming.py
+----------------------------------------
+Out-of-core training for the home premium linear model. The CSV is read in chunks and each chunk is reduced to
+sufficient statistics, so memory does not grow with the number of rows, and new rows can be folded into a saved state
+later without re-reading the old ones.
+
+data.encoding() fills missing numeric values with the column median over the whole file, which is only known at the
+end. With Z the chunk (intercept column, predictors, response) with missing values set to 0 and P its presence mask,
+the imputed Gram matrix is
+
+    G[j, k] = S[j, k] + m[k] * A[j, k] + m[j] * A[k, j] + m[j] * m[k] * C[j, k]
+
+where S = ZᵀZ, A = Zᵀ(1 - P), C = (1 - P)ᵀ(1 - P) and m are the medians. S, A and C add up over chunks, and the
+medians come from a per-column value-count sketch (exact for discrete columns, bounded by `max_bins` otherwise).
+The coefficients are then solved from G exactly as LinearRegression would fit the fully imputed matrix.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from Home_Insurance.Risk_factor import data
+
+RESPONSE = "Annual_Premium_Price"
+
+
+class MedianSketch:
+    """ Sorted (value, count) pairs of one column. Past `max_bins` distinct values neighbours are merged. """
+
+    def __init__(self, max_bins=20000, values=None, counts=None):
+        self.max_bins = max_bins
+        self.values = np.empty(0) if values is None else np.asarray(values, dtype=np.float64)
+        self.counts = np.empty(0) if counts is None else np.asarray(counts, dtype=np.float64)
+
+    def update(self, column):
+        column = column[~np.isnan(column)]
+        if not len(column):
+            return
+        merged = np.concatenate([self.values, column])
+        weights = np.concatenate([self.counts, np.ones(len(column))])
+        values, inverse = np.unique(merged, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+        while len(values) > self.max_bins:
+            # merge neighbouring pairs into their weighted mean
+            n = len(values) // 2 * 2
+            c = counts[:n].reshape(-1, 2).sum(axis=1)
+            v = (values[:n] * counts[:n]).reshape(-1, 2).sum(axis=1) / c
+            values = np.concatenate([v, values[n:]])
+            counts = np.concatenate([c, counts[n:]])
+        self.values, self.counts = values, counts
+
+    def median(self):
+        """ Same as pandas' median (mean of the two middle values for an even count), NaN when empty. """
+        total = self.counts.sum()
+        if total == 0:
+            return np.nan
+        cum = np.cumsum(self.counts)
+        lo = self.values[np.searchsorted(cum, (total - 1) // 2, side="right")]
+        hi = self.values[np.searchsorted(cum, total // 2, side="right")]
+        return (lo + hi) / 2
+
+
+class StreamingTrainer:
+    """
+    Accumulates the statistics of the imputed linear regression chunk by chunk. `partial_fit` raw DataFrame chunks
+    (or `fit_csv` a whole file), then `solve()` for a fitted LinearRegression.
+    """
+
+    def __init__(self, response=RESPONSE, max_bins=20000):
+        self.response = response
+        self.max_bins = max_bins
+        self.encoder = data(None)
+        self.columns = None
+        self.n = 0
+
+    def _start(self, columns, Z):
+        self.columns = list(columns)
+        q = len(self.columns) + 1
+        # shifting by the first chunk's means keeps the sums small and well conditioned, the fit is shift invariant
+        with np.errstate(invalid="ignore"):
+            shift = np.nanmean(Z, axis=0)
+        self.shift = np.where(np.isnan(shift), 0.0, shift)
+        self.shift[0] = 0.0
+        self.S = np.zeros((q, q))
+        self.A = np.zeros((q, q))
+        self.C = np.zeros((q, q))
+        self.sketches = [MedianSketch(self.max_bins) for _ in range(q)]
+
+    def partial_fit(self, chunk: pd.DataFrame):
+        """ Folds one raw chunk (same columns as dataset.csv) into the statistics. """
+        encoded = self.encoder.encode_categoricals(chunk)
+        predictors = [c for c in encoded.columns if c != self.response]
+        columns = predictors + [self.response]
+        if self.columns is not None and columns != self.columns:
+            raise ValueError(f"Chunk columns {columns} do not match {self.columns}")
+
+        values = encoded[columns].astype(float).to_numpy()
+        Z = np.column_stack([np.ones(len(values)), values])
+        if self.columns is None:
+            self._start(columns, Z)
+
+        for j in range(1, Z.shape[1]):
+            self.sketches[j].update(Z[:, j])
+        present = ~np.isnan(Z)
+        missing = (~present).astype(np.float64)
+        Z0 = np.where(present, Z - self.shift, 0.0)
+
+        self.S += Z0.T @ Z0
+        self.A += Z0.T @ missing
+        self.C += missing.T @ missing
+        self.n += len(Z)
+        return self
+
+    def fit_csv(self, path, chunksize=100000):
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            self.partial_fit(chunk)
+        return self
+
+    def medians(self):
+        """ {column: median} over every row seen so far. """
+        return {col: self.sketches[j + 1].median() for j, col in enumerate(self.columns)}
+
+    def gram(self):
+        """ ZᵀZ of the median-imputed (shifted) data. """
+        m = np.array([0.0] + [s.median() for s in self.sketches[1:]]) - self.shift
+        m[0] = 0.0
+        G = self.S + self.A * m[None, :] + (self.A * m[None, :]).T + self.C * np.outer(m, m)
+        return G
+
+    def solve(self):
+        """ LinearRegression with the same coefficients as fitting the fully imputed data in memory. """
+        if self.n == 0:
+            raise ValueError("No rows seen yet.")
+        G = self.gram()
+        p = len(self.columns) - 1
+        n = G[0, 0]
+        sx = G[0, 1:p + 1]
+        sy = G[0, p + 1]
+        Sxx = G[1:p + 1, 1:p + 1] - np.outer(sx, sx) / n
+        Sxy = G[1:p + 1, p + 1] - sx * sy / n
+        coef = np.linalg.lstsq(Sxx, Sxy, rcond=None)[0]
+        intercept = (sy - sx @ coef) / n
+
+        # undo the shift: y - ry = b0 + sum(b * (x - rx))
+        rx = self.shift[1:p + 1]
+        ry = self.shift[p + 1]
+        model = LinearRegression()
+        model.coef_ = coef
+        model.intercept_ = float(intercept + ry - rx @ coef)
+        model.n_features_in_ = p
+        model.feature_names_in_ = np.array(self.columns[:p], dtype=object)
+        return model
+
+    @property
+    def features(self):
+        return self.columns[:-1]
+
+    def save_state(self, path):
+        """ Saves the statistics (not the rows) so more data can be added later with load_state + partial_fit. """
+        sketch_values = np.concatenate([s.values for s in self.sketches[1:]])
+        sketch_counts = np.concatenate([s.counts for s in self.sketches[1:]])
+        sketch_sizes = np.array([len(s.values) for s in self.sketches[1:]])
+        # through a file object, np.savez would append ".npz" to a path without that suffix
+        with open(path, "wb") as f:
+            np.savez(
+                f, S=self.S, A=self.A, C=self.C, n=self.n, shift=self.shift,
+                columns=np.array(self.columns), response=self.response, max_bins=self.max_bins,
+                sketch_values=sketch_values, sketch_counts=sketch_counts, sketch_sizes=sketch_sizes,
+            )
+
+    @classmethod
+    def load_state(cls, path):
+        with np.load(path, allow_pickle=False) as state:
+            trainer = cls(str(state["response"]), int(state["max_bins"]))
+            trainer.columns = [str(c) for c in state["columns"]]
+            trainer.S, trainer.A, trainer.C = state["S"], state["A"], state["C"]
+            trainer.n = int(state["n"])
+            trainer.shift = state["shift"]
+            trainer.sketches = [MedianSketch(trainer.max_bins)]
+            start = 0
+            for size in state["sketch_sizes"]:
+                trainer.sketches.append(MedianSketch(
+                    trainer.max_bins, state["sketch_values"][start:start + size],
+                    state["sketch_counts"][start:start + size],
+                ))
+                start += size
+        return trainer
@@ -0,0 +1,5 @@
+"""
+Insurance Core Sub-Package
+Shared infrastructure used by the car, home and health sub-packages (model loading, serving, caching). Importing it
+has no side effects, import the individual modules directly, e.g. `from Insurance_Core.registry import registry`.
+"""
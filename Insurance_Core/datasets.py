@@ -0,0 +1,266 @@
+"""
+datasets.py
+----------------------------------------
+Typed loading of the training datasets through an on-disk columnar cache. Every dataset has a declared `Schema`: the
+columns it uses, their dtypes and which columns are categorical. The first load parses the CSV once, then writes every
+column as its own `.npy` file, with categoricals stored as small integer codes plus their categories. The cache
+directory is keyed by the sha256 of the CSV and a digest of the schema. Later loads memory-map the columns instead of
+parsing text. Edit the CSV or the schema and the next load builds a fresh cache entry.
+
+    frame = load_dataset("health")                          # Health_Insurance/insurance_data.csv
+    frame = load_dataset("home", "Home_Insurance/dataset.csv")
+
+The cache lives in the directory named by `INSURANCE_DATASET_CACHE`, e.g. `.dataset_cache`. Unset (or "off") the CSV
+is parsed every time, still with the schema's dtypes. Hashing a large CSV costs about as much as reading it once, so
+the hash is remembered next to the file's size and mtime in `index.json` and only recomputed when those change.
+
+A cache entry is written to a temporary directory and renamed into place, so a process never sees half an entry.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+CACHE_ENV = "INSURANCE_DATASET_CACHE"
+CACHE_FORMAT = 1
+CATEGORY = "category"
+
+
+class Schema:
+    """
+    Declared layout of one CSV. `columns` maps column name -> NumPy dtype or "category". `required` columns must be in
+    the file (default all). With `extra=True` undeclared columns are kept as well: numeric ones as pandas read them,
+    text ones as categoricals. `rename` maps CSV headers to column names, applied before anything else.
+    """
+
+    def __init__(self, name, path, columns, required=None, extra=False, rename=None):
+        self.name = name
+        self.path = path
+        self.columns = dict(columns)
+        self.required = list(self.columns) if required is None else list(required)
+        self.extra = extra
+        self.rename = dict(rename or {})
+
+    def __repr__(self):
+        return f"Schema({self.name!r}, columns={len(self.columns)}, extra={self.extra})"
+
+    def digest(self):
+        spec = [self.name, sorted(self.columns.items()), self.required, self.extra, sorted(self.rename.items()),
+                CACHE_FORMAT]
+        return hashlib.sha256(json.dumps(spec).encode()).hexdigest()[:12]
+
+
+YES_NO = ["Claim_3_Years", "Owner_Employment_Status", "Accidental_Damage", "Alarm_Present", "Locks_Present",
+          "Flooding", "Safe_Installed"]
+
+SCHEMAS = {
+    "health": Schema("health", "Health_Insurance/insurance_data.csv", {
+        "age": "int16", "sex": CATEGORY, "bmi": "float64", "children": "int8", "smoker": CATEGORY,
+        "region": CATEGORY, "charges": "float64",
+    }),
+    # data.preprocess uses every column of the file as a predictor, so other columns are kept
+    "home": Schema("home", "Home_Insurance/dataset.csv", {
+        **{col: CATEGORY for col in YES_NO},
+        "Owner_Sex": CATEGORY, "Bedrooms": "float64", "YearBuilt": "float64", "Annual_Premium_Price": "float64",
+    }, required=["Annual_Premium_Price"], extra=True),
+    "car": Schema("car", "Car_Insurance/Dataset/car_insurance_premium_dataset.csv", {
+        "driver_age": "int16", "driver_experience": "int16", "previous_accidents": "int8",
+        "annual_mileage_k": "int16", "car_manufacturing_year": "int16", "car_age": "int16", "premium": "float64",
+    }, rename={
+        "Driver Age": "driver_age", "Driver Experience": "driver_experience",
+        "Previous Accidents": "previous_accidents", "Annual Mileage (x1000 km)": "annual_mileage_k",
+        "Car Manufacturing Year": "car_manufacturing_year", "Car Age": "car_age", "Insurance Premium ($)": "premium",
+    }),
+}
+
+_index_lock = threading.Lock()
+
+
+def cache_dir():
+    """ The cache directory, or None when caching is off (INSURANCE_DATASET_CACHE unset or "off"). """
+    value = os.environ.get(CACHE_ENV, "").strip()
+    if value.lower() in ("", "0", "off", "false", "no"):
+        return None
+    return value
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_hash(path, directory=None):
+    """ sha256 of a dataset file, through the cache's hash index unless caching is off. """
+    directory = directory or cache_dir()
+    if directory is None:
+        return file_hash(path)
+    os.makedirs(directory, exist_ok=True)
+    return _cached_hash(path, directory)
+
+
+def _cached_hash(path, directory):
+    """ sha256 of `path`, reusing the one in index.json while the file's size and mtime are unchanged. """
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    index_path = os.path.join(directory, "index.json")
+    with _index_lock:
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = {}
+        entry = index.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+
+        digest = file_hash(path)
+        # forget files that are gone (temporary CSVs), so the index does not grow forever
+        index = {k: v for k, v in index.items() if os.path.exists(k)}
+        index[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        tmp = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, index_path)
+        return digest
+
+
+def _typed_column(schema, name, series):
+    """ (kind, values, categories) for one parsed column, checked against the declared dtype. """
+    dtype = schema.columns.get(name)
+    if dtype is None:
+        # undeclared column of an extra=True schema
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return "numeric", np.asarray(series), None
+        dtype = CATEGORY
+
+    if dtype == CATEGORY:
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(str).where(series.notna()).astype(CATEGORY)
+        categories = [str(c) for c in series.cat.categories]
+        codes = series.cat.codes.to_numpy()
+        code_dtype = np.int8 if len(categories) < 127 else np.int16 if len(categories) < 32767 else np.int32
+        codes = codes.astype(code_dtype)
+        return "category", codes, categories
+
+    target = np.dtype(dtype)
+    numeric = pd.to_numeric(series, errors="coerce")
+    bad = numeric.isna() & series.notna()
+    if bad.any():
+        raise ValueError(f"{schema.name}: column {name!r} has non-numeric values, e.g. {series[bad].iloc[0]!r}")
+    values = numeric.to_numpy(dtype=np.float64)
+    if target.kind in "iu":
+        if not np.all(np.isfinite(values)) or np.any(values != np.round(values)):
+            raise ValueError(f"{schema.name}: column {name!r} is declared {dtype} but has missing or fractional values")
+        info = np.iinfo(target)
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            raise ValueError(f"{schema.name}: column {name!r} does not fit in {dtype}")
+    return "numeric", values.astype(target), None
+
+
+def parse_csv(schema, path=None):
+    """
+    Parses the CSV with the schema and returns {column: (kind, values, categories)} in file order. Raises
+    FileNotFoundError, pandas' EmptyDataError, or ValueError when the file does not match the schema.
+    """
+    path = path or schema.path
+    # the C parser builds declared categoricals directly, without a column of Python strings
+    headers = {schema.rename.get(h, h): h for h in pd.read_csv(path, nrows=0).columns}
+    dtypes = {headers[col]: CATEGORY for col, dtype in schema.columns.items() if dtype == CATEGORY and col in headers}
+    frame = pd.read_csv(path, dtype=dtypes).rename(columns=schema.rename)
+    missing = [col for col in schema.required if col not in frame.columns]
+    if missing:
+        raise ValueError(f"{path} is missing the {schema.name} columns {missing}")
+    names = [col for col in frame.columns if schema.extra or col in schema.columns]
+    return {name: _typed_column(schema, name, frame[name]) for name in names}
+
+
+def _to_frame(columns, n_rows):
+    data = {}
+    for name, (kind, values, categories) in columns.items():
+        if kind == "category":
+            data[name] = pd.Categorical.from_codes(np.asarray(values), categories=categories)
+        else:
+            data[name] = values
+    return pd.DataFrame(data, index=pd.RangeIndex(n_rows), copy=False)
+
+
+def _write_entry(directory, schema, path, digest, columns):
+    tmp = f"{directory}.{os.getpid()}.{threading.get_ident()}.tmp"
+    os.makedirs(tmp)
+    meta = {"format": CACHE_FORMAT, "schema": schema.name, "source": os.path.abspath(path), "sha256": digest,
+            "rows": 0, "columns": []}
+    for i, (name, (kind, values, categories)) in enumerate(columns.items()):
+        filename = f"{i:03d}.npy"
+        np.save(os.path.join(tmp, filename), values)
+        meta["rows"] = len(values)
+        meta["columns"].append({"name": name, "kind": kind, "dtype": str(values.dtype), "file": filename,
+                                "categories": categories})
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    try:
+        os.rename(tmp, directory)
+    except OSError:
+        # another process finished the same entry first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read_entry(directory, mmap=True):
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    columns = {}
+    for col in meta["columns"]:
+        # an empty file cannot be memory-mapped
+        mode = "r" if mmap and meta["rows"] else None
+        values = np.load(os.path.join(directory, col["file"]), mmap_mode=mode)
+        columns[col["name"]] = (col["kind"], values, col["categories"])
+    return meta, columns
+
+
+def _entry_path(schema, digest, directory):
+    return os.path.join(directory, f"{schema.name}-{digest[:16]}-{schema.digest()}")
+
+
+def load_dataset(schema, path=None, columns=None, directory=None, mmap=True):
+    """
+    The dataset as a DataFrame with the schema's dtypes. `schema` is a Schema or a name in SCHEMAS, `path` defaults to
+    the schema's file and `columns` selects a subset. Numeric columns are read-only memory maps of the cache when
+    `mmap` is set (pandas copies them on write).
+    """
+    if isinstance(schema, str):
+        schema = SCHEMAS[schema]
+    path = path or schema.path
+    directory = directory or cache_dir()
+
+    if directory is None:
+        parsed = parse_csv(schema, path)
+    else:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Dataset not found at path: {path}")
+        os.makedirs(directory, exist_ok=True)
+        digest = _cached_hash(path, directory)
+        entry = _entry_path(schema, digest, directory)
+        if not os.path.exists(os.path.join(entry, "meta.json")):
+            _write_entry(entry, schema, path, digest, parse_csv(schema, path))
+        _, parsed = _read_entry(entry, mmap)
+
+    if columns is not None:
+        missing = [col for col in columns if col not in parsed]
+        if missing:
+            raise KeyError(f"{schema.name} has no columns {missing}")
+        parsed = {col: parsed[col] for col in columns}
+    n_rows = len(next(iter(parsed.values()))[1]) if parsed else 0
+    return _to_frame(parsed, n_rows)
+
+
+def clear_cache(directory=None):
+    """ Removes every cache entry (and the hash index). """
+    directory = directory or cache_dir()
+    if directory and os.path.isdir(directory):
+        shutil.rmtree(directory)
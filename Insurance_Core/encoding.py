@@ -0,0 +1,43 @@
+"""
+encoding.py
+----------------------------------------
+The home model's row encoding, in one place for `Predict`, `HomePredictor` and the NumPy-only bundle runtime. It lives
+here rather than in Home_Insurance because importing that package imports pandas.
+
+    encoders = home_encoders(features, data.YES_NO_COLUMNS)
+    x = encode_row({"Owner_Sex": "M", "Bedrooms": 3}, encoders)
+"""
+import math
+
+import numpy as np
+
+# Lookup tables matching data.encoding, values are stripped and upper-cased first, anything else encodes to 0
+YES_NO_TABLE = {"YES": 1.0, "NO": 0.0}
+SEX_TABLE = {"M": 1.0, "F": 0.0}
+
+
+def home_encoders(features, yes_no_columns):
+    """ [(column, lookup table or None for numeric columns)] in training order. """
+    encoders = []
+    for col in features:
+        if col in yes_no_columns:
+            encoders.append((col, YES_NO_TABLE))
+        elif col == "Owner_Sex":
+            encoders.append((col, SEX_TABLE))
+        else:
+            encoders.append((col, None))
+    return encoders
+
+
+def encode_row(record, encoders):
+    """ Feature vector of one record dict, same values as data.encoding() + reindex(fill_value=0) for one row. """
+    x = np.zeros(len(encoders))
+    for j, (col, table) in enumerate(encoders):
+        if col not in record:
+            continue
+        value = record[col]
+        if table is not None:
+            x[j] = table.get(str(value).strip().upper(), 0.0)
+        else:
+            x[j] = math.nan if value is None else float(value)
+    return x
@@ -0,0 +1,159 @@
+"""
+export.py
+----------------------------------------
+Exports the fitted models into one dependency-free bundle: `<prefix>.npz` with every array and `<prefix>.json`, a
+manifest with everything else (feature order, encoders, categories, table offsets, base cost) plus the sha256 of the
+npz. `Insurance_Core.runtime` loads and scores a bundle with NumPy alone, so a CLI quote or a short batch job does not
+pay for importing pandas and scikit-learn.
+
+    python -m Insurance_Core.export models/bundle                 # car tables, home model and health forest
+    python -m Insurance_Core.export models/bundle --no-health
+
+Array names are prefixed by product: `car/age`, `home/coef`, `health/threshold`, ... Both files are written to a
+temporary name and renamed into place, the manifest last, so a reader that finds the manifest finds a complete npz.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+
+import numpy as np
+
+from .prefork import HEALTH_MODEL_PATH, HOME_FEATURE_PATH, HOME_MODEL_PATH
+
+FORMAT_VERSION = 1
+# car input -> (rating table in Car_Insurance.preprocessing, how the input is turned into a table key)
+CAR_AXES = [
+    ("age", "Age_Table", "value"),
+    ("annual_km", "Mileage_Table", "thousands"),
+    ("car_age", "Car_Age_Table", "value"),
+    ("exp_years", "Experience_Table", "value"),
+    ("num_accidents", "Accident_Table", "value"),
+]
+
+
+def _export_car(base_cost=None):
+    from Car_Insurance import preprocessing
+    from Car_Insurance.training import CarInsurance
+
+    model = CarInsurance() if base_cost is None else CarInsurance(base_cost)
+    arrays, axes = {}, []
+    for name, table_name, key in CAR_AXES:
+        table = getattr(preprocessing, table_name)
+        arrays[f"car/{name}"] = np.array(table.values)
+        axes.append({"name": name, "offset": table.offset, "default": table.default, "key": key})
+    types = list(model.Vehicle_Type_Multipliers)
+    arrays["car/vehicle"] = np.array([model.Vehicle_Type_Multipliers[t] for t in types], dtype=np.float64)
+    return arrays, {"base_cost": model.base_cost, "axes": axes, "vehicle_types": types, "vehicle_default": 1.0}
+
+
+def _export_home(model_path, feature_path):
+    from Home_Insurance.Risk_factor import data
+
+    from .encoding import home_encoders
+    from .registry import mmap_load
+
+    for path in (model_path, feature_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Home artifact not found at: {path}")
+    model = mmap_load(model_path)
+    features = [str(f) for f in mmap_load(feature_path)]
+    if not hasattr(model, "coef_") or np.ndim(model.coef_) != 1:
+        raise ValueError("Only a fitted linear model with one target can be exported for home.")
+    if len(model.coef_) != len(features):
+        raise ValueError(f"The model has {len(model.coef_)} coefficients but there are {len(features)} features.")
+
+    encoders = {col: table for col, table in home_encoders(features, data.YES_NO_COLUMNS) if table is not None}
+    arrays = {
+        "home/coef": np.asarray(model.coef_, dtype=np.float64),
+        "home/intercept": np.ravel(np.asarray(model.intercept_, dtype=np.float64))[:1],
+    }
+    return arrays, {"features": features, "encoders": encoders}
+
+
+def _export_health(model_path):
+    from Health_Insurance.compiled import FEATURES, compile_pipeline
+
+    from .threads import load_for_serving
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Health model not found at: {model_path}")
+    forest = compile_pipeline(load_for_serving(model_path))
+    arrays = {f"health/{name}": array for name, array in forest.arrays().items()}
+    return arrays, {"features": FEATURES, "categories": forest.categories, "depth": forest.depth,
+                    "trees": forest.n_trees, "nodes": len(forest.feature)}
+
+
+def _write_atomic(path, payload):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def export_bundle(prefix, car=True, home=(HOME_MODEL_PATH, HOME_FEATURE_PATH), health=HEALTH_MODEL_PATH,
+                  base_cost=None):
+    """
+    Writes `<prefix>.npz` and `<prefix>.json`. `home` is a (model_path, feature_path) pair and `health` a model path,
+    pass None (or car=False) to leave a product out. Returns the manifest.
+    """
+    arrays, products = {}, {}
+    if car:
+        car_arrays, products["car"] = _export_car(base_cost)
+        arrays.update(car_arrays)
+    if home is not None:
+        home_arrays, products["home"] = _export_home(*home)
+        arrays.update(home_arrays)
+    if health is not None:
+        health_arrays, products["health"] = _export_health(health)
+        arrays.update(health_arrays)
+    if not products:
+        raise ValueError("Nothing to export.")
+
+    # uncompressed, np.load then only has to copy the bytes out of the zip
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    payload = buffer.getvalue()
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "npz": os.path.basename(f"{prefix}.npz"),
+        "sha256": hashlib.sha256(payload).hexdigest(),
+        "products": products,
+    }
+    directory = os.path.dirname(os.path.abspath(prefix))
+    os.makedirs(directory, exist_ok=True)
+    _write_atomic(f"{prefix}.npz", payload)
+    _write_atomic(f"{prefix}.json", json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the models into a NumPy-only bundle (.npz + .json).")
+    parser.add_argument("prefix", help="output path without extension")
+    parser.add_argument("--no-car", action="store_true")
+    parser.add_argument("--no-home", action="store_true")
+    parser.add_argument("--no-health", action="store_true")
+    parser.add_argument("--home-model", nargs=2, metavar=("MODEL", "FEATURES"),
+                        default=(HOME_MODEL_PATH, HOME_FEATURE_PATH))
+    parser.add_argument("--health-model", default=HEALTH_MODEL_PATH)
+    parser.add_argument("--base-cost", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    manifest = export_bundle(
+        args.prefix,
+        car=not args.no_car,
+        home=None if args.no_home else tuple(args.home_model),
+        health=None if args.no_health else args.health_model,
+        base_cost=args.base_cost,
+    )
+    size = os.path.getsize(f"{args.prefix}.npz")
+    print(f"Exported {', '.join(manifest['products'])} to {args.prefix}.npz ({size / 1024:.0f} kB) "
+          f"and {args.prefix}.json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+fit_cache.py
+----------------------------------------
+Content-addressed cache of fitted models. A fit is stored under the sha256 of everything that determines its result:
+the dataset hash, the preprocessing configuration, the estimator parameters, the split and seed, and the library
+versions. Asking for the same fit again loads it from disk instead of refitting:
+
+    key = FitCache.key(dataset=dataset_hash(path), params=..., versions=library_versions())
+    hit = cache.get(key)
+    if hit is None:
+        hit = {"model": fit(), ...}
+        cache.put(key, hit)
+
+Entries are joblib files in the directory named by `INSURANCE_FIT_CACHE`, e.g. `.fit_cache`. The cache is off unless
+it is set (or a FitCache is passed explicitly), so library code never writes fits into the working directory on its
+own. The directory is capped at `INSURANCE_FIT_CACHE_MB` (default 1024). When a put goes over the cap, the least
+recently used entries are removed. A hit touches the entry's mtime, so the mtime is the LRU clock and no index has to
+be kept consistent between processes. Entries are written to a temporary file and renamed into place.
+
+`python -m Insurance_Core.fit_cache` lists the entries, `--clear` empties the cache.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import threading
+
+from . import metrics
+
+CACHE_ENV = "INSURANCE_FIT_CACHE"
+SIZE_ENV = "INSURANCE_FIT_CACHE_MB"
+DEFAULT_DIR = ".fit_cache"
+DEFAULT_MB = 1024
+SUFFIX = ".joblib"
+
+
+def library_versions():
+    """ Versions of everything that can change a fitted model or how it unpickles. """
+    import joblib
+    import numpy
+    import pandas
+    import sklearn
+
+    return {"python": platform.python_version(), "numpy": numpy.__version__, "pandas": pandas.__version__,
+            "sklearn": sklearn.__version__, "joblib": joblib.__version__}
+
+
+class FitCache:
+    """ LRU, size-capped directory of fitted models keyed by content hash. """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MB << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __repr__(self):
+        return f"FitCache({self.directory!r}, max_bytes={self.max_bytes})"
+
+    @staticmethod
+    def key(**parts):
+        """ sha256 of the parts as canonical JSON. Values JSON cannot encode (estimators, ...) use their repr. """
+        payload = json.dumps(parts, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key):
+        """ The stored value, or None. An unreadable entry is removed and counts as a miss. """
+        import joblib
+
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+        except FileNotFoundError:
+            value = None
+        except Exception:
+            # truncated or written by an incompatible version
+            self._remove(path)
+            value = None
+        if value is None:
+            self._misses += 1
+            metrics.count("fit_cache.miss")
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self._hits += 1
+        metrics.count("fit_cache.hit")
+        return value
+
+    def put(self, key, value):
+        """ Stores `value` under `key`, then evicts least recently used entries down to the size cap. """
+        import joblib
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(value, tmp)
+        os.replace(tmp, path)
+        self.evict(keep=key)
+        return path
+
+    def entries(self):
+        """ [(key, bytes, last used)] from least to most recently used. """
+        if not os.path.isdir(self.directory):
+            return []
+        out = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            out.append((name[:-len(SUFFIX)], st.st_size, st.st_mtime))
+        return sorted(out, key=lambda e: e[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """ Removes the least recently used entries until the cache fits the cap. `keep` is never removed. """
+        removed = []
+        with self._lock:
+            entries = self.entries()
+            total = sum(size for _, size, _ in entries)
+            for key, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if key == keep:
+                    continue
+                self._remove(self._path(key))
+                total -= size
+                removed.append(key)
+        self._evictions += len(removed)
+        return removed
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            self._remove(self._path(key))
+
+    def stats(self):
+        return {"hits": self._hits, "misses": self._misses, "evictions": self._evictions,
+                "entries": len(self.entries()), "bytes": self.size(), "max_bytes": self.max_bytes}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """ The FitCache configured by the environment, or None when INSURANCE_FIT_CACHE is unset or "off". """
+    global _default
+    directory = os.environ.get(CACHE_ENV, "").strip()
+    if directory.lower() in ("", "0", "off", "false", "no"):
+        return None
+    max_bytes = int(float(os.environ.get(SIZE_ENV, DEFAULT_MB)) * (1 << 20))
+    with _default_lock:
+        if _default is None or _default.directory != directory or _default.max_bytes != max_bytes:
+            _default = FitCache(directory, max_bytes)
+        return _default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List or clear the fit cache.")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args(argv)
+
+    cache = default_cache()
+    if cache is None:
+        print(f"The fit cache is off, set {CACHE_ENV} to a directory (e.g. {DEFAULT_DIR}) to enable it.")
+        return
+    if args.clear:
+        cache.clear()
+    entries = cache.entries()
+    for key, size, _ in entries:
+        print(f"{key[:16]}  {size / 2**20:8.1f} MB")
+    print(f"{len(entries)} entries, {sum(e[1] for e in entries) / 2**20:.1f} of {cache.max_bytes / 2**20:.0f} MB "
+          f"in {cache.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+metrics.py
+----------------------------------------
+Per-stage timers and counters for the prediction and training paths, e.g. how much of a health quote went into
+building the DataFrame, loading the model and predicting.
+
+    with metrics.timed("health.predict.model"):
+        prediction = model.predict(data)
+    metrics.count("registry.hit")
+
+Off by default: `timed` then hands back one shared no-op context manager and `count` returns immediately, so an
+instrumented call pays a function call and a flag check. Turn it on with INSURANCE_METRICS=1 or `enable()`.
+
+Every thread records into its own histograms, so recording takes no lock; `snapshot()` merges all threads. The
+recordings of threads that have finished are folded into one retired store, so a thread-per-request server does not
+keep a store per request. A snapshot taken while other threads record can be a few observations behind, which is fine
+for monitoring. Export with
+`snapshot()` (JSON-able dict) or `prometheus()` (Prometheus text exposition format).
+"""
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from contextlib import nullcontext
+
+METRICS_ENV = "INSURANCE_METRICS"
+
+# Upper bounds of the histogram buckets in seconds, 1-2-5 steps from 1 µs to 50 s, plus an overflow bucket
+BOUNDS = [float(f"{m}e{e}") for e in range(-6, 2) for m in (1, 2, 5)]
+
+_enabled = os.environ.get(METRICS_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+_NOOP = nullcontext()
+_local = threading.local()
+_stores = []  # [weakref to the recording thread, its store]
+_retired = {"timers": {}, "counters": {}}  # everything recorded by threads that have finished
+_stores_lock = threading.Lock()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enabled():
+    return _enabled
+
+
+def _store():
+    try:
+        return _local.store
+    except AttributeError:
+        store = _local.store = {"timers": {}, "counters": {}}
+        # only taken once per thread, when it records for the first time
+        with _stores_lock:
+            _retire_finished()
+            _stores.append((weakref.ref(threading.current_thread()), store))
+        return store
+
+
+def _merge(target, store):
+    for name, (buckets, total) in list(store["timers"].items()):
+        hist = target["timers"].setdefault(name, [[0] * (len(BOUNDS) + 1), 0.0])
+        for i, c in enumerate(list(buckets)):
+            hist[0][i] += c
+        hist[1] += total
+    for name, value in list(store["counters"].items()):
+        target["counters"][name] = target["counters"].get(name, 0) + value
+
+
+def _retire_finished():
+    """ Folds the stores of finished threads into `_retired`. Caller holds `_stores_lock`. """
+    live = []
+    for ref, store in _stores:
+        thread = ref()
+        if thread is not None and thread.is_alive():
+            live.append((ref, store))
+        else:
+            _merge(_retired, store)
+    _stores[:] = live
+
+
+def observe(name, seconds):
+    """ Adds one duration to the `name` histogram of the calling thread. """
+    if not _enabled:
+        return
+    timers = _store()["timers"]
+    hist = timers.get(name)
+    if hist is None:
+        hist = timers[name] = [[0] * (len(BOUNDS) + 1), 0.0]
+    hist[0][bisect.bisect_left(BOUNDS, seconds)] += 1
+    hist[1] += seconds
+
+
+def count(name, n=1):
+    """ Adds `n` to the `name` counter of the calling thread. """
+    if not _enabled:
+        return
+    counters = _store()["counters"]
+    counters[name] = counters.get(name, 0) + n
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def timed(name):
+    """ Context manager timing its block into the `name` histogram (exceptions are timed too). """
+    if not _enabled:
+        return _NOOP
+    return _Timer(name)
+
+
+def reset():
+    """ Clears the recordings of every thread. """
+    with _stores_lock:
+        for _, store in _stores:
+            store["timers"].clear()
+            store["counters"].clear()
+        _retired["timers"].clear()
+        _retired["counters"].clear()
+
+
+def snapshot():
+    """
+    {"timers": {name: {"count", "sum_seconds", "buckets": [[upper bound, cumulative count], ...]}},
+     "counters": {name: value}} merged over all threads. The last bucket bound is "+Inf".
+    """
+    merged = {"timers": {}, "counters": {}}
+    with _stores_lock:
+        _retire_finished()
+        _merge(merged, _retired)
+        stores = [store for _, store in _stores]
+    for store in stores:
+        _merge(merged, store)
+
+    timers = {}
+    for name in sorted(merged["timers"]):
+        buckets, total = merged["timers"][name]
+        cumulative, running = [], 0
+        for bound, c in zip(BOUNDS + ["+Inf"], buckets):
+            running += c
+            cumulative.append([bound, running])
+        timers[name] = {"count": running, "sum_seconds": total, "buckets": cumulative}
+    return {"timers": timers, "counters": dict(sorted(merged["counters"].items()))}
+
+
+def snapshot_json(indent=2):
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus(prefix="insurance"):
+    """ The snapshot in Prometheus text format: one `<prefix>_stage_seconds` histogram, one counter family. """
+    snap = snapshot()
+    lines = [
+        f"# HELP {prefix}_stage_seconds Time spent per instrumented stage.",
+        f"# TYPE {prefix}_stage_seconds histogram",
+    ]
+    for name, timer in snap["timers"].items():
+        stage = _label(name)
+        for bound, c in timer["buckets"]:
+            le = bound if bound == "+Inf" else repr(bound)
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {c}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {timer["sum_seconds"]!r}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {timer["count"]}')
+    lines += [
+        f"# HELP {prefix}_events_total Instrumented event counts.",
+        f"# TYPE {prefix}_events_total counter",
+    ]
+    for name, value in snap["counters"].items():
+        lines.append(f'{prefix}_events_total{{event="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
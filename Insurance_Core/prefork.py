@@ -0,0 +1,202 @@
+"""
+prefork.py
+----------------------------------------
+Pre-fork mode for the quoting service. The parent imports the three products, loads the health forest and the home
+model into the registry, opens the listening socket and then forks N workers that all accept on that socket. The
+workers inherit the loaded models as copy-on-write pages instead of unpickling their own copies, so adding a worker
+costs its private pages (interpreter state, request buffers) rather than another copy of every model.
+
+Before forking, gc.freeze() moves every object the parent created into the permanent generation. Without it the first
+collection in each worker would write to the GC header of every tracked object and unshare all of those pages.
+Reference count updates still dirty the pages of objects a worker actually touches, so some sharing is always lost
+on the hot path. memory_report() shows how much: Rss counts shared pages in full, Pss splits them between the
+processes that map them, and Private is what that worker alone holds.
+
+    python -m Insurance_Core.prefork --workers 4 --port 8080
+
+Linux only (os.fork and /proc/<pid>/smaps_rollup).
+"""
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import socket
+import time
+
+from .registry import registry
+from .service import QuoteService, check_localhost
+from .threads import load_for_serving
+
+HEALTH_MODEL_PATH = "Health_Insurance/random_forest.pkl"
+HOME_MODEL_PATH = "Home_Insurance/Linear_Regression.pkl"
+HOME_FEATURE_PATH = "Home_Insurance/Feature_names.pkl"
+
+
+def load_shared(artifacts=None):
+    """
+    Imports the products and loads every existing artifact into the registry. `artifacts` is a {path: loader} dict,
+    default the health forest and the home model. Returns the loaded paths.
+    """
+    # The car "model" is the multiplier tables in Car_Insurance.preprocessing, importing it builds them
+    import Car_Insurance.training
+    import Health_Insurance.result
+    import Home_Insurance.Premium_calculator
+    from Health_Insurance.compact import compact_path, load_mapped
+
+    return registry.warm(artifacts or {
+        HEALTH_MODEL_PATH: load_for_serving,
+        compact_path(HEALTH_MODEL_PATH): load_mapped,
+        HOME_MODEL_PATH: None,
+        HOME_FEATURE_PATH: None,
+    })
+
+
+def smaps_rollup(pid="self"):
+    """ The kB fields of /proc/<pid>/smaps_rollup as a dict, e.g. {"Rss": 81234, "Pss": 30120, ...}. """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            parts = rest.split()
+            if len(parts) == 2 and parts[1] == "kB":
+                fields[name] = int(parts[0])
+    return fields
+
+
+def memory_report(pids):
+    """ Resident / proportional / shared / private memory in kB for each pid. """
+    report = []
+    for pid in pids:
+        m = smaps_rollup(pid)
+        report.append({
+            "pid": pid,
+            "rss_kb": m.get("Rss", 0),
+            "pss_kb": m.get("Pss", 0),
+            "shared_kb": m.get("Shared_Clean", 0) + m.get("Shared_Dirty", 0),
+            "private_kb": m.get("Private_Clean", 0) + m.get("Private_Dirty", 0),
+        })
+    return report
+
+
+def format_report(report):
+    lines = [f"{'pid':>8} {'rss MB':>9} {'pss MB':>9} {'shared MB':>10} {'private MB':>11}"]
+    for r in report:
+        lines.append(f"{r['pid']:>8} {r['rss_kb'] / 1024:9.1f} {r['pss_kb'] / 1024:9.1f} "
+                     f"{r['shared_kb'] / 1024:10.1f} {r['private_kb'] / 1024:11.1f}")
+    return "\n".join(lines)
+
+
+class PreforkServer:
+    """ Parent process of N quoting service workers sharing one socket and one copy of the loaded models. """
+
+    def __init__(self, workers=None, host="127.0.0.1", port=8080, max_batch=256, max_delay=0.002, artifacts=None):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Pre-fork mode needs os.fork (Linux / macOS).")
+        check_localhost(host)
+        self.workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.artifacts = artifacts
+        self.sock = None
+        self.pids = []
+        self.loaded = []
+        self._stopping = False
+
+    def start(self):
+        """ Loads the models, binds the socket and forks the workers. Returns the worker pids. """
+        self.loaded = load_shared(self.artifacts)
+        self.sock = socket.create_server((self.host, self.port), reuse_port=False, backlog=1024)
+        self.sock.setblocking(False)
+        self.port = self.sock.getsockname()[1]
+
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.workers):
+            self.pids.append(self._fork())
+        return self.pids
+
+    def _fork(self):
+        pid = os.fork()
+        if pid:
+            return pid
+        # worker
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            asyncio.run(self._serve())
+        except BaseException:
+            code = 1
+        finally:
+            os._exit(code)
+
+    async def _serve(self):
+        # created after the fork, threads and event loops do not survive it
+        service = QuoteService(self.host, self.port, self.max_batch, self.max_delay)
+        await service.start(sock=self.sock)
+        await service.serve_forever()
+
+    def serve_forever(self):
+        """ Supervises the workers, forking a replacement for any that dies, until stop() or a signal. """
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        try:
+            while not self._stopping:
+                try:
+                    pid, _ = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                if pid in self.pids and not self._stopping:
+                    self.pids[self.pids.index(pid)] = self._fork()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stopping = True
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in self.pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.pids = []
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        gc.unfreeze()
+
+    def memory(self):
+        """ memory_report for the parent followed by every worker. """
+        return memory_report([os.getpid()] + self.pids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quoting service with pre-forked workers sharing the models.")
+    parser.add_argument("--workers", type=int, default=None, help="default one per cpu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--report-after", type=float, default=2.0, help="seconds before printing the memory report")
+    args = parser.parse_args(argv)
+
+    server = PreforkServer(args.workers, args.host, args.port, args.max_batch, args.max_delay_ms / 1000)
+    server.start()
+    print(f"{len(server.pids)} workers on http://{server.host}:{server.port}, shared: {server.loaded}")
+    time.sleep(args.report_after)
+    print(format_report(server.memory()), flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
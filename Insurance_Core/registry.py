@@ -0,0 +1,177 @@
+"""
+registry.py
+----------------------------------------
+Process-wide registry of loaded model artifacts. Each artifact is unpickled once per process and the same object is
+handed to every caller, so it must be treated as read-only. Before an entry is reused the file is stat'ed; when its
+mtime / size / inode changed the artifact is reloaded ("mtime" mode), or in "hash" mode only reloaded if the sha256 of
+the content changed as well.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from . import metrics
+
+
+def pickle_load(path):
+    """ Plain pickle. """
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def mmap_load(path):
+    """
+    Default loader (Home_Insurance artifacts): joblib.load with mmap_mode="r". NumPy arrays in a file written by an
+    uncompressed joblib.dump are memory-mapped read-only instead of copied, so processes loading the same file share
+    its pages. Plain pickles load as usual.
+    """
+    import joblib
+    return joblib.load(path, mmap_mode="r")
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Entry:
+    __slots__ = ("obj", "signature", "digest", "load_seconds", "loads")
+
+    def __init__(self):
+        self.obj = None
+        self.signature = None
+        self.digest = None
+        self.load_seconds = 0.0
+        self.loads = 0
+
+
+class ModelRegistry:
+    """
+    Caches loaded artifacts by (absolute path, loader). `validate` is "mtime" (reload when the file's stat changes)
+    or "hash" (reload only when the content hash changes).
+    """
+
+    def __init__(self, validate="mtime"):
+        if validate not in ("mtime", "hash"):
+            raise ValueError("validate must be 'mtime' or 'hash'")
+        self.validate = validate
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+
+    def _entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = (_Entry(), threading.Lock())
+            return entry
+
+    def get(self, path, loader=None):
+        """ Returns the loaded artifact at `path`, loading it with `loader` (default mmap_load) on first use or change. """
+        loader = loader or mmap_load
+        key = (os.path.abspath(path), loader)
+        entry, entry_lock = self._entry(key)
+
+        signature = _file_signature(path)  # FileNotFoundError for a missing artifact, like open() would
+        if entry.obj is not None and entry.signature == signature:
+            with self._lock:
+                self._hits += 1
+            metrics.count("registry.hit")
+            return entry.obj
+
+        with entry_lock:
+            # another thread may have loaded it while we waited
+            if entry.obj is not None and entry.signature == signature:
+                with self._lock:
+                    self._hits += 1
+                return entry.obj
+
+            if entry.obj is not None and self.validate == "hash":
+                digest = _file_hash(path)
+                if digest == entry.digest:
+                    entry.signature = signature
+                    with self._lock:
+                        self._hits += 1
+                    return entry.obj
+
+            start = time.perf_counter()
+            obj = loader(path)
+            elapsed = time.perf_counter() - start
+            metrics.observe("registry.load", elapsed)
+            metrics.count("registry.load")
+
+            with self._lock:
+                if entry.obj is not None:
+                    self._reloads += 1
+                self._misses += 1
+            entry.digest = _file_hash(path) if self.validate == "hash" else None
+            entry.load_seconds += elapsed
+            entry.loads += 1
+            entry.obj = obj
+            entry.signature = signature
+            return obj
+
+    def warm(self, artifacts, missing_ok=True):
+        """
+        Preloads artifacts at startup. `artifacts` is an iterable of paths or a {path: loader} dict. Missing files are
+        skipped unless missing_ok is False. Returns the paths that were loaded.
+        """
+        if not isinstance(artifacts, dict):
+            artifacts = {path: None for path in artifacts}
+        loaded = []
+        for path, loader in artifacts.items():
+            if missing_ok and not os.path.exists(path):
+                continue
+            self.get(path, loader)
+            loaded.append(path)
+        return loaded
+
+    def invalidate(self, path=None):
+        """ Drops one artifact (every loader) or, with no path, the whole cache. """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            target = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == target]:
+                del self._entries[key]
+
+    def stats(self):
+        """ Hit / miss / load-time counters, plus per artifact load counts. """
+        with self._lock:
+            entries = {
+                key[0]: {"loads": entry.loads, "load_seconds": entry.load_seconds}
+                for key, (entry, _) in self._entries.items()
+                if entry.loads
+            }
+            hits, misses, reloads = self._hits, self._misses, self._reloads
+        return {
+            "hits": hits,
+            "misses": misses,
+            "reloads": reloads,
+            "load_seconds": sum(e["load_seconds"] for e in entries.values()),
+            "artifacts": entries,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = self._misses = self._reloads = 0
+            for entry, _ in self._entries.values():
+                entry.loads = 0
+                entry.load_seconds = 0.0
+
+
+# The process-wide registry used by Health_Insurance.result and Home_Insurance.Predict
+registry = ModelRegistry()
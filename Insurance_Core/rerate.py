@@ -0,0 +1,271 @@
+"""
+rerate.py
+----------------------------------------
+Re-prices a book of policies on every core. The policy file is read in chunks and each chunk is priced by a worker
+process with the batched path of its product (CarInsurance.final_premium_batch, Predict.predict_batch,
+Health_Insurance.predict_batch), so nothing loops in Python per policy and the workers do not share a GIL.
+
+Memory stays bounded: the reader only runs `2 * workers` chunks ahead of the finished ones, and each finished chunk is
+written straight to its own partition `part-00000.csv`, `part-00001.csv`, ... in the output directory (input columns
+plus `premium` and `error`). A partition is written to a temporary file and renamed into place, so a partition that
+exists is complete. Partitions double as checkpoints: `_rerate.json` records the input, the settings and the size and
+mtime of every model file the run prices with, and a rerun with the same ones skips every chunk whose partition
+already exists. A retrained model starts the run over.
+
+    python -m Insurance_Core.rerate book.csv out/ --product car --workers 8
+    python -m Insurance_Core.rerate mixed_book.csv out/        # a "product" column says car / home / health per row
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from .service import HOME_FEATURE_PATH, HOME_MODEL_PATH
+
+PRODUCTS = ("car", "home", "health")
+STATE_FILE = "_rerate.json"
+HEALTH_MODEL_PATH = "Health_Insurance/random_forest.pkl"
+
+
+def _price_car(frame, models):
+    from Car_Insurance.exceptions import InvalidInputError
+    from Car_Insurance.training import CarInsurance
+
+    model = CarInsurance()
+    premium = np.full(len(frame), np.nan)
+    errors = np.full(len(frame), "", dtype=object)
+    valid = np.arange(len(frame))
+    # final_premium_batch reports every bad row at once, drop them and price the rest
+    while len(valid):
+        try:
+            premium[valid] = model.final_premium_batch(frame.iloc[valid].reset_index(drop=True))
+            break
+        except InvalidInputError as e:
+            if e.rows is None:
+                errors[valid] = str(e)
+                break
+            bad = valid[np.asarray(e.rows, dtype=np.intp)]
+            errors[bad] = str(e)
+            valid = np.setdiff1d(valid, bad)
+    return premium, errors
+
+
+def _price_home(frame, models):
+    from Home_Insurance.Premium_calculator import Predict
+
+    predictor = Predict(*models.get("home", (HOME_MODEL_PATH, HOME_FEATURE_PATH)))
+    return predictor.predict_batch(frame), None
+
+
+def _price_health(frame, models):
+    from Health_Insurance.result import predict_batch
+
+    return predict_batch(frame, models.get("health", HEALTH_MODEL_PATH)), None
+
+
+PRICERS = {"car": _price_car, "home": _price_home, "health": _price_health}
+
+
+def _price_rows(product, frame, models):
+    """ (premiums, errors) for one product's rows. A failing batch is retried row by row so only bad rows fail. """
+    try:
+        premium, errors = PRICERS[product](frame, models)
+        return np.asarray(premium, dtype=np.float64), errors
+    except Exception:
+        if len(frame) == 1:
+            raise
+    premium = np.full(len(frame), np.nan)
+    errors = np.full(len(frame), "", dtype=object)
+    for i in range(len(frame)):
+        try:
+            p, e = PRICERS[product](frame.iloc[[i]].reset_index(drop=True), models)
+            premium[i] = p[0]
+            errors[i] = e[0] if e is not None else ""
+        except Exception as e:
+            errors[i] = str(e)
+    return premium, errors
+
+
+def price_chunk(frame, product=None, models=None):
+    """
+    Prices one chunk and returns it with `premium` and `error` columns added. `product` names the product of every
+    row; without it the chunk needs a `product` column.
+    """
+    models = models or {}
+    frame = frame.reset_index(drop=True)
+    premium = np.full(len(frame), np.nan)
+    errors = np.full(len(frame), "", dtype=object)
+
+    if product is not None:
+        groups = [(product, np.arange(len(frame)))]
+    elif "product" in frame.columns:
+        labels = frame["product"].astype(str).str.strip().str.lower().to_numpy()
+        groups = [(p, np.flatnonzero(labels == p)) for p in dict.fromkeys(labels)]
+    else:
+        raise ValueError("Pass product= or include a 'product' column.")
+
+    for name, rows in groups:
+        if name not in PRICERS:
+            errors[rows] = f"Unknown product {name!r}"
+            continue
+        try:
+            premium[rows], group_errors = _price_rows(name, frame.iloc[rows].reset_index(drop=True), models)
+            if group_errors is not None:
+                errors[rows] = group_errors
+        except Exception as e:
+            errors[rows] = str(e)
+
+    out = frame.copy()
+    out["premium"] = premium
+    out["error"] = errors
+    return out
+
+
+def _partition_path(output_dir, index):
+    return os.path.join(output_dir, f"part-{index:05d}.csv")
+
+
+def _run_chunk(index, frame, output_dir, product, models):
+    """ Worker body: prices a chunk and writes its partition atomically. Returns (index, rows, failed rows). """
+    priced = price_chunk(frame, product, models)
+    path = _partition_path(output_dir, index)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    priced.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return index, len(priced), int((priced["error"] != "").sum())
+
+
+def _model_files(product, models):
+    """ The artifacts pricing `product` (None: every product) reads, car quotes need none. """
+    files = []
+    if product in (None, "home"):
+        files.extend(models.get("home", (HOME_MODEL_PATH, HOME_FEATURE_PATH)))
+    if product in (None, "health"):
+        files.append(models.get("health", HEALTH_MODEL_PATH))
+    return files
+
+
+def _settings(input_path, product, chunksize, models):
+    st = os.stat(input_path)
+    artifacts = {}
+    for path in _model_files(product, models):
+        # a retrained model changes size or mtime (os.replace keeps the new file's), None while it is missing
+        if os.path.exists(path):
+            model_st = os.stat(path)
+            artifacts[os.path.abspath(path)] = [model_st.st_size, model_st.st_mtime_ns]
+        else:
+            artifacts[os.path.abspath(path)] = None
+    return {
+        "input": os.path.abspath(input_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "product": product,
+        "chunksize": chunksize,
+        "models": {k: list(v) if isinstance(v, (list, tuple)) else v for k, v in sorted(models.items())},
+        "artifacts": artifacts,
+    }
+
+
+def _print_progress(done):
+    rate = done["rows"] / max(done["seconds"], 1e-9)
+    sys.stderr.write(f"\r{done['rows']:,} rows  {done['chunks']} chunks  {done['skipped']} resumed  "
+                     f"{done['failed']:,} failed  {rate:,.0f} rows/s")
+    sys.stderr.flush()
+
+
+def rerate(input_path, output_dir, product=None, chunksize=50000, workers=None, resume=True, models=None,
+           progress=None):
+    """
+    Re-prices every policy in the CSV at `input_path` into partitions in `output_dir`, see the module docstring.
+    `models` overrides artifact paths: {"home": (model_path, feature_path), "health": model_path}. `progress` is called
+    with the running totals after every chunk (True prints a counter to stderr). Returns the final totals.
+    """
+    if product is not None and product not in PRICERS:
+        raise ValueError(f"Unknown product {product!r}, expected one of {PRODUCTS}")
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+    if progress is True:
+        progress = _print_progress
+    models = models or {}
+    workers = workers or os.cpu_count() or 1
+
+    os.makedirs(output_dir, exist_ok=True)
+    state_path = os.path.join(output_dir, STATE_FILE)
+    settings = _settings(input_path, product, chunksize, models)
+    previous = None
+    if resume and os.path.exists(state_path):
+        with open(state_path) as f:
+            previous = json.load(f)
+    if previous != settings:
+        # different input or settings, the existing partitions do not belong to this run
+        for name in os.listdir(output_dir):
+            if name.startswith("part-"):
+                os.remove(os.path.join(output_dir, name))
+        with open(state_path, "w") as f:
+            json.dump(settings, f, indent=2)
+
+    done = {"rows": 0, "chunks": 0, "skipped": 0, "failed": 0, "seconds": 0.0}
+    start = time.perf_counter()
+
+    def finish(future):
+        _, rows, failed = future.result()
+        done["rows"] += rows
+        done["failed"] += failed
+        done["chunks"] += 1
+        done["seconds"] = time.perf_counter() - start
+        if progress:
+            progress(dict(done))
+
+    pending = set()
+    with ProcessPoolExecutor(workers) as pool:
+        for index, frame in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+            if os.path.exists(_partition_path(output_dir, index)):
+                done["skipped"] += 1
+                done["chunks"] += 1
+                continue
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(future)
+            pending.add(pool.submit(_run_chunk, index, frame, output_dir, product, models))
+        for future in pending:
+            finish(future)
+
+    done["seconds"] = time.perf_counter() - start
+    done["partitions"] = sorted(name for name in os.listdir(output_dir) if name.startswith("part-"))
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-price a policy file on all cores into partitioned outputs.")
+    parser.add_argument("input", help="policy CSV")
+    parser.add_argument("output", help="directory for the part-*.csv partitions")
+    parser.add_argument("--product", choices=PRODUCTS, default=None,
+                        help="product of every row (default: read the 'product' column)")
+    parser.add_argument("--chunksize", type=int, default=50000, help="rows per chunk / partition")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default one per cpu)")
+    parser.add_argument("--restart", action="store_true", help="ignore existing partitions")
+    parser.add_argument("--home-model", nargs=2, metavar=("MODEL", "FEATURES"), default=None)
+    parser.add_argument("--health-model", default=None)
+    args = parser.parse_args(argv)
+
+    models = {}
+    if args.home_model:
+        models["home"] = tuple(args.home_model)
+    if args.health_model:
+        models["health"] = args.health_model
+
+    totals = rerate(args.input, args.output, args.product, args.chunksize, args.workers, not args.restart, models,
+                    progress=True)
+    sys.stderr.write("\n")
+    print(f"Re-rated {totals['rows']:,} policies in {totals['seconds']:.1f}s "
+          f"({totals['skipped']} chunks resumed, {totals['failed']:,} failed) into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+runtime.py
+----------------------------------------
+Scores a bundle written by `Insurance_Core.export` with NumPy alone: no pandas, no scikit-learn, no pickle. Loading a
+bundle reads one npz and one JSON file, so a fresh process can answer a quote in tens of milliseconds.
+
+    bundle = load_bundle("models/bundle")
+    bundle.quote_car(30, 15000, 5, 10, 0, "suv")            # == CarInsurance().final_premium(...)
+    bundle.quote_home({"Owner_Sex": "M", "Bedrooms": 3, ...})  # == Predict(...).predict_price(...)
+    bundle.quote_health(40, "male", 27.5, 1, "no", "northwest")
+
+    python -m Insurance_Core.runtime models/bundle car age=30 annual_km=15000 car_age=5 exp_years=10 num_accidents=0
+    python -m Insurance_Core.runtime models/bundle health --batch people.jsonl      # one JSON record per line
+
+The scores match the library: car premiums reuse Car_Insurance's input checks, rating tables, vehicle factors and
+rounding (that package is NumPy only too) on the exported multipliers, home premiums use the same encoding as
+Predict.encode_row (Insurance_Core.encoding), and the health forest is evaluated by Health_Insurance.compiled (NumPy
+only, the Health_Insurance package imports nothing else). Bad inputs raise
+QuoteError (a ValueError) with the library's messages.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from Car_Insurance.exceptions import InvalidInputError
+from Car_Insurance.preprocessing import _check_column, _check_value
+from Car_Insurance.rating_table import RatingTable
+from Car_Insurance.training import _round2, _vehicle_factor, _vehicle_factors
+from Insurance_Core.encoding import encode_row
+from Health_Insurance.compiled import FEATURES as HEALTH_FEATURES, CompiledForest
+
+FORMAT_VERSION = 1
+HEALTH_CHUNK = 10000
+
+
+class QuoteError(ValueError):
+    """ Invalid quote input. Batch calls set `rows` to the offending row indices. """
+    def __init__(self, message="", rows=None):
+        super().__init__(message)
+        self.rows = rows
+
+
+def _columns(records, names):
+    """ {name: column} from a dict of columns, a DataFrame or a list of record dicts. """
+    if isinstance(records, dict) or hasattr(records, "columns"):
+        return {name: records[name] if name in records else None for name in names}
+    records = list(records)
+    return {name: [r.get(name) for r in records] for name in names}
+
+
+class Bundle:
+    """ A loaded export. Only the products present in the manifest can be quoted. """
+
+    def __init__(self, manifest, arrays):
+        self.manifest = manifest
+        self.products = list(manifest["products"])
+
+        car = manifest["products"].get("car")
+        if car is not None:
+            self.base_cost = float(car["base_cost"])
+            # (input name, rating table, whether the key is the input in thousands)
+            self.car_axes = [
+                (axis["name"], RatingTable.from_values(arrays[f"car/{axis['name']}"], axis["offset"], axis["default"]),
+                 axis["key"] == "thousands")
+                for axis in car["axes"]
+            ]
+            self.vehicle = dict(zip(car["vehicle_types"], arrays["car/vehicle"].tolist()))
+            self.vehicle_default = float(car["vehicle_default"])
+
+        home = manifest["products"].get("home")
+        if home is not None:
+            self.home_features = home["features"]
+            self.home_encoders = [(col, home["encoders"].get(col)) for col in self.home_features]
+            self.home_coef = arrays["home/coef"]
+            self.home_intercept = float(arrays["home/intercept"][0])
+
+        health = manifest["products"].get("health")
+        if health is not None:
+            self.forest = CompiledForest(
+                health["categories"], arrays["health/source"], arrays["health/category"], arrays["health/feature"],
+                arrays["health/threshold"], arrays["health/children"], arrays["health/value"],
+                arrays["health/roots"], health["depth"],
+            )
+
+    def __repr__(self):
+        return f"Bundle(products={self.products}, created_at={self.manifest.get('created_at')!r})"
+
+    def _require(self, product):
+        if product not in self.manifest["products"]:
+            raise KeyError(f"The bundle has no {product} model, it contains {self.products}")
+
+    # car
+    def quote_car(self, age, annual_km, car_age, exp_years, num_accidents, vehicle_type=None):
+        """ Same premium and errors as CarInsurance().final_premium(...). """
+        self._require("car")
+        values = {"age": age, "annual_km": annual_km, "car_age": car_age, "exp_years": exp_years,
+                  "num_accidents": num_accidents}
+        try:
+            try:
+                risk = 1.0
+                for name, table, thousands in self.car_axes:
+                    value = values[name]
+                    _check_value(value, name)
+                    risk = risk * table.lookup(int(round(value / 1000)) if thousands else value)
+            except InvalidInputError as e:
+                raise InvalidInputError(f"Invalid data passed to combined_factors: {e}")
+            type_risk = _vehicle_factor(vehicle_type, self.vehicle, self.vehicle_default)
+        except InvalidInputError as e:
+            raise QuoteError(f"Cannot compute risk: {e}")
+
+        premium = round(self.base_cost * (type_risk * risk), 2)
+        if premium < 0:
+            raise QuoteError("Final premium cannot be negative.")
+        return premium
+
+    def quote_car_batch(self, records):
+        """
+        Premiums for a dict of columns, a DataFrame or a list of record dicts, identical to final_premium per row.
+        Every invalid row is reported in one QuoteError.
+        """
+        self._require("car")
+        columns = _columns(records, [name for name, _, _ in self.car_axes] + ["vehicle_type"])
+        missing = [name for name, _, _ in self.car_axes if columns[name] is None]
+        if missing:
+            raise QuoteError(f"Missing input column: {missing}")
+        n = max(np.size(columns[name]) for name, _, _ in self.car_axes)
+
+        risk, errors, bad_rows = np.ones(n), [], []
+        try:
+            for name, table, thousands in self.car_axes:
+                arr, messages, rows = _check_column(columns[name], name, n)
+                errors += messages
+                bad_rows += rows
+                risk = risk * table.gather(np.rint(arr / 1000) if thousands else arr)
+
+            type_risk = np.ones(n)
+            try:
+                type_risk = _vehicle_factors(columns["vehicle_type"], n, self.vehicle, self.vehicle_default)
+            except InvalidInputError as e:
+                if e.rows is None:
+                    raise
+                errors.append(str(e))
+                bad_rows.append(e.rows)
+        except InvalidInputError as e:
+            raise QuoteError(str(e), rows=e.rows)
+
+        if errors:
+            raise QuoteError("Cannot compute risk: " + " ".join(errors), rows=np.unique(np.concatenate(bad_rows)))
+        premium = _round2(self.base_cost * (type_risk * risk))
+        negative = np.flatnonzero(premium < 0)
+        if len(negative):
+            raise QuoteError("Final premium cannot be negative.", rows=negative)
+        return premium
+
+    # home
+    def quote_home(self, record):
+        """ Same premium as Predict(...).predict_price(record) for a linear home model. """
+        self._require("home")
+        x = encode_row(record, self.home_encoders)
+        if not np.all(np.isfinite(x)):
+            raise QuoteError("Input contains NaN or infinity.")
+        return round(float(np.dot(x, self.home_coef)) + self.home_intercept, 2)
+
+    def quote_home_batch(self, records):
+        """ Premiums for a list of record dicts (or an encoded (n, n_features) matrix), like Predict.predict_batch. """
+        self._require("home")
+        if hasattr(records, "to_dict"):
+            records = records.to_dict("records")
+        if isinstance(records, (list, tuple)) and records and isinstance(records[0], dict):
+            X = np.array([encode_row(r, self.home_encoders) for r in records]).reshape(-1, len(self.home_encoders))
+        else:
+            X = np.asarray(records, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.home_features):
+            raise QuoteError(f"Expected an (n, {len(self.home_features)}) matrix, got shape {X.shape}.")
+        if not np.all(np.isfinite(X)):
+            raise QuoteError("Input contains NaN or infinity.")
+        return np.round(X @ self.home_coef + self.home_intercept, 2)
+
+    # health
+    def quote_health(self, age, sex, bmi, children, smoker, region):
+        """ Predicted charges for one person, the compiled form of result(...).predict(). """
+        self._require("health")
+        return self.forest.predict_one(age, sex, bmi, children, smoker, region)
+
+    def quote_health_batch(self, records):
+        """ Predicted charges for a dict of columns, a DataFrame or a list of record dicts. """
+        self._require("health")
+        if isinstance(records, dict) or hasattr(records, "columns"):
+            missing = [col for col in HEALTH_FEATURES if col not in records]
+            if missing:
+                raise QuoteError(f"Missing input columns: {missing}")
+            columns = {col: np.atleast_1d(np.asarray(records[col])) for col in HEALTH_FEATURES}
+            n = len(columns["age"])
+            chunks = [{col: values[i:i + HEALTH_CHUNK] for col, values in columns.items()}
+                      for i in range(0, n, HEALTH_CHUNK)]
+        else:
+            records = list(records)
+            chunks = [records[i:i + HEALTH_CHUNK] for i in range(0, len(records), HEALTH_CHUNK)]
+        if not chunks:
+            return np.empty(0)
+        return np.concatenate([self.forest.predict(chunk) for chunk in chunks])
+
+    def quote(self, product, record):
+        """ One quote from a record dict, for any product. """
+        if product == "car":
+            return self.quote_car(**{k: record.get(k) for k in
+                                     ("age", "annual_km", "car_age", "exp_years", "num_accidents")},
+                                  vehicle_type=record.get("vehicle_type"))
+        if product == "home":
+            return self.quote_home(record)
+        if product == "health":
+            self._require("health")
+            return float(self.forest.predict(record)[0])
+        raise KeyError(f"Unknown product {product!r}")
+
+    def quote_batch(self, product, records):
+        batch = {"car": self.quote_car_batch, "home": self.quote_home_batch, "health": self.quote_health_batch}
+        if product not in batch:
+            raise KeyError(f"Unknown product {product!r}")
+        return batch[product](records)
+
+
+def load_bundle(prefix, verify=True):
+    """
+    Loads `<prefix>.json` and `<prefix>.npz`. With `verify` the npz must match the sha256 in the manifest, so a bundle
+    whose two files come from different exports is refused.
+    """
+    with open(f"{prefix}.json") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format')!r}, expected {FORMAT_VERSION}")
+    npz_path = os.path.join(os.path.dirname(f"{prefix}.json"), manifest["npz"])
+    with open(npz_path, "rb") as f:
+        payload = f.read()
+    if verify and hashlib.sha256(payload).hexdigest() != manifest["sha256"]:
+        raise ValueError(f"{npz_path} does not match the checksum in {prefix}.json")
+    with np.load(npz_path, allow_pickle=False) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    return Bundle(manifest, arrays)
+
+
+def _parse_value(text):
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return None if text.lower() == "none" else text
+
+
+def _read_records(path):
+    """ A JSON list, or one JSON record per line. "-" reads stdin. """
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        text = f.read()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quote from an exported bundle with NumPy only.")
+    parser.add_argument("bundle", help="bundle path without extension")
+    parser.add_argument("product", choices=["car", "home", "health"])
+    parser.add_argument("fields", nargs="*", metavar="name=value", help="the record to quote")
+    parser.add_argument("--batch", metavar="FILE", help="JSON lines (or a JSON list) of records, - for stdin")
+    parser.add_argument("--no-verify", action="store_true", help="skip the npz checksum")
+    args = parser.parse_args(argv)
+
+    bundle = load_bundle(args.bundle, verify=not args.no_verify)
+    try:
+        if args.batch:
+            for premium in bundle.quote_batch(args.product, _read_records(args.batch)).tolist():
+                print(premium)
+        else:
+            record = {}
+            for field in args.fields:
+                name, sep, value = field.partition("=")
+                if not sep:
+                    parser.error(f"expected name=value, got {field!r}")
+                record[name] = _parse_value(value)
+            print(bundle.quote(args.product, record))
+    except (QuoteError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
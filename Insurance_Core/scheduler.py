@@ -0,0 +1,281 @@
+"""
+scheduler.py
+----------------------------------------
+Background retraining for the three products. A fit runs in a separate worker process and writes its artifacts to
+temporary files next to the targets; the parent then moves them into place with os.replace and bumps the product's
+version in a JSON manifest. os.replace is atomic, so a reader sees either the old file or the new one, never a partial
+write, and because the registry reloads an artifact when its stat changes, serving processes keep answering from the
+previous model until the swap and pick up the new one on their next request, without a restart.
+
+    python -m Insurance_Core.scheduler home health car          # retrain once
+    python -m Insurance_Core.scheduler health --every 86400     # retrain daily
+
+Manifest location: INSURANCE_MANIFEST (default model_manifest.json in the working directory).
+"""
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+MANIFEST_ENV = "INSURANCE_MANIFEST"
+DEFAULT_MANIFEST = "model_manifest.json"
+
+logger = logging.getLogger(__name__)
+
+# Artifact paths per product, relative to the working directory like the rest of the app. The last artifact is the one
+# a reader loads first, it is swapped in last so new auxiliary files (feature names) are already in place. Health
+# quotes map the compact forest (training.save's .npz) first; until it is replaced it no longer matches the new
+# pickle's size and mtime, so readers use the pickle in between.
+ARTIFACTS = {
+    "car": [os.environ.get("CAR_RATE_CUBE", "Car_Insurance/rate_cube.bin")],
+    "home": ["Home_Insurance/Feature_names.pkl", "Home_Insurance/Linear_Regression.pkl"],
+    "health": ["Health_Insurance/random_forest.pkl", "Health_Insurance/random_forest.npz"],
+}
+
+
+def _fit_car(outputs, options):
+    from Car_Insurance.rate_cube import DEFAULT_BASE_COST, build_rate_cube
+    build_rate_cube(outputs[0], options.get("base_cost", DEFAULT_BASE_COST))
+    return {}
+
+
+def _fit_home(outputs, options):
+    from Home_Insurance.Risk_factor import data
+    x = data(options.get("csv", "Home_Insurance/dataset.csv"))
+    if options.get("chunksize"):
+        x.train_streaming(options["chunksize"])
+    else:
+        x.preprocess()
+        x.train()
+    x.save(model_path=outputs[1], feature_path=outputs[0])
+    return {"features": len(x.features)}
+
+
+def _fit_health(outputs, options):
+    from Health_Insurance.training import Training, save
+    model, rmse, r2 = Training(options.get("trees", 500), options.get("split", 0.2), options.get("jobs"),
+                               cache=options.get("cache"))
+    # outputs: the pickle and its compact forest; os.replace keeps the mtime the forest records for the pickle
+    save(model, outputs[0], compact=outputs[1])
+    return {"rmse": float(rmse), "r2": float(r2)}
+
+
+TRAINERS = {"car": _fit_car, "home": _fit_home, "health": _fit_health}
+
+
+def _run_fit(product, outputs, options):
+    """ Worker process body: fits `product` and writes its artifacts to the temporary `outputs`. """
+    start = time.perf_counter()
+    metrics = TRAINERS[product](outputs, options)
+    return {"seconds": time.perf_counter() - start, **metrics}
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _temp_path(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    os.close(fd)
+    return tmp
+
+
+def read_manifest(path=None):
+    """ {product: {"version", "trained_at", "metrics", "artifacts": {path: sha256}}}, empty when there is none yet. """
+    path = path or os.environ.get(MANIFEST_ENV, DEFAULT_MANIFEST)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_json_atomic(path, payload):
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, "w") as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class RetrainScheduler:
+    """
+    Runs product fits in a single background worker process (fits are CPU bound and already multi-threaded) and
+    publishes the results atomically. At most one fit per product is queued or running at a time.
+    """
+
+    def __init__(self, manifest_path=None, options=None, artifacts=None, max_workers=1):
+        # options: {product: keyword options of its fit}, artifacts: {product: [paths]} overriding ARTIFACTS
+        self.manifest_path = manifest_path or os.environ.get(MANIFEST_ENV, DEFAULT_MANIFEST)
+        self.options = options or {}
+        self.artifacts = {**ARTIFACTS, **(artifacts or {})}
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = {}
+        # {product: exception of its last fit}, cleared when a fit of the product is published
+        self._errors = {}
+        # re-entrant: a fit that is already done runs its callback (and publish) inside submit
+        self._lock = threading.RLock()
+        self._timer = None
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn: the parent may be a threaded server, forking it mid-request is not safe
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, product):
+        """
+        Starts a fit of `product` in the background unless one is already pending. Returns a Future that resolves to
+        the product's new manifest entry once the artifacts have been swapped in.
+        """
+        if product not in TRAINERS:
+            raise ValueError(f"Unknown product {product!r}, expected one of {sorted(TRAINERS)}")
+        with self._lock:
+            published = self._pending.get(product)
+            if published is not None and not published.done():
+                return published
+            targets = self.artifacts[product]
+            temps = [_temp_path(path) for path in targets]
+            published = Future()
+            fit = self._pool().submit(_run_fit, product, temps, self.options.get(product, {}))
+            fit.add_done_callback(lambda f: self._finish(product, targets, temps, f, published))
+            self._pending[product] = published
+            return published
+
+    def _finish(self, product, targets, temps, fit, published):
+        try:
+            entry = self.publish(product, dict(zip(targets, temps)), fit.result())
+        except BaseException as e:
+            logger.error("Retraining %s failed", product, exc_info=e)
+            with self._lock:
+                self._errors[product] = e
+            published.set_exception(e)
+        else:
+            with self._lock:
+                self._errors.pop(product, None)
+            published.set_result(entry)
+        finally:
+            for tmp in temps:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+    def publish(self, product, artifacts, metrics=None):
+        """ Moves {target: temp file} into place and records the new version in the manifest. """
+        with self._lock:
+            hashes = {}
+            for target, tmp in artifacts.items():
+                hashes[target] = _sha256(tmp)
+                os.replace(tmp, target)
+
+            manifest = read_manifest(self.manifest_path)
+            entry = manifest.get(product, {})
+            manifest[product] = {
+                "version": entry.get("version", 0) + 1,
+                "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "metrics": metrics or {},
+                "artifacts": hashes,
+            }
+            _write_json_atomic(self.manifest_path, manifest)
+            return manifest[product]
+
+    def ensure(self, products=None):
+        """
+        Submits a fit for every product whose artifacts are missing. Returns the products that are training. A product
+        whose last fit failed is not resubmitted, see last_error; an explicit submit retries it.
+        """
+        training = []
+        for product in products or list(TRAINERS):
+            if self.is_training(product):
+                training.append(product)
+            elif self.last_error(product) is None and not all(os.path.exists(p) for p in self.artifacts[product]):
+                self.submit(product)
+                training.append(product)
+        return training
+
+    def is_training(self, product):
+        future = self._pending.get(product)
+        return future is not None and not future.done()
+
+    def last_error(self, product):
+        """ The exception the last fit of `product` failed with, None when it has not failed since its last publish. """
+        with self._lock:
+            return self._errors.get(product)
+
+    def start(self, interval, products=None):
+        """ Retrains `products` (default all) now and then every `interval` seconds, on a daemon timer thread. """
+        def tick():
+            for product in products or list(TRAINERS):
+                self.submit(product)
+            self._timer = threading.Timer(interval, tick)
+            self._timer.daemon = True
+            self._timer.start()
+
+        self.stop()
+        tick()
+
+    def stop(self):
+        """ Cancels the periodic timer, fits already running finish in the background. """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def wait(self, products=None):
+        """ Blocks until the pending fits are published, re-raising the first failure. """
+        for product in products or list(self._pending):
+            published = self._pending.get(product)
+            if published is not None:
+                published.result()
+
+    def shutdown(self, wait=True):
+        self.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+# The scheduler App.py hands missing models to
+scheduler = RetrainScheduler()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Retrain insurance models in the background and swap them in.")
+    parser.add_argument("products", nargs="*", default=list(TRAINERS), choices=list(TRAINERS))
+    parser.add_argument("--every", type=float, default=None, help="retrain every N seconds instead of once")
+    parser.add_argument("--manifest", default=None, help="manifest path (default $INSURANCE_MANIFEST)")
+    args = parser.parse_args(argv)
+
+    runner = RetrainScheduler(args.manifest)
+    try:
+        if args.every:
+            runner.start(args.every, args.products)
+            while True:
+                time.sleep(3600)
+        for product in args.products:
+            runner.submit(product)
+        runner.wait(args.products)
+        for product, entry in read_manifest(runner.manifest_path).items():
+            if product in args.products:
+                print(f"{product}: version {entry['version']} {entry['metrics']}")
+    finally:
+        runner.shutdown()
+
+
+if __name__ == "__main__":
+    main()
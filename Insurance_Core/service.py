@@ -0,0 +1,345 @@
+"""
+service.py
+----------------------------------------
+Standalone JSON quoting service on localhost, built on asyncio streams (no web framework needed).
+
+    POST /quote/car      {"age": 30, "annual_km": 15000, "car_age": 5, "exp_years": 10, "num_accidents": 0,
+                          "vehicle_type": "suv"}
+    POST /quote/home     {"Owner_Sex": "M", "Bedrooms": 3, "YearBuilt": 2000, ...}
+    POST /quote/health   {"age": 40, "sex": "male", "bmi": 27.5, "children": 1, "smoker": "no", "region": "northwest"}
+    GET  /stats          batch counters per product
+    GET  /metrics        stage timings in Prometheus text format (see metrics.py, needs INSURANCE_METRICS=1)
+
+A quote body is one record (response {"premium": x}) or a list of records (response {"premiums": [...]}). Concurrent
+requests are not scored one by one: each product has a MicroBatcher that collects them and makes one batched model
+call (final_premium_batch, Predict.predict_batch, predict_batch) per micro-batch, so the per-call overhead is paid
+once per batch and throughput grows with load. A batch is flushed when it reaches `max_batch` records or `max_delay`
+seconds after its first record. The delay is adaptive: when requests arrive further apart than `max_delay` there is
+nothing to wait for, and the batch is flushed immediately, so a lone request pays no extra latency.
+
+Run with `python -m Insurance_Core.service --port 8080`, load test with `python -m benchmarks.load_test`.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+
+HOME_MODEL_PATH = "Home_Insurance/Linear_Regression.pkl"
+HOME_FEATURE_PATH = "Home_Insurance/Feature_names.pkl"
+MAX_BODY = 1 << 20
+CAR_COLUMNS = ["age", "annual_km", "car_age", "exp_years", "num_accidents"]
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ServiceError(Exception):
+    """ An error answered with `status` instead of a 500. """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent `submit(record)` calls into batches for `fn(records) -> list of results`. `fn` runs in
+    `executor`, so the event loop keeps accepting requests while a batch is scored.
+    """
+
+    def __init__(self, fn, max_batch=256, max_delay=0.002, executor=None):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.executor = executor
+        self.queue = None
+        self.task = None
+        self.gap = max_delay  # moving average of the time between arrivals
+        self.last_arrival = None
+        self.batches = 0
+        self.records = 0
+
+    async def submit(self, record):
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        now = time.perf_counter()
+        if self.last_arrival is not None:
+            self.gap = 0.8 * self.gap + 0.2 * (now - self.last_arrival)
+        self.last_arrival = now
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((record, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            # waiting only pays off when the next request is expected before the deadline
+            if remaining <= 0 or self.gap >= remaining:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self._score, records)
+            except Exception as e:
+                results = [e] * len(batch)
+            self.batches += 1
+            self.records += len(batch)
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _score(self, records):
+        """ One call for the whole batch. If it fails, records are retried one by one so a bad input fails alone. """
+        try:
+            return list(self.fn(records))
+        except Exception:
+            if len(records) == 1:
+                raise
+        results = []
+        for record in records:
+            try:
+                results.append(self.fn([record])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "mean_batch": self.records / self.batches if self.batches else 0.0,
+        }
+
+    async def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+def quote_car(records):
+    import numpy as np
+    from Car_Insurance.exceptions import InvalidInputError
+    from Car_Insurance.training import CarInsurance
+
+    # object columns keep a JSON null as None, a DataFrame would turn it into NaN next to other records' numbers
+    columns = {}
+    for name in CAR_COLUMNS:
+        if any(name not in record for record in records):
+            raise ServiceError(f"Missing input column: {name!r}")
+        columns[name] = np.array([record[name] for record in records], dtype=object)
+    if any("vehicle_type" in record for record in records):
+        columns["vehicle_type"] = np.array([record.get("vehicle_type") for record in records], dtype=object)
+    try:
+        return CarInsurance().final_premium_batch(**columns).tolist()
+    except InvalidInputError as e:
+        raise ServiceError(str(e))
+
+
+def quote_home(records, model_path=HOME_MODEL_PATH, feature_path=HOME_FEATURE_PATH):
+    from Home_Insurance.Premium_calculator import FeatureFileNotFoundError, ModelFileNotFoundError, Predict
+
+    try:
+        predictor = Predict(model_path, feature_path)
+    except (ModelFileNotFoundError, FeatureFileNotFoundError, FileNotFoundError) as e:
+        raise ServiceError(str(e), status=503)
+    try:
+        return predictor.predict_batch(list(records)).tolist()
+    except (ValueError, TypeError) as e:
+        raise ServiceError(str(e))
+
+
+def quote_health(records, path=None):
+    from Health_Insurance.result import MODEL_PATH, predict_batch
+
+    try:
+        return predict_batch(records, path or MODEL_PATH).tolist()
+    except FileNotFoundError as e:
+        raise ServiceError(f"Health model not found: {e.filename}", status=503)
+    except (ValueError, TypeError, KeyError) as e:
+        raise ServiceError(str(e))
+
+
+def check_localhost(host):
+    """ ValueError unless `host` is "localhost" or a loopback address. """
+    if host != "localhost" and not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"The quoting service only listens on localhost, got {host!r}")
+
+
+class QuoteService:
+    """ The HTTP front of the batchers. Only binds to loopback addresses. """
+
+    def __init__(self, host="127.0.0.1", port=8080, max_batch=256, max_delay=0.002, quoters=None):
+        check_localhost(host)
+        self.host = host
+        self.port = port
+        quoters = quoters or {"car": quote_car, "home": quote_home, "health": quote_health}
+        # one scoring thread per product, a slow forest batch does not hold up car quotes
+        self.executor = ThreadPoolExecutor(len(quoters), thread_name_prefix="quote")
+        self.batchers = {
+            name: MicroBatcher(fn, max_batch, max_delay, self.executor) for name, fn in quoters.items()
+        }
+        self.server = None
+
+    async def start(self, sock=None):
+        """ Binds host:port, or serves on an already listening `sock` (pre-fork workers share the parent's). """
+        if sock is not None:
+            self.server = await asyncio.start_server(self._handle, sock=sock)
+        else:
+            self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        # port=0 picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            await batcher.close()
+        self.executor.shutdown(wait=False)
+
+    async def dispatch(self, method, target, body):
+        """ Returns (status, payload) for one request. """
+        path = target.split("?", 1)[0].rstrip("/")
+        if path == "/stats":
+            return 200, {name: batcher.stats() for name, batcher in self.batchers.items()}
+        if path == "/metrics":
+            return 200, metrics.prometheus()
+        if not path.startswith("/quote/") or path[len("/quote/"):] not in self.batchers:
+            return 404, {"error": f"Unknown endpoint {path}, use /quote/{{{','.join(self.batchers)}}}"}
+        if method != "POST":
+            return 405, {"error": "Quotes are POST requests with a JSON body"}
+
+        try:
+            payload = json.loads(body or b"null")
+        except ValueError:
+            return 400, {"error": "Body is not valid JSON"}
+        batcher = self.batchers[path[len("/quote/"):]]
+        if isinstance(payload, dict):
+            return 200, {"premium": await batcher.submit(payload)}
+        if isinstance(payload, list) and payload and all(isinstance(r, dict) for r in payload):
+            premiums = await asyncio.gather(*(batcher.submit(r) for r in payload))
+            return 200, {"premiums": list(premiums)}
+        return 400, {"error": "Body must be a JSON object or a non-empty list of objects"}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except ServiceError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = json.dumps(payload).encode(), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local JSON quoting service with micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch", type=int, default=256, help="records per model call at most")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="longest a record waits for its batch")
+    args = parser.parse_args(argv)
+
+    service = QuoteService(args.host, args.port, args.max_batch, args.max_delay_ms / 1000)
+
+    async def run():
+        await service.start()
+        print(f"Quoting service on http://{service.host}:{service.port}")
+        await service.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+threads.py
+----------------------------------------
+Thread budgets for fitting and for serving models. Training uses every core by default, but a fitted forest keeps its
+`n_jobs` when pickled, so without a reset every single-row predict would spin up a thread pool across all cores. Loaded
+artifacts are therefore reset to a small serving budget, and all predictions in the process share one thread cap.
+
+Environment overrides:
+    INSURANCE_TRAIN_JOBS   n_jobs used for fitting (default -1, all cores)
+    INSURANCE_SERVE_JOBS   n_jobs set on loaded models (default 1)
+    INSURANCE_MAX_THREADS  threads all concurrent predictions in the process may use together (default cpu count)
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+TRAIN_JOBS_ENV = "INSURANCE_TRAIN_JOBS"
+SERVE_JOBS_ENV = "INSURANCE_SERVE_JOBS"
+MAX_THREADS_ENV = "INSURANCE_MAX_THREADS"
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+
+
+def _resolve(n_jobs):
+    """ joblib style n_jobs (-1 = all cores, -2 = all but one) to a thread count. """
+    cpus = os.cpu_count() or 1
+    if n_jobs < 0:
+        return max(1, cpus + 1 + n_jobs)
+    return max(1, n_jobs)
+
+
+def training_jobs(n_jobs=None):
+    """ n_jobs for fitting: the argument, else INSURANCE_TRAIN_JOBS, else -1. """
+    return n_jobs if n_jobs is not None else _env_int(TRAIN_JOBS_ENV, -1)
+
+
+def serving_jobs(n_jobs=None):
+    """ Thread count for predictions: the argument, else INSURANCE_SERVE_JOBS, else 1, never above the process cap. """
+    requested = n_jobs if n_jobs is not None else _env_int(SERVE_JOBS_ENV, 1)
+    return min(_resolve(requested), thread_cap.capacity)
+
+
+class ThreadCap:
+    """ Counting limit on the threads used by concurrent predictions, shared by every loaded model. """
+
+    def __init__(self, capacity=None):
+        self.capacity = _resolve(capacity if capacity is not None else _env_int(MAX_THREADS_ENV, -1))
+        self._available = self.capacity
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def reserve(self, threads=1):
+        """ Blocks until `threads` threads are free, holds them for the duration of the with block. """
+        threads = min(max(1, threads), self.capacity)
+        with self._cond:
+            while self._available < threads:
+                self._cond.wait()
+            self._available -= threads
+        try:
+            yield threads
+        finally:
+            with self._cond:
+                self._available += threads
+                self._cond.notify_all()
+
+    def in_use(self):
+        return self.capacity - self._available
+
+
+thread_cap = ThreadCap()
+
+
+def set_serving_budget(model, n_jobs=None):
+    """
+    Sets n_jobs to the serving budget on the model and on every step of a Pipeline, returns the model. Used on
+    artifacts right after loading, they carry the n_jobs they were trained with.
+    """
+    jobs = serving_jobs(n_jobs)
+    estimators = [model]
+    steps = getattr(model, "named_steps", None)
+    if steps:
+        estimators.extend(steps.values())
+    for estimator in estimators:
+        if hasattr(estimator, "n_jobs"):
+            estimator.n_jobs = jobs
+    return model
+
+
+def load_for_serving(path):
+    """ joblib.load followed by set_serving_budget, the registry loader for the health forest. """
+    import joblib
+    return set_serving_budget(joblib.load(path))
+
+
+def model_jobs(model):
+    """ The n_jobs a (possibly pipelined) model will predict with, 1 when it has none. """
+    steps = getattr(model, "named_steps", None)
+    estimator = list(steps.values())[-1] if steps else model
+    jobs = getattr(estimator, "n_jobs", None)
+    return _resolve(jobs) if jobs is not None else 1
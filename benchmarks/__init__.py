@@ -0,0 +1,5 @@
+"""
+Benchmarks for the insurance premium packages. Each module can be run on its own with `python -m benchmarks.<name>`.
+`python -m benchmarks.suite run` collects the headline numbers of every product into one JSON file, and
+`python -m benchmarks.suite compare baseline.json bench.json` flags regressions against a saved baseline.
+"""
@@ -0,0 +1,97 @@
+"""
+cold_start.py
+----------------------------------------
+Wall time of a fresh process that answers one quote per product, once through the library (pandas / scikit-learn /
+pickle) and once through an exported bundle with `Insurance_Core.runtime` (NumPy only). This is what a CLI quote or a
+short batch job pays before it does any real work.
+
+Run with `python -m benchmarks.cold_start [--repeat 5]`. A 100 tree health forest and a small home model are trained
+into a temporary directory first.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.import_time import PROJECT_ROOT
+from benchmarks.suite import synthetic_home_data
+
+CAR = {"age": 30, "annual_km": 15000, "car_age": 5, "exp_years": 10, "num_accidents": 0, "vehicle_type": "suv"}
+HOME = {"Claim_3_Years": "NO", "Owner_Employment_Status": "YES", "Accidental_Damage": "NO", "Owner_Sex": "M",
+        "Alarm_Present": "YES", "Locks_Present": "YES", "Bedrooms": 3, "Flooding": "NO", "Safe_Installed": "NO",
+        "YearBuilt": 1990}
+HEALTH = {"age": 40, "sex": "male", "bmi": 27.5, "children": 1, "smoker": "no", "region": "northwest"}
+
+LIBRARY = {
+    "car": "from Car_Insurance.training import CarInsurance\nprint(CarInsurance().final_premium(**{record!r}))",
+    "home": "from Home_Insurance.Premium_calculator import Predict\n"
+            "print(Predict({home_model!r}, {home_features!r}).predict_price({record!r}))",
+    "health": "from Health_Insurance.result import result\n"
+              "print(result(path={health_model!r}, **{record!r}).predict()[0])",
+}
+RUNTIME = ("from Insurance_Core.runtime import load_bundle\n"
+           "print(load_bundle({prefix!r}).quote({product!r}, {record!r}))")
+
+
+def wall_time(code, repeat):
+    """ Fastest wall time of `repeat` fresh interpreters running `code`, and the last output. """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                             check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings), out.stdout.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold start of one quote: library vs exported bundle.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--trees", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    from Health_Insurance.training import Training, save
+    from Home_Insurance.Risk_factor import data
+    from Insurance_Core.export import export_bundle
+
+    workdir = tempfile.mkdtemp(prefix="cold_start.")
+    paths = {
+        "home_model": os.path.join(workdir, "home_model.pkl"),
+        "home_features": os.path.join(workdir, "home_features.pkl"),
+        "health_model": os.path.join(workdir, "health_model.pkl"),
+        "prefix": os.path.join(workdir, "bundle"),
+    }
+    try:
+        cwd = os.getcwd()
+        os.chdir(PROJECT_ROOT)
+        try:
+            csv_path = os.path.join(workdir, "home.csv")
+            synthetic_home_data(csv_path, 5000)
+            home = data(csv_path)
+            home.preprocess()
+            home.train()
+            home.save(paths["home_model"], paths["home_features"])
+            model, _, _ = Training(args.trees, 0.2)
+            save(model, paths["health_model"])
+        finally:
+            os.chdir(cwd)
+        export_bundle(paths["prefix"], home=(paths["home_model"], paths["home_features"]),
+                      health=paths["health_model"])
+
+        print(f"{'product':<8} {'library ms':>11} {'bundle ms':>10} {'speedup':>8}  quotes")
+        for product, record in [("car", CAR), ("home", HOME), ("health", HEALTH)]:
+            library, lib_out = wall_time(LIBRARY[product].format(record=record, **paths), args.repeat)
+            runtime, run_out = wall_time(RUNTIME.format(product=product, record=record, **paths), args.repeat)
+            print(f"{product:<8} {library * 1000:11.1f} {runtime * 1000:10.1f} {library / runtime:7.1f}x  "
+                  f"{lib_out} / {run_out}")
+        bare, _ = wall_time("pass", args.repeat)
+        print(f"(an empty interpreter starts in {bare * 1000:.1f} ms)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
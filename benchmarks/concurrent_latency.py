@@ -0,0 +1,98 @@
+"""
+concurrent_latency.py
+----------------------------------------
+p50 / p99 single-row latency of the health forest under concurrent load, once with the artifact as pickled (trained
+with n_jobs=-1, every predict spins up a thread pool over all cores) and once reset to the serving budget and sharing
+the process thread cap.
+
+Run with `python -m benchmarks.concurrent_latency`.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.result import FEATURES
+from Health_Insurance.compact import compact_path
+from Health_Insurance.training import Training, save
+from Insurance_Core.threads import set_serving_budget, model_jobs, thread_cap
+
+
+def run_load(model, rows, workers, requests, capped):
+    """ `workers` threads each send `requests` single-row predictions, returns the latencies in seconds. """
+    latencies = [[] for _ in range(workers)]
+    start_gate = threading.Barrier(workers)
+
+    def worker(k):
+        start_gate.wait()
+        for i in range(requests):
+            row = rows.iloc[[(k * requests + i) % len(rows)]]
+            t0 = time.perf_counter()
+            if capped:
+                with thread_cap.reserve(model_jobs(model)):
+                    model.predict(row)
+            else:
+                model.predict(row)
+            latencies[k].append(time.perf_counter() - t0)
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return np.concatenate([np.asarray(l) for l in latencies])
+
+
+def summarize(latencies):
+    return {
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def run(model_path, workers=8, requests=50):
+    rows = pd.read_csv("Health_Insurance/insurance_data.csv")[FEATURES]
+    before = joblib.load(model_path)
+    before.named_steps["rf"].n_jobs = -1  # what the training run pickled
+    after = set_serving_budget(joblib.load(model_path))
+
+    return {
+        "before": summarize(run_load(before, rows, workers, requests, capped=False)),
+        "after": summarize(run_load(after, rows, workers, requests, capped=True)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency of the health forest under concurrent load.")
+    parser.add_argument("--model", help="existing model artifact, a 100 tree forest is trained if omitted")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="requests per worker")
+    args = parser.parse_args(argv)
+
+    model_path = args.model
+    tmp = None
+    if model_path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".pkl", delete=False)
+        tmp.close()
+        model, _, _ = Training(100, 0.2)
+        save(model, tmp.name)
+        model_path = tmp.name
+    try:
+        res = run(model_path, args.workers, args.requests)
+    finally:
+        if tmp is not None:
+            os.remove(tmp.name)
+            os.remove(compact_path(tmp.name))
+
+    print(f"{args.workers} workers x {args.requests} requests, {os.cpu_count()} cpus")
+    for label in ("before", "after"):
+        print(f"{label:<7} p50 {res[label]['p50_ms']:8.2f} ms   p99 {res[label]['p99_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
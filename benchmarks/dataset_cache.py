@@ -0,0 +1,58 @@
+"""
+dataset_cache.py
+----------------------------------------
+Load time and in-memory size of a home dataset (synthetic, dataset.csv shaped) read three ways: untyped
+`pd.read_csv` as the trainers used to, the first `load_dataset` call that parses the CSV and writes the columnar cache,
+and a later `load_dataset` call that memory-maps the cache.
+
+Run with `python -m benchmarks.dataset_cache [--rows 1000000]`.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.suite import synthetic_home_data
+from Insurance_Core.datasets import load_dataset
+
+
+def timed(fn, repeat=1):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSV parsing vs the columnar dataset cache.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="dataset_cache.")
+    try:
+        csv_path = os.path.join(workdir, "dataset.csv")
+        cache = os.path.join(workdir, "cache")
+        synthetic_home_data(csv_path, args.rows)
+
+        rows = [
+            ("pd.read_csv", *timed(lambda: pd.read_csv(csv_path), args.repeat)),
+            ("load_dataset, cold", *timed(lambda: load_dataset("home", csv_path, directory=cache))),
+            ("load_dataset, cached", *timed(lambda: load_dataset("home", csv_path, directory=cache), args.repeat)),
+        ]
+        size = os.path.getsize(csv_path)
+        print(f"{args.rows:,} rows, csv {size / 2**20:.1f} MB")
+        print(f"{'':<22} {'seconds':>9} {'frame MB':>9}")
+        for label, seconds, frame in rows:
+            print(f"{label:<22} {seconds:9.3f} {frame.memory_usage(deep=True).sum() / 2**20:9.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
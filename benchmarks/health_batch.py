@@ -0,0 +1,80 @@
+"""
+health_batch.py
+----------------------------------------
+Throughput of Health_Insurance.result.predict_batch against the one-object-per-row `result(...).predict()` path.
+Trains a throwaway forest unless --model points at an existing artifact.
+
+Run with `python -m benchmarks.health_batch`.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from Health_Insurance.result import result, predict_batch, FEATURES
+from Health_Insurance.compact import compact_path
+from Health_Insurance.training import Training, save
+
+DATA_PATH = "Health_Insurance/insurance_data.csv"
+
+
+def make_rows(n):
+    """ n rows sampled (with replacement) from the training data. """
+    data = pd.read_csv(DATA_PATH)[FEATURES]
+    return data.sample(n, replace=True, random_state=0).reset_index(drop=True)
+
+
+def run(model_path, per_row=200, batch=100000, chunk_size=10000):
+    rows = make_rows(batch)
+    predict_batch(rows.iloc[:10], path=model_path)  # load the model outside the timings
+
+    start = time.perf_counter()
+    for rec in rows.iloc[:per_row].to_dict("records"):
+        result(path=model_path, **rec).predict()
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predict_batch(rows, path=model_path, chunk_size=chunk_size)
+    batch_seconds = time.perf_counter() - start
+
+    row_rate = per_row / row_seconds
+    batch_rate = batch / batch_seconds
+    return {
+        "per_row_rows_per_second": row_rate,
+        "batch_rows_per_second": batch_rate,
+        "speedup": batch_rate / row_rate,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-row and batched health predictions.")
+    parser.add_argument("--model", help="existing model artifact, a 100 tree forest is trained if omitted")
+    parser.add_argument("--per-row", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    model_path = args.model
+    tmp = None
+    if model_path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".pkl", delete=False)
+        tmp.close()
+        model, _, _ = Training(100, 0.2)
+        save(model, tmp.name)
+        model_path = tmp.name
+    try:
+        res = run(model_path, args.per_row, args.batch, args.chunk_size)
+    finally:
+        if tmp is not None:
+            os.remove(tmp.name)
+            os.remove(compact_path(tmp.name))
+
+    print(f"per-row path : {res['per_row_rows_per_second']:12,.0f} rows/s")
+    print(f"predict_batch: {res['batch_rows_per_second']:12,.0f} rows/s")
+    print(f"speedup      : {res['speedup']:12,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+health_interval.py
+----------------------------------------
+Cost of Health_Insurance.result.predict_with_interval next to a plain predict, for one quote and for a batch:
+
+    predict       result(...).predict() / predict_batch
+    interval      result(...).predict_with_interval() / predict_with_interval, all leaf values in one traversal
+    per-tree      the naive interval: transform once, then every estimator's predict() separately
+
+Trains a throwaway forest unless --model points at an existing artifact.
+
+Run with `python -m benchmarks.health_interval [--trees 100] [--batch 20000]`.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.health_batch import make_rows
+from Health_Insurance.compact import compact_path
+from Health_Insurance.compiled import QUANTILES
+from Health_Insurance.result import predict_batch, predict_with_interval, result
+from Health_Insurance.training import Training, save
+from Insurance_Core.registry import registry
+
+
+def per_tree(model, rows, quantiles=QUANTILES):
+    """ The interval the slow way, one `predict` per estimator. """
+    X = model.named_steps["preprocess"].transform(rows)
+    P = np.stack([tree.predict(X) for tree in model.named_steps["rf"].estimators_], axis=1)
+    return P.mean(axis=1), np.quantile(P, quantiles, axis=1).T
+
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def run(model_path, batch=20000, singles=200):
+    rows = make_rows(batch)
+    records = rows.iloc[:singles].to_dict("records")
+    model = registry.get(model_path)
+    predict_with_interval(rows.iloc[:10], path=model_path)  # load the models outside the timings
+    predict_batch(rows.iloc[:10], path=model_path)
+
+    def one(method):
+        return lambda: [getattr(result(path=model_path, **rec), method)() for rec in records]
+
+    return {
+        "single": {
+            "predict": _best(one("predict"), 3) / singles,
+            "interval": _best(one("predict_with_interval"), 3) / singles,
+            "per-tree": _best(lambda: [per_tree(model, rows.iloc[[i]]) for i in range(20)], 3) / 20,
+        },
+        "batch": {
+            "predict": _best(lambda: predict_batch(rows, path=model_path), 3),
+            "interval": _best(lambda: predict_with_interval(rows, path=model_path), 3),
+            "per-tree": _best(lambda: per_tree(model, rows), 3),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction intervals against plain predictions.")
+    parser.add_argument("--model", help="existing model artifact, a forest is trained if omitted")
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    model_path = args.model
+    tmp = None
+    if model_path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".pkl", delete=False)
+        tmp.close()
+        model, _, _ = Training(args.trees, 0.2, cache=False)
+        save(model, tmp.name)
+        model_path = tmp.name
+    try:
+        res = run(model_path, args.batch)
+    finally:
+        if tmp is not None:
+            os.remove(tmp.name)
+            os.remove(compact_path(tmp.name))
+
+    print(f"{'':<10} {'single ms':>10} {f'batch {args.batch} ms':>16}")
+    for name in ("predict", "interval", "per-tree"):
+        print(f"{name:<10} {res['single'][name]:10.3f} {res['batch'][name]:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
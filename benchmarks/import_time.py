@@ -0,0 +1,81 @@
+"""
+import_time.py
+----------------------------------------
+Measures the cold import time of each package in a fresh interpreter and enforces the import budgets below. A package
+with a budget must also stay clear of the heavy libraries, so `import Health_Insurance` can never again train a model
+or pull in scikit-learn at startup.
+
+Run with `python -m benchmarks.import_time`, exits non-zero when a budget is exceeded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# package -> maximum cold import time in seconds
+BUDGETS = {
+    "Health_Insurance": 0.050,
+    # NumPy alone takes most of this, see Insurance_Core/export.py
+    "Insurance_Core.runtime": 0.250,
+}
+
+HEAVY_MODULES = ["sklearn", "pandas", "joblib"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module, repeat=5):
+    """
+    Imports `module` in `repeat` fresh interpreters. Returns the fastest import time (the least noisy estimate) and
+    the heavy libraries that the import pulled in.
+    """
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    timings, heavy = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(probe["seconds"])
+        heavy = probe["heavy"]
+    return {"module": module, "seconds": min(timings), "heavy": heavy}
+
+
+def check_budgets(budgets=BUDGETS, repeat=5):
+    """ Returns (results, failures) where failures lists a message for every broken budget. """
+    results, failures = [], []
+    for module, budget in budgets.items():
+        res = measure_import(module, repeat)
+        res["budget"] = budget
+        results.append(res)
+        if res["seconds"] > budget:
+            failures.append(f"{module} imported in {res['seconds'] * 1000:.1f} ms, budget is {budget * 1000:.0f} ms")
+        if res["heavy"]:
+            failures.append(f"{module} imported {', '.join(res['heavy'])} at import time")
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import times and enforce the import budgets.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results, failures = check_budgets(repeat=args.repeat)
+    for res in results:
+        print(f"{res['module']:<20} {res['seconds'] * 1000:8.1f} ms   (budget {res['budget'] * 1000:.0f} ms)")
+    for msg in failures:
+        print(f"FAIL: {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+incremental_training.py
+----------------------------------------
+Cost of growing the health forest from `--start` to `--trees` trees: a full `Training(trees)` refit against
+`IncrementalTraining` resuming from a checkpoint of `--start` trees, which only fits the new ones. Neither run uses the
+fit cache.
+
+Run with `python -m benchmarks.incremental_training [--start 100] [--trees 500] [--step 50]`.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from Health_Insurance.training import IncrementalTraining, Training
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full refit vs warm-start growth of the health forest.")
+    parser.add_argument("--start", type=int, default=100)
+    parser.add_argument("--trees", type=int, default=500)
+    parser.add_argument("--step", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="incremental_training.")
+    try:
+        checkpoint = os.path.join(workdir, "checkpoint.pkl")
+        IncrementalTraining(args.start, step=args.step, checkpoint=checkpoint, cache=False)
+
+        start = time.perf_counter()
+        _, rmse, _ = Training(args.trees, cache=False)
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, grown_rmse, _, history = IncrementalTraining(args.trees, step=args.step, checkpoint=checkpoint, cache=False)
+        grown = time.perf_counter() - start
+
+        print(f"{'trees':>6} {'RMSE':>9} {'R2':>7} {'step s':>7}")
+        for h in history:
+            print(f"{h['trees']:6d} {h['rmse']:9.2f} {h['r2']:7.4f} {h['seconds']:7.2f}")
+        print(f"Training({args.trees}) from scratch:        {full:6.2f} s  RMSE {rmse:.2f}")
+        print(f"IncrementalTraining {args.start} -> {args.trees}:    {grown:6.2f} s  RMSE {grown_rmse:.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
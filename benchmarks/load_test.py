@@ -0,0 +1,120 @@
+"""
+load_test.py
+----------------------------------------
+Load-test client for the quoting service. Opens `--connections` keep-alive connections that each send `--requests`
+single-record quotes back to back, and reports throughput, p50 / p99 latency and the service's mean batch size.
+
+Without --port a service is started in this process, twice: once with max_batch=1 (every request is its own model
+call) and once with micro-batching, so the two can be compared. With --port it targets a running service instead.
+
+Run with `python -m benchmarks.load_test [--product car|home|health]`.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from Insurance_Core.service import QuoteService
+
+SAMPLES = {
+    "car": {"age": 30, "annual_km": 15000, "car_age": 5, "exp_years": 10, "num_accidents": 0, "vehicle_type": "suv"},
+    "home": {"Claim_3_Years": "YES", "Owner_Employment_Status": "YES", "Accidental_Damage": "NO", "Owner_Sex": "M",
+             "Alarm_Present": "NO", "Locks_Present": "YES", "Bedrooms": 3, "Flooding": "NO", "Safe_Installed": "YES",
+             "YearBuilt": 2000},
+    "health": {"age": 40, "sex": "male", "bmi": 27.5, "children": 1, "smoker": "no", "region": "northwest"},
+}
+
+
+async def request(reader, writer, host, method, path, payload=None):
+    """ One HTTP/1.1 request on an open keep-alive connection, returns (status, decoded JSON). """
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_load(host, port, product, connections, requests):
+    payload = SAMPLES[product]
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                status, _ = await request(reader, writer, host, "POST", f"/quote/{product}", payload)
+                latencies.append(time.perf_counter() - t0)
+                errors += status != 200
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, stats = await request(reader, writer, host, "GET", "/stats")
+    writer.close()
+
+    lat = np.array(latencies) * 1000
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "errors": errors,
+        "mean_batch": stats[product]["mean_batch"],
+    }
+
+
+def report(label, result):
+    print(f"{label:<14} {result['throughput']:9.0f} req/s   p50 {result['p50_ms']:7.2f} ms   "
+          f"p99 {result['p99_ms']:7.2f} ms   mean batch {result['mean_batch']:6.1f}   errors {result['errors']}")
+
+
+async def local_runs(args):
+    for label, max_batch in [("unbatched", 1), ("micro-batched", args.max_batch)]:
+        service = await QuoteService(port=0, max_batch=max_batch, max_delay=args.max_delay_ms / 1000).start()
+        try:
+            report(label, await run_load(service.host, service.port, args.product, args.connections, args.requests))
+        finally:
+            await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the local quoting service.")
+    parser.add_argument("--product", choices=sorted(SAMPLES), default="car")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=50, help="requests per connection")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="target a running service instead")
+    args = parser.parse_args(argv)
+
+    print(f"{args.connections} connections x {args.requests} {args.product} quotes")
+    if args.port is None:
+        asyncio.run(local_runs(args))
+    else:
+        report("service", asyncio.run(
+            run_load(args.host, args.port, args.product, args.connections, args.requests)
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+mmap_load.py
+----------------------------------------
+Cold load time and memory per process of the health model, loaded the old way (`joblib.load` of the pickled pipeline,
+every tree copied into the process) and the new way (the compact forest `training.save` writes next to it,
+memory-mapped). N independent processes (not forked, nothing shared through copy-on-write) each load the model,
+score every row of insurance_data.csv and then report from /proc/self/smaps_rollup. The processes start one after the
+other and stay alive until the last one has reported:
+
+    load_ms    time of the load call. NumPy, pandas and joblib are imported before, scikit-learn is not: unpickling
+               the pipeline imports it, the mapped forest never needs it
+    rss_mb     resident memory added by loading and scoring
+    pss_mb     proportional share: mapped pages are split between the processes that map them
+
+With the pickle every process holds a private copy of the forest. With the mapped file the forest is one page-cache
+copy shared by all of them, so Pss per process drops as N grows. `joblib.load(mmap_mode="r")` of the pickle is shown as
+well: scikit-learn copies the tree arrays into its own buffers while unpickling, so it does not help the forest.
+
+Run with `python -m benchmarks.mmap_load [--workers 4] [--trees 500]`. Linux only.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.import_time import PROJECT_ROOT
+
+HEALTH_DATA = "Health_Insurance/insurance_data.csv"
+LOADERS = ["pickle", "pickle-mmap", "mapped"]
+
+CHILD = """
+import json, sys, time
+import joblib, numpy, pandas
+from Health_Insurance.compact import compact_path, load_compact
+from Health_Insurance.compiled import FEATURES
+from Insurance_Core.prefork import smaps_rollup
+
+kind, path = sys.argv[1], sys.argv[2]
+rows = pandas.read_csv({data!r})[FEATURES]
+before = smaps_rollup()
+start = time.perf_counter()
+if kind == "mapped":
+    model = load_compact(compact_path(path), mmap=True)
+else:
+    model = joblib.load(path, mmap_mode="r" if kind == "pickle-mmap" else None)
+seconds = time.perf_counter() - start
+model.predict(rows)
+after = smaps_rollup()
+print(json.dumps({{"load_ms": seconds * 1000, "rss_mb": (after["Rss"] - before["Rss"]) / 1024,
+                  "pss_mb": (after["Pss"] - before["Pss"]) / 1024}}), flush=True)
+sys.stdin.read()
+"""
+
+
+def probe(kind, path, workers=1):
+    """ Starts `workers` processes that load the model at `path` with `kind`, returns their reports. """
+    code = CHILD.format(data=os.path.join(PROJECT_ROOT, HEALTH_DATA))
+    procs, reports = [], []
+    try:
+        # one process starts after the previous one reported, so loads do not compete for the cores, and every
+        # process stays alive until the end so the later ones share pages with the earlier ones
+        for _ in range(workers):
+            procs.append(subprocess.Popen([sys.executable, "-c", code, kind, path], cwd=PROJECT_ROOT,
+                                          stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True))
+            reports.append(json.loads(procs[-1].stdout.readline()))
+        return reports
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pickled vs memory-mapped health model: load time and memory.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--trees", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from Health_Insurance.training import Training, save
+
+    workdir = tempfile.mkdtemp(prefix="mmap_load.")
+    try:
+        path = os.path.join(workdir, "random_forest.pkl")
+        model, _, _ = Training(args.trees, 0.2, cache=False)
+        save(model, path)
+        print(f"{args.trees} trees, {args.workers} processes")
+        print(f"{'loader':<12} {'load ms':>8} {'rss MB':>8} {'pss MB':>8}")
+        for kind in LOADERS:
+            reports = probe(kind, path, args.workers)
+            n = len(reports)
+            print(f"{kind:<12} {sum(r['load_ms'] for r in reports) / n:8.1f} "
+                  f"{sum(r['rss_mb'] for r in reports) / n:8.1f} {sum(r['pss_mb'] for r in reports) / n:8.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
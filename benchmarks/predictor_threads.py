@@ -0,0 +1,116 @@
+"""
+predictor_threads.py
+----------------------------------------
+Throughput of one shared predictor per product (CarPredictor, HomePredictor, HealthPredictor) called from 1, 2, 4, ...
+threads at once. Every thread scores the same number of batches, so with the GIL released in the NumPy / tree part of
+each call the rows/s should grow with the thread count up to the number of cores.
+
+Run with `python -m benchmarks.predictor_threads [--threads 1 2 4 8] [--batch 2000]`.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.import_time import PROJECT_ROOT
+from benchmarks.suite import synthetic_home_data
+
+HEALTH_DATA = "Health_Insurance/insurance_data.csv"
+
+
+def throughput(predict, batch, threads, rounds):
+    """ rows/s of `threads` threads each calling predict(batch) `rounds` times, started together. """
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+
+    def work():
+        barrier.wait()
+        try:
+            for _ in range(rounds):
+                predict(batch)
+        except Exception as e:  # reported after the run
+            errors.append(e)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return threads * rounds * len(batch) / elapsed
+
+
+def products(batch, workdir, trees):
+    from Car_Insurance.predictor import CarPredictor
+    from Health_Insurance.predictor import HealthPredictor
+    from Health_Insurance.training import Training, save
+    from Home_Insurance.predictor import HomePredictor
+    from Home_Insurance.Risk_factor import data
+
+    rng = np.random.default_rng(0)
+    car = pd.DataFrame({
+        "age": rng.integers(18, 66, batch),
+        "annual_km": rng.integers(10, 26, batch) * 1000,
+        "car_age": rng.integers(0, 30, batch),
+        "exp_years": rng.integers(0, 40, batch),
+        "num_accidents": rng.integers(0, 5, batch),
+        "vehicle_type": rng.choice(["sedan", "suv", "sports", "truck"], batch),
+    })
+
+    csv_path = os.path.join(workdir, "home.csv")
+    model_path = os.path.join(workdir, "home_model.pkl")
+    feature_path = os.path.join(workdir, "home_features.pkl")
+    synthetic_home_data(csv_path, max(batch, 1000))
+    home = data(csv_path)
+    home.preprocess()
+    home.train()
+    home.save(model_path, feature_path)
+    home_rows = home.data.drop(columns="Annual_Premium_Price").dropna().head(batch).reset_index(drop=True)
+
+    health_path = os.path.join(workdir, "health_model.pkl")
+    model, _, _ = Training(trees, 0.2)
+    save(model, health_path)
+    people = pd.read_csv(HEALTH_DATA).drop(columns="charges").sample(batch, replace=True, random_state=0)
+
+    return [
+        ("car", CarPredictor().predict_batch, car),
+        ("home", HomePredictor.load(model_path, feature_path).predict_batch, home_rows),
+        ("health", HealthPredictor.load(health_path).predict_batch, people.reset_index(drop=True)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared predictor throughput by thread count.")
+    parser.add_argument("--threads", type=int, nargs="*", default=[1, 2, 4, 8])
+    parser.add_argument("--batch", type=int, default=2000, help="rows per call")
+    parser.add_argument("--rounds", type=int, default=20, help="calls per thread")
+    parser.add_argument("--trees", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="predictor_threads.")
+    cwd = os.getcwd()
+    try:
+        os.chdir(PROJECT_ROOT)
+        cases = products(args.batch, workdir, args.trees)
+        print(f"{os.cpu_count()} cpus, {args.batch} rows per call, {args.rounds} calls per thread")
+        print(f"{'product':<8} " + " ".join(f"{f'{t} thr rows/s':>16}" for t in args.threads) + "   scaling")
+        for name, predict, batch in cases:
+            predict(batch)  # warm up
+            rates = [throughput(predict, batch, t, args.rounds) for t in args.threads]
+            print(f"{name:<8} " + " ".join(f"{r:16,.0f}" for r in rates) + f"   {rates[-1] / rates[0]:.2f}x")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
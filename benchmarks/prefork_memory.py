@@ -0,0 +1,88 @@
+"""
+prefork_memory.py
+----------------------------------------
+Memory of N worker processes serving the health forest, when the workers share the parent's copy of the model
+(loaded before fork, gc.freeze()) versus when every worker loads its own copy. Each worker scores a few quotes before
+it is measured, so pages dirtied by reference counting show up in the numbers.
+
+Run with `python -m benchmarks.prefork_memory [--workers 4]`. Linux only.
+"""
+import argparse
+import gc
+import os
+import signal
+import tempfile
+
+import pandas as pd
+
+from Health_Insurance.result import FEATURES, predict_batch
+from Health_Insurance.compact import compact_path
+from Health_Insurance.training import Training, save
+from Insurance_Core.prefork import format_report, memory_report
+from Insurance_Core.registry import registry
+from Insurance_Core.threads import load_for_serving
+
+
+def run(model_path, workers, shared):
+    registry.invalidate()
+    rows = pd.read_csv("Health_Insurance/insurance_data.csv")[FEATURES].head(50)
+    if shared:
+        registry.get(model_path, loader=load_for_serving)
+        gc.collect()
+        gc.freeze()
+
+    pids, pipes = [], []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            if not shared:
+                registry.invalidate()
+            predict_batch(rows, model_path)
+            os.write(write_fd, b"1")
+            signal.pause()
+            os._exit(0)
+        os.close(write_fd)
+        pids.append(pid)
+        pipes.append(read_fd)
+
+    for fd in pipes:
+        os.read(fd, 1)
+        os.close(fd)
+    try:
+        return memory_report(pids)
+    finally:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        gc.unfreeze()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker memory with and without copy-on-write model sharing.")
+    parser.add_argument("--model", help="existing model artifact, a 100 tree forest is trained if omitted")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    model_path = args.model
+    tmp = None
+    if model_path is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".pkl", delete=False)
+        tmp.close()
+        model, _, _ = Training(100, 0.2)
+        save(model, tmp.name)
+        model_path = tmp.name
+    try:
+        for label, shared in [("each worker loads its own copy", False), ("loaded once before fork", True)]:
+            report = run(model_path, args.workers, shared)
+            print(f"\n{label}: total pss {sum(r['pss_kb'] for r in report) / 1024:.1f} MB")
+            print(format_report(report))
+    finally:
+        if tmp is not None:
+            os.remove(tmp.name)
+            os.remove(compact_path(tmp.name))
+
+
+if __name__ == "__main__":
+    main()
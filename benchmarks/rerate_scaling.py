@@ -0,0 +1,60 @@
+"""
+rerate_scaling.py
+----------------------------------------
+Throughput of the re-rating engine on a synthetic car book as the number of worker processes grows. With chunks large
+enough to amortize pickling them to the workers, rows/s should grow close to linearly up to the physical core count.
+
+Run with `python -m benchmarks.rerate_scaling [--rows 1000000]`.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from Insurance_Core.rerate import rerate
+
+
+def synthetic_book(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "age": rng.integers(18, 66, rows),
+        "annual_km": rng.integers(10, 26, rows) * 1000,
+        "car_age": rng.integers(0, 30, rows),
+        "exp_years": rng.integers(0, 40, rows),
+        "num_accidents": rng.integers(0, 5, rows),
+        "vehicle_type": rng.choice(["sedan", "suv", "sports", "truck"], rows),
+    }).to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-rating throughput versus worker count.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="*", default=None, help="worker counts to try")
+    args = parser.parse_args(argv)
+
+    counts = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    directory = tempfile.mkdtemp()
+    try:
+        book = os.path.join(directory, "book.csv")
+        synthetic_book(book, args.rows)
+        print(f"{args.rows:,} car policies, chunks of {args.chunksize:,}, {os.cpu_count()} cpus")
+        base = None
+        for workers in counts:
+            out = os.path.join(directory, f"out{workers}")
+            start = time.perf_counter()
+            rerate(book, out, "car", args.chunksize, workers, resume=False)
+            rate = args.rows / (time.perf_counter() - start)
+            base = base or rate / workers
+            print(f"{workers:>3} workers {rate:12,.0f} rows/s   efficiency {rate / (base * workers):5.0%}")
+            shutil.rmtree(out)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+suite.py
+----------------------------------------
+One benchmark run over all products, stored as JSON so runs can be compared.
+
+    python -m benchmarks.suite run --output bench.json           # full run
+    python -m benchmarks.suite run --quick --groups car home     # smaller sizes, selected groups
+    python -m benchmarks.suite compare baseline.json bench.json --threshold 0.15
+
+Groups and metrics:
+    import   cold import time of each package (fresh interpreter, best of --repeat)
+    car      single quote p50 / p99, batch throughput
+    home     data.preprocess and data.train wall time, model load time, single quote p50 / p99, batch throughput
+    health   Training wall time, model load time, single quote p50 / p99, batch throughput, the cold load time and
+             resident memory of a fresh process loading the pickle vs memory-mapping the compact forest, and the
+             predict_one p50 of the mapped forest next to the compiled one (mapped_vs_compiled, their ratio)
+
+Every metric records its unit and whether lower or higher is better. `compare` flags a metric as a regression when it
+is worse than the baseline by more than the threshold (a fraction, 0.15 = 15%) and exits non-zero.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.import_time import PROJECT_ROOT, measure_import
+
+GROUPS = ["import", "car", "home", "health"]
+PACKAGES = ["Car_Insurance", "Home_Insurance", "Health_Insurance", "Insurance_Core"]
+HEALTH_DATA = "Health_Insurance/insurance_data.csv"
+
+FULL = {"repeat": 5, "quotes": 2000, "batch": 100000, "trees": 500, "home_rows": 100000}
+QUICK = {"repeat": 2, "quotes": 200, "batch": 10000, "trees": 50, "home_rows": 5000}
+
+
+def metric(value, unit, better="lower"):
+    return {"value": float(value), "unit": unit, "better": better}
+
+
+def latency(fn, n, warmup=20):
+    """ p50 / p99 of `n` calls of fn() in microseconds. """
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(n)
+    for i in range(n):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return np.percentile(samples, 50) * 1e6, np.percentile(samples, 99) * 1e6
+
+
+def timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - start, out
+
+
+def bench_import(sizes, workdir):
+    return {
+        f"import.{package}": metric(measure_import(package, sizes["repeat"])["seconds"] * 1000, "ms")
+        for package in PACKAGES
+    }
+
+
+def bench_car(sizes, workdir):
+    from Car_Insurance.training import CarInsurance
+
+    model = CarInsurance()
+    rng = np.random.default_rng(0)
+    n = sizes["batch"]
+    frame = pd.DataFrame({
+        "age": rng.integers(18, 66, n),
+        "annual_km": rng.integers(10, 26, n) * 1000,
+        "car_age": rng.integers(0, 30, n),
+        "exp_years": rng.integers(0, 40, n),
+        "num_accidents": rng.integers(0, 5, n),
+        "vehicle_type": rng.choice(["sedan", "suv", "sports", "truck"], n),
+    })
+    p50, p99 = latency(lambda: model.final_premium(30, 15000, 5, 10, 0, "suv"), sizes["quotes"])
+    seconds, _ = timed(lambda: model.final_premium_batch(frame))
+    return {
+        "car.quote_p50": metric(p50, "us"),
+        "car.quote_p99": metric(p99, "us"),
+        "car.batch_throughput": metric(n / seconds, "rows/s", "higher"),
+    }
+
+
+def synthetic_home_data(path, rows, seed=0):
+    """ A dataset.csv shaped table (the real one is not shipped with the repo). """
+    rng = np.random.default_rng(seed)
+
+    def yes_no():
+        return rng.choice(["YES", "NO"], rows)
+
+    df = pd.DataFrame({
+        "Claim_3_Years": yes_no(),
+        "Owner_Employment_Status": yes_no(),
+        "Accidental_Damage": yes_no(),
+        "Owner_Sex": rng.choice(["M", "F"], rows),
+        "Alarm_Present": yes_no(),
+        "Locks_Present": yes_no(),
+        "Bedrooms": rng.integers(1, 7, rows).astype(float),
+        "Flooding": yes_no(),
+        "Safe_Installed": yes_no(),
+        "YearBuilt": rng.integers(1800, 2025, rows).astype(float),
+    })
+    df.loc[rng.choice(rows, rows // 50, replace=False), "Bedrooms"] = np.nan
+    df["Annual_Premium_Price"] = 150 + 20 * df["Bedrooms"].fillna(3) + rng.normal(0, 10, rows)
+    df.to_csv(path, index=False)
+
+
+def bench_home(sizes, workdir):
+    from Home_Insurance.Premium_calculator import Predict
+    from Home_Insurance.Risk_factor import data
+    from Insurance_Core.registry import mmap_load, registry
+
+    csv_path = os.path.join(workdir, "home.csv")
+    model_path = os.path.join(workdir, "home_model.pkl")
+    feature_path = os.path.join(workdir, "home_features.pkl")
+    synthetic_home_data(csv_path, sizes["home_rows"])
+
+    x = data(csv_path)
+    preprocess_seconds, _ = timed(x.preprocess)
+    train_seconds, _ = timed(x.train)
+    x.save(model_path, feature_path)
+    load_seconds = min(timed(lambda: mmap_load(model_path))[0] for _ in range(sizes["repeat"]))
+
+    registry.invalidate(model_path)
+    predictor = Predict(model_path, feature_path)
+    record = x.data.drop(columns="Annual_Premium_Price").iloc[0].to_dict()
+    p50, p99 = latency(lambda: predictor.predict_price(record), sizes["quotes"])
+    X = x.X.to_numpy()
+    seconds, _ = timed(lambda: predictor.predict_batch(X))
+    return {
+        "home.preprocess_seconds": metric(preprocess_seconds, "s"),
+        "home.train_seconds": metric(train_seconds, "s"),
+        "home.load_ms": metric(load_seconds * 1000, "ms"),
+        "home.quote_p50": metric(p50, "us"),
+        "home.quote_p99": metric(p99, "us"),
+        "home.batch_throughput": metric(len(X) / seconds, "rows/s", "higher"),
+    }
+
+
+def bench_health(sizes, workdir):
+    from benchmarks.mmap_load import probe
+    from Health_Insurance.compact import mapped_forest
+    from Health_Insurance.compiled import compile_pipeline
+    from Health_Insurance.result import FEATURES, predict_batch, result
+    from Health_Insurance.training import Training, save
+    from Insurance_Core.registry import registry
+    from Insurance_Core.threads import load_for_serving
+
+    model_path = os.path.join(workdir, "health_model.pkl")
+    # cache=False: time the fit itself, not a fit cache hit
+    train_seconds, (model, _, _) = timed(lambda: Training(sizes["trees"], 0.2, cache=False))
+    save(model, model_path)
+    load_seconds = min(timed(lambda: load_for_serving(model_path))[0] for _ in range(sizes["repeat"]))
+
+    registry.invalidate(model_path)
+    rows = pd.read_csv(HEALTH_DATA)[FEATURES].sample(sizes["batch"], replace=True, random_state=0)
+    rows = rows.reset_index(drop=True)
+    record = rows.iloc[0].to_dict()
+    compiled, compact = compile_pipeline(model), mapped_forest(model_path)
+    p50, p99 = latency(lambda: result(path=model_path, **record).predict(), min(sizes["quotes"], 500), warmup=5)
+    seconds, _ = timed(lambda: predict_batch(rows, path=model_path))
+    # single quotes go through the mapped forest, it should not walk the trees slower than the compiled one
+    n = min(sizes["quotes"], 500)
+    compiled_p50, _ = latency(lambda: compiled.predict_one(**record), n)
+    mapped_p50, _ = latency(lambda: compact.predict_one(**record), n)
+    # a fresh process each, so the load is cold and the memory is what a new worker would hold
+    pickled, = probe("pickle", model_path)
+    mapped, = probe("mapped", model_path)
+    return {
+        "health.train_seconds": metric(train_seconds, "s"),
+        "health.load_ms": metric(load_seconds * 1000, "ms"),
+        "health.cold_load_ms": metric(pickled["load_ms"], "ms"),
+        "health.cold_load_rss_mb": metric(pickled["rss_mb"], "MB"),
+        "health.mapped_load_ms": metric(mapped["load_ms"], "ms"),
+        "health.mapped_rss_mb": metric(mapped["rss_mb"], "MB"),
+        "health.quote_p50": metric(p50, "us"),
+        "health.quote_p99": metric(p99, "us"),
+        "health.batch_throughput": metric(len(rows) / seconds, "rows/s", "higher"),
+        "health.compiled_quote_p50": metric(compiled_p50, "us"),
+        "health.mapped_quote_p50": metric(mapped_p50, "us"),
+        "health.mapped_vs_compiled": metric(mapped_p50 / compiled_p50, "x"),
+    }
+
+
+BENCHMARKS = {"import": bench_import, "car": bench_car, "home": bench_home, "health": bench_health}
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                             text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(groups=None, quick=False):
+    """ Runs the selected groups (default all) and returns {"meta": ..., "results": {name: metric}}. """
+    sizes = QUICK if quick else FULL
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="bench.")
+    cwd = os.getcwd()
+    try:
+        # the products read their data with paths relative to the project root
+        os.chdir(PROJECT_ROOT)
+        for group in groups or GROUPS:
+            results.update(BENCHMARKS[group](sizes, workdir))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": quick,
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Compares two suite results. Returns one row per metric in both runs: (name, baseline, current, change, status)
+    where change is the relative change in the "worse" direction and status is "ok", "improved" or "REGRESSION".
+    """
+    rows = []
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+        now = current["results"][name]
+        if base["value"] == 0:
+            change = 0.0
+        elif base["better"] == "lower":
+            change = now["value"] / base["value"] - 1
+        else:
+            change = base["value"] / now["value"] - 1 if now["value"] else float("inf")
+        status = "REGRESSION" if change > threshold else "improved" if change < -threshold else "ok"
+        rows.append((name, base["value"], now["value"], change, status))
+    return rows
+
+
+def format_results(suite):
+    return "\n".join(
+        f"{name:<28} {m['value']:14,.2f} {m['unit']:<7} ({m['better']} is better)"
+        for name, m in suite["results"].items()
+    )
+
+
+def format_comparison(rows):
+    lines = [f"{'metric':<28} {'baseline':>14} {'current':>14} {'worse by':>9}  status"]
+    for name, base, now, change, status in rows:
+        lines.append(f"{name:<28} {base:14,.2f} {now:14,.2f} {change:9.1%}  {status}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite: run it, or compare two runs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run the benchmarks and write JSON")
+    run_p.add_argument("--output", default="bench.json")
+    run_p.add_argument("--groups", nargs="*", choices=GROUPS, default=None)
+    run_p.add_argument("--quick", action="store_true", help="small sizes, for a smoke test")
+    cmp_p = sub.add_parser("compare", help="flag regressions of a run against a baseline")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        suite = run_suite(args.groups, args.quick)
+        with open(args.output, "w") as f:
+            json.dump(suite, f, indent=2)
+        print(format_results(suite))
+        print(f"Wrote {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print(format_comparison(rows))
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
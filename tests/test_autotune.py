@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.autotune import autotune, pareto_front, select
+from Health_Insurance.compact import mapped_forest
+from Insurance_Core.registry import registry
+
+
+class TestAutotune(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.output = os.path.join(cls.directory, "best.pkl")
+        cls.report = autotune(trees=(5, 10), depths=(None, 4), min_leaf=(1,), workers=2, max_bytes=10 << 20,
+                              batch_rows=200, output=cls.output, cache=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        registry.invalidate()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_pareto_front(self):
+        a = {"rmse": 1.0, "latency_ms": 2.0, "batch_ms": 1.0, "bytes": 10}
+        b = {"rmse": 2.0, "latency_ms": 1.0, "batch_ms": 1.0, "bytes": 10}
+        c = {"rmse": 2.0, "latency_ms": 2.0, "batch_ms": 1.0, "bytes": 10}   # dominated by both
+        d = dict(a)                                                         # ties do not dominate
+        self.assertEqual(pareto_front([a, b, c, d]), [a, b, d])
+
+    def test_select(self):
+        fast = {"rmse": 5.0, "latency_ms": 0.1, "batch_ms": 1.0, "bytes": 100}
+        accurate = {"rmse": 4.0, "latency_ms": 1.0, "batch_ms": 9.0, "bytes": 1000}
+        self.assertIs(select([fast, accurate]), accurate)
+        self.assertIs(select([fast, accurate], max_latency_ms=0.5), fast)
+        self.assertIs(select([fast, accurate], max_bytes=500), fast)
+        self.assertIsNone(select([fast, accurate], max_batch_ms=0.5))
+
+    def test_report(self):
+        candidates = self.report["candidates"]
+        self.assertEqual(len(candidates), 4)
+        self.assertEqual({(c["n_estimators"], c["max_depth"]) for c in candidates},
+                         {(5, None), (5, 4), (10, None), (10, 4)})
+        for c in candidates:
+            self.assertGreater(c["rmse"], 0)
+            self.assertGreater(c["latency_ms"], 0)
+            self.assertGreater(c["batch_ms"], 0)
+            self.assertGreater(c["bytes"], 0)
+        self.assertEqual([c["rmse"] for c in candidates], sorted(c["rmse"] for c in candidates))
+        self.assertTrue(self.report["pareto"])
+        self.assertEqual(self.report["pareto"], pareto_front(candidates))
+
+    def test_best_model_saved(self):
+        best = self.report["best"]
+        self.assertIs(best, select(self.report["candidates"], max_bytes=10 << 20))
+        model = joblib.load(self.output)
+        rf = model.named_steps["rf"]
+        self.assertEqual((rf.n_estimators, rf.max_depth), (best["n_estimators"], best["max_depth"]))
+        data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+        self.assertTrue(np.all(np.isfinite(model.predict(data))))
+        forest = mapped_forest(self.output)
+        self.assertIsNotNone(forest)
+        np.testing.assert_allclose(forest.predict(data), model.predict(data), rtol=1e-12)
+
+    def test_nothing_fits(self):
+        report = autotune(trees=(3,), depths=(2,), min_leaf=(1,), workers=1, max_bytes=1, batch_rows=10, cache=False)
+        self.assertIsNone(report["best"])
+        self.assertEqual(len(report["pareto"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
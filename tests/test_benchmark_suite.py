@@ -0,0 +1,61 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+
+from benchmarks.suite import compare, main, metric, run_suite
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.suite = run_suite(["car"], quick=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def write(self, name, results):
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            json.dump({"meta": {}, "results": results}, f)
+        return path
+
+    def test_run_records_units_and_direction(self):
+        results = self.suite["results"]
+        self.assertEqual(set(results), {"car.quote_p50", "car.quote_p99", "car.batch_throughput"})
+        self.assertEqual(results["car.quote_p50"]["better"], "lower")
+        self.assertEqual(results["car.batch_throughput"]["unit"], "rows/s")
+        self.assertGreater(results["car.batch_throughput"]["value"], 0)
+        self.assertTrue(self.suite["meta"]["quick"])
+        json.dumps(self.suite)
+
+    def test_compare_flags_regressions_in_the_right_direction(self):
+        baseline = {"results": {
+            "latency": metric(100, "us"),
+            "throughput": metric(1000, "rows/s", "higher"),
+            "steady": metric(10, "s"),
+            "new_only_in_baseline": metric(1, "s"),
+        }}
+        current = {"results": {
+            "latency": metric(80, "us"),
+            "throughput": metric(800, "rows/s", "higher"),
+            "steady": metric(10.5, "s"),
+        }}
+        status = {row[0]: row[4] for row in compare(baseline, current, threshold=0.10)}
+
+        self.assertEqual(status, {"latency": "improved", "throughput": "REGRESSION", "steady": "ok"})
+
+    def test_compare_command_exit_code(self):
+        base = self.write("base.json", {"x": metric(1.0, "s")})
+        same = self.write("same.json", {"x": metric(1.05, "s")})
+        slow = self.write("slow.json", {"x": metric(2.0, "s")})
+
+        self.assertEqual(main(["compare", base, same]), 0)
+        self.assertEqual(main(["compare", base, slow]), 1)
+        self.assertEqual(main(["compare", base, slow, "--threshold", "1.5"]), 0)
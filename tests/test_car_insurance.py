@@ -1,6 +1,12 @@
 import unittest
+import numpy as np
+import pandas as pd
 from Car_Insurance.training import CarInsurance, result
 from Car_Insurance.preprocessing import age_factor,mileage_factor,experience_factor,car_age_factor,experience_factor
+from Car_Insurance.preprocessing import combined_factors, combined_factors_batch
+from Car_Insurance.preprocessing import Age_Multipliers, Age_Table, Car_Age_Multiplier, Car_Age_Table
+from Car_Insurance.rating_table import RatingTable
+from Car_Insurance.exceptions import InvalidInputError
 
 class TestCarInsurance(unittest.TestCase):
 
@@ -43,5 +49,110 @@ class TestCarInsurance(unittest.TestCase):
         self.assertIsInstance(p2, float)
 
 
+class TestCarInsuranceBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Starting TestCarInsuranceBatch...")
+        rng = np.random.default_rng(7)
+        n = 5000
+        # Ranges go past the multiplier tables on purpose so the 1.0 defaults are covered too
+        cls.frame = pd.DataFrame({
+            "age": rng.integers(15, 70, n),
+            "annual_km": rng.integers(5000, 30000, n),
+            "car_age": rng.integers(0, 40, n),
+            "exp_years": rng.integers(0, 45, n),
+            "num_accidents": rng.integers(0, 7, n),
+            "vehicle_type": rng.choice(["sedan", "SUV", "sports", "truck", "van"], n),
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Ending TestCarInsuranceBatch...")
+
+    def setUp(self):
+        self.model = CarInsurance()
+
+    def test_batch_matches_scalar(self):
+        premiums = self.model.final_premium_batch(self.frame)
+
+        self.assertIsInstance(premiums, np.ndarray)
+        self.assertEqual(len(premiums), len(self.frame))
+        for i, row in enumerate(self.frame.itertuples(index=False)):
+            expected = self.model.final_premium(int(row.age), int(row.annual_km), int(row.car_age),
+                                                int(row.exp_years), int(row.num_accidents), row.vehicle_type)
+            self.assertEqual(premiums[i], expected)
+
+    def test_batch_matches_scalar_on_ties(self):
+        risk = self.model.total_risk(30, 15000, 4, 10, 0, "suv")
+        for tie in (1.005, 2.675, 1234.565):
+            model = CarInsurance(base_cost=tie / risk)
+            self.assertEqual(model.base_cost * risk, tie)
+            batch = model.final_premium_batch([30], [15000], [4], [10], [0], ["suv"])
+            self.assertEqual(batch[0], model.final_premium(30, 15000, 4, 10, 0, "suv"))
+            self.assertEqual(batch[0], round(tie, 2))
+
+    def test_combined_factors_batch(self):
+        ages = [25, 25.0, 25.5, 99]
+        factors = combined_factors_batch(ages, [15000] * 4, [4] * 4, [5] * 4, [1] * 4)
+
+        self.assertEqual(len(factors), 4)
+        for age, factor in zip(ages, factors):
+            self.assertEqual(factor, combined_factors(age, 15000, 4, 5, 1))
+        self.assertEqual(factors[0], factors[1])
+        self.assertNotEqual(factors[0], factors[2])
+
+    def test_invalid_rows_are_reported(self):
+        with self.assertRaises(InvalidInputError) as ctx:
+            self.model.final_premium_batch(
+                [25, -1, None, 30], [15000] * 4, [1, 2, 3, "x"], [1] * 4, [0] * 4, ["suv", 3, None, "Sedan"]
+            )
+
+        self.assertListEqual(list(ctx.exception.rows), [1, 2, 3])
+        self.assertIn("Age cannot be negative", str(ctx.exception))
+        self.assertIn("Car age must be numeric", str(ctx.exception))
+        self.assertIn("Vehicle type must be a string", str(ctx.exception))
+
+    def test_arrays_and_optional_vehicle_type(self):
+        premiums = self.model.final_premium_batch(
+            np.array([25, 60]), np.array([15000, 5000]), np.array([4, 2]), np.array([5, 20]), np.array([1, 0])
+        )
+
+        self.assertEqual(premiums[0], self.model.final_premium(25, 15000, 4, 5, 1))
+        self.assertEqual(premiums[1], self.model.final_premium(60, 5000, 2, 20, 0))
+        self.assertEqual(premiums[0], result(25, 15000, 4, 5, 1, "sedan"))
+        self.assertTrue(np.all(premiums > 0))
+
+
+class TestRatingTable(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = [-1, 0, 1, True, 17, 18, 25, 25.0, 25.5, 35, 65, 66, float("nan"), float("inf")]
+
+    def test_lookup_matches_dict(self):
+        for mapping, table in ((Age_Multipliers, Age_Table), (Car_Age_Multiplier, Car_Age_Table)):
+            for key in self.keys:
+                self.assertEqual(table.lookup(key), mapping.get(key, 1.0))
+        self.assertIsInstance(Age_Table.lookup(25), float)
+        self.assertEqual(len(Age_Table), 48)
+
+    def test_gather_matches_lookup(self):
+        for table in (Age_Table, Car_Age_Table):
+            gathered = table.gather(np.array(self.keys, dtype=float))
+            self.assertListEqual(gathered.tolist(), [table.lookup(k) for k in self.keys])
+        ints = Age_Table.gather(np.arange(10, 80))
+        self.assertEqual(ints[0], 1.0)
+        self.assertEqual(ints[25 - 10], Age_Multipliers[25])
+
+    def test_default_and_read_only(self):
+        table = RatingTable({2: 0.5, 4: 2.0}, default=3.0)
+
+        self.assertListEqual(table.values.tolist(), [0.5, 3.0, 2.0])
+        self.assertEqual(table.lookup(3), 3.0)
+        self.assertEqual(table.offset, 2)
+        with self.assertRaises(ValueError):
+            table.values[0] = 1.0
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.compact import (CompactForest, _float32_floor, compact_forest, compact_pipeline, compare,
+                                      load_compact, prune_trees, save_compact)
+from Health_Insurance.compiled import compile_pipeline
+from Health_Insurance.training import Training, save
+
+
+class TestCompactForest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.model, _, _ = Training(n=40, split=0.2, cache=False)
+        cls.model_path = os.path.join(cls.directory, "model.pkl")
+        save(cls.model, cls.model_path)
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+        cls.compiled = compile_pipeline(cls.model)
+        cls.forest = compact_pipeline(cls.model)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_float32_floor(self):
+        thresholds = np.array([0.5, 27.105000495910645, 1 / 3, 1e6 + 0.1, -2.7])
+        down = _float32_floor(thresholds)
+        self.assertEqual(down.dtype, np.float32)
+        self.assertTrue(np.all(down.astype(np.float64) <= thresholds))
+        self.assertTrue(np.all(np.nextafter(down, np.float32(np.inf)).astype(np.float64) > thresholds))
+
+    def test_same_predictions_as_compiled(self):
+        self.assertTrue(np.array_equal(self.forest.predict_trees(self.data), self.compiled.predict_trees(self.data)))
+        np.testing.assert_allclose(self.forest.predict(self.data), self.model.predict(self.data), rtol=1e-12)
+        record = self.data.iloc[7].to_dict()
+        self.assertEqual(self.forest.predict_one(**record), self.compiled.predict_one(**record))
+
+    def test_smaller(self):
+        forest = self.forest
+        self.assertLess(len(forest.feature), len(self.compiled.feature))
+        self.assertEqual(len(forest.value), len(np.unique(self.compiled.value[np.isinf(self.compiled.threshold)])))
+        self.assertEqual(forest.threshold.dtype, np.float32)
+        self.assertEqual(forest.arrays()["feature"].dtype, np.int8)
+        self.assertIn(forest.left.dtype, (np.int16, np.int32))
+        self.assertLess(forest.nbytes(), sum(a.nbytes for a in self.compiled.arrays().values()) / 4)
+
+    def test_duplicate_trees_are_shared(self):
+        doubled = compact_forest(self.compiled, trees=list(range(40)) + list(range(40)))
+        self.assertEqual(len(doubled.feature), len(self.forest.feature))
+        self.assertTrue(np.array_equal(doubled.roots[:40], doubled.roots[40:]))
+        np.testing.assert_allclose(doubled.predict(self.data), self.forest.predict(self.data), rtol=1e-12)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.directory, "forest.npz")
+        save_compact(self.forest, path)
+        loaded = load_compact(path)
+        self.assertIsInstance(loaded, CompactForest)
+        self.assertFalse(loaded.threshold.flags.writeable)
+        self.assertTrue(np.array_equal(loaded.predict(self.data), self.forest.predict(self.data)))
+
+        report = compare(self.model_path, path, self.data)
+        self.assertLess(report["compact_bytes"], report["pickle_bytes"] / 4)
+        self.assertLess(report["max_rel_drift"], 1e-12)
+        self.assertEqual(report["trees"], [40, 40])
+
+    def test_prune(self):
+        keep = prune_trees(self.compiled, self.data, 0.01)
+        self.assertLess(len(keep), 40)
+        pruned = compact_pipeline(self.model, prune=0.01, records=self.data)
+        self.assertEqual(pruned.n_trees, len(keep))
+        full = self.model.predict(self.data)
+        drift = np.abs(pruned.predict(self.data) - full) / full
+        self.assertLessEqual(drift.mean(), 0.01)
+        self.assertEqual(len(prune_trees(self.compiled, self.data, 0.0)), 40)
+        with self.assertRaises(ValueError):
+            compact_pipeline(self.model, prune=0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.training import Training
+from Health_Insurance.compiled import compile_pipeline, CompiledForest
+
+
+class TestCompiledForest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.model, rmse, r2 = Training(n=20, split=0.2)
+        cls.compiled = compile_pipeline(cls.model)
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+
+    def test_matches_pipeline_predict(self):
+        expected = self.model.predict(self.data)
+        preds = self.compiled.predict(self.data)
+
+        self.assertIsInstance(self.compiled, CompiledForest)
+        self.assertEqual(self.compiled.n_trees, 20)
+        self.assertEqual(preds.shape, expected.shape)
+        self.assertTrue(np.allclose(preds, expected, rtol=1e-9, atol=1e-6))
+
+    def test_single_row(self):
+        for i in (0, 17, 500, 1337):
+            row = self.data.iloc[i].to_dict()
+            expected = self.model.predict(self.data.iloc[[i]])[0]
+
+            self.assertAlmostEqual(self.compiled.predict_one(**row), expected, places=6)
+            self.assertAlmostEqual(self.compiled.predict(row)[0], expected, places=6)
+
+    def test_unknown_categories_and_casing(self):
+        odd = self.data.iloc[:50].copy()
+        odd["region"] = "atlantis"
+        expected = self.model.predict(odd)
+
+        self.assertTrue(np.allclose(self.compiled.predict(odd), expected))
+        shouting = self.data.iloc[:50].copy()
+        shouting["smoker"] = shouting["smoker"].str.upper()
+        self.assertTrue(np.allclose(self.compiled.predict(shouting), self.model.predict(self.data.iloc[:50])))
+
+    def test_per_tree_outputs(self):
+        trees = self.compiled.predict_trees(self.data.iloc[:10])
+        forest = self.model.named_steps["rf"]
+        encoded = self.model.named_steps["preprocess"].transform(self.data.iloc[:10])
+
+        self.assertEqual(trees.shape, (10, 20))
+        for t in (0, 7, 19):
+            self.assertTrue(np.allclose(trees[:, t], forest.estimators_[t].predict(encoded)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from Insurance_Core import datasets
+from Insurance_Core.datasets import SCHEMAS, Schema, clear_cache, load_dataset
+
+
+class TestDatasets(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.cache = os.path.join(cls.directory, "cache")
+        cls.home_csv = os.path.join(cls.directory, "home.csv")
+        pd.DataFrame({
+            "Claim_3_Years": ["Yes", " no", None, "YES"],
+            "Owner_Sex": ["M", "f", "M", "F"],
+            "Bedrooms": [2, None, 4, 5],
+            "YearBuilt": [1990, 2001, 1975, 2010],
+            "Area": [1200, 1500, 1800, 2000],
+            "Annual_Premium_Price": [200.5, 220.0, 250.25, 300.0],
+        }).to_csv(cls.home_csv, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        clear_cache(self.cache)
+
+    def test_health_matches_csv(self):
+        raw = pd.read_csv(SCHEMAS["health"].path)
+        frame = load_dataset("health", directory=self.cache)
+
+        self.assertEqual(list(frame.columns), list(raw.columns))
+        self.assertEqual(frame["age"].dtype, np.int16)
+        self.assertIsInstance(frame["sex"].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(frame.astype(raw.dtypes.to_dict()), raw, check_dtype=False)
+        self.assertLess(frame.memory_usage(deep=True).sum(), raw.memory_usage(deep=True).sum() / 4)
+
+    def test_second_load_reads_the_cache(self):
+        first = load_dataset("car", directory=self.cache)
+        with mock.patch.object(datasets, "parse_csv", side_effect=AssertionError("parsed again")):
+            second = load_dataset("car", directory=self.cache)
+        pd.testing.assert_frame_equal(first, second)
+        self.assertIn("premium", second.columns)
+        base = second["premium"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+
+    def test_changed_file_builds_new_entry(self):
+        path = os.path.join(self.directory, "health_copy.csv")
+        raw = pd.read_csv(SCHEMAS["health"].path)
+        raw.head(10).to_csv(path, index=False)
+        self.assertEqual(len(load_dataset("health", path, directory=self.cache)), 10)
+
+        time.sleep(0.01)
+        raw.head(20).to_csv(path, index=False)
+        self.assertEqual(len(load_dataset("health", path, directory=self.cache)), 20)
+        entries = [name for name in os.listdir(self.cache) if name.startswith("health-")]
+        self.assertEqual(len(entries), 2)
+
+    def test_home_keeps_extra_columns_and_missing_values(self):
+        frame = load_dataset("home", self.home_csv, directory=self.cache)
+        self.assertEqual(list(frame.columns),
+                         ["Claim_3_Years", "Owner_Sex", "Bedrooms", "YearBuilt", "Area", "Annual_Premium_Price"])
+        self.assertTrue(pd.isna(frame["Claim_3_Years"][2]))
+        self.assertTrue(np.isnan(frame["Bedrooms"][1]))
+        self.assertEqual(frame["Area"].tolist(), [1200, 1500, 1800, 2000])
+
+    def test_schema_errors(self):
+        schema = Schema("strict", self.home_csv, {"Bedrooms": "int16", "Annual_Premium_Price": "float64"})
+        with self.assertRaises(ValueError):
+            load_dataset(schema, directory=self.cache)
+        with self.assertRaises(ValueError):
+            load_dataset(Schema("missing", self.home_csv, {"Flooding": "category"}), directory=self.cache)
+        with self.assertRaises(FileNotFoundError):
+            load_dataset("home", os.path.join(self.directory, "nope.csv"), directory=self.cache)
+
+    def test_cache_off(self):
+        with mock.patch.dict(os.environ, {datasets.CACHE_ENV: "off"}):
+            frame = load_dataset("home", self.home_csv, columns=["Owner_Sex", "Bedrooms"])
+        self.assertEqual(list(frame.columns), ["Owner_Sex", "Bedrooms"])
+        self.assertFalse(os.path.exists(self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
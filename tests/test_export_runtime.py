@@ -0,0 +1,155 @@
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from Car_Insurance.exceptions import InvalidInputError
+from Car_Insurance.training import CarInsurance
+from Health_Insurance.training import Training, save
+from Home_Insurance.Premium_calculator import Predict
+from Insurance_Core.export import export_bundle
+from Insurance_Core.runtime import QuoteError, load_bundle
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HOME_FEATURES = ["Claim_3_Years", "Owner_Employment_Status", "Accidental_Damage", "Owner_Sex", "Alarm_Present",
+                 "Locks_Present", "Bedrooms", "Flooding", "Safe_Installed", "YearBuilt"]
+
+
+class TestExportRuntime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.home_model = os.path.join(cls.directory, "home.pkl")
+        cls.home_features = os.path.join(cls.directory, "features.pkl")
+        cls.health_model = os.path.join(cls.directory, "forest.pkl")
+
+        rng = np.random.default_rng(0)
+        X = rng.integers(0, 2, (50, len(HOME_FEATURES))).astype(float)
+        X[:, 6] = rng.integers(1, 6, 50)
+        X[:, 9] = rng.integers(1900, 2020, 50)
+        home = LinearRegression().fit(pd.DataFrame(X, columns=HOME_FEATURES), rng.normal(200, 20, 50))
+        with open(cls.home_model, "wb") as f:
+            pickle.dump(home, f)
+        with open(cls.home_features, "wb") as f:
+            pickle.dump(HOME_FEATURES, f)
+        cls.forest, _, _ = Training(n=10, split=0.2)
+        save(cls.forest, cls.health_model)
+
+        cls.prefix = os.path.join(cls.directory, "bundle")
+        cls.manifest = export_bundle(cls.prefix, home=(cls.home_model, cls.home_features), health=cls.health_model)
+        cls.bundle = load_bundle(cls.prefix)
+        cls.people = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_manifest(self):
+        with open(f"{self.prefix}.json") as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest, self.manifest)
+        self.assertEqual(sorted(manifest["products"]), ["car", "health", "home"])
+        self.assertEqual(manifest["products"]["home"]["features"], HOME_FEATURES)
+        self.assertEqual(manifest["products"]["health"]["trees"], 10)
+
+    def test_car_matches_final_premium(self):
+        model = CarInsurance()
+        cases = [(30, 15000, 5, 10, 0, "suv"), (18, 10500, 0, 0, 5, "Sports"), (70, 30000, 40, 50, 9, None),
+                 (25.5, 12499.9, 3.0, 2, 1, "boat"), (45, 0, 1, 20, 2, "truck")]
+        for case in cases:
+            self.assertEqual(self.bundle.quote_car(*case), model.final_premium(*case))
+
+        rng = np.random.default_rng(1)
+        n = 5000
+        frame = pd.DataFrame({
+            "age": rng.integers(16, 70, n), "annual_km": rng.integers(0, 30000, n),
+            "car_age": rng.integers(0, 40, n), "exp_years": rng.integers(0, 45, n),
+            "num_accidents": rng.integers(0, 7, n),
+            "vehicle_type": rng.choice(["sedan", "SUV", "sports", "truck", "van"], n),
+        })
+        expected = model.final_premium_batch(frame)
+        self.assertTrue(np.array_equal(self.bundle.quote_car_batch(frame), expected))
+        self.assertTrue(np.array_equal(self.bundle.quote_car_batch(frame.to_dict("records")), expected))
+
+    def test_car_errors(self):
+        for case in [(-1, 15000, 5, 10, 0), ("30", 15000, 5, 10, 0), (30, 15000, 5, 10, 0, 7)]:
+            with self.assertRaises(InvalidInputError) as expected:
+                CarInsurance().final_premium(*case)
+            with self.assertRaises(QuoteError) as got:
+                self.bundle.quote_car(*case)
+            self.assertEqual(str(got.exception), str(expected.exception))
+
+        with self.assertRaises(QuoteError) as ctx:
+            self.bundle.quote_car_batch({"age": [30, -1, 40], "annual_km": [1e4, 1e4, None], "car_age": [1, 2, 3],
+                                         "exp_years": [1, 2, 3], "num_accidents": [0, 0, 0]})
+        self.assertEqual(list(ctx.exception.rows), [1, 2])
+
+        columns = {"age": [30, -1, 40], "annual_km": [1e4, 1e4, 1e4], "car_age": [1, 2, "x"], "exp_years": [1, 2, 3],
+                   "num_accidents": [0, 0, 0], "vehicle_type": ["suv", 3, None]}
+        with self.assertRaises(InvalidInputError) as expected:
+            CarInsurance().final_premium_batch(pd.DataFrame(columns))
+        with self.assertRaises(QuoteError) as got:
+            self.bundle.quote_car_batch(columns)
+        self.assertEqual(list(got.exception.rows), list(expected.exception.rows))
+        self.assertIn("Vehicle type must be a string. Rows: [1]", str(got.exception))
+
+    def test_home_matches_predict(self):
+        predictor = Predict(self.home_model, self.home_features)
+        records = [
+            {"Claim_3_Years": "yes", "Owner_Employment_Status": "NO", "Accidental_Damage": " Yes ", "Owner_Sex": "F",
+             "Alarm_Present": "YES", "Locks_Present": "no", "Bedrooms": 3, "Flooding": "NO",
+             "Safe_Installed": "YES", "YearBuilt": 1985},
+            {"Owner_Sex": "M", "Bedrooms": 5, "YearBuilt": 2010, "Unknown": 1},
+        ]
+        for record in records:
+            self.assertEqual(self.bundle.quote_home(record), predictor.predict_price(record))
+        self.assertTrue(np.array_equal(self.bundle.quote_home_batch(records), predictor.predict_batch(records)))
+        with self.assertRaises(ValueError):
+            self.bundle.quote_home({"Bedrooms": None})
+
+    def test_health_matches_pipeline(self):
+        expected = self.forest.predict(self.people)
+        self.assertTrue(np.allclose(self.bundle.quote_health_batch(self.people), expected, rtol=1e-9, atol=1e-6))
+        records = self.people.head(20).to_dict("records")
+        self.assertTrue(np.allclose(self.bundle.quote_health_batch(records), expected[:20], rtol=1e-9, atol=1e-6))
+        self.assertAlmostEqual(self.bundle.quote_health(**records[0]), expected[0], places=6)
+
+    def test_partial_bundle_and_checksum(self):
+        prefix = os.path.join(self.directory, "car_only")
+        export_bundle(prefix, home=None, health=None)
+        bundle = load_bundle(prefix)
+        self.assertEqual(bundle.products, ["car"])
+        with self.assertRaises(KeyError):
+            bundle.quote_home({})
+
+        shutil.copy(f"{self.prefix}.npz", f"{prefix}.npz")
+        with self.assertRaises(ValueError):
+            load_bundle(prefix)
+
+    def test_cli_does_not_import_pandas_or_sklearn(self):
+        code = (
+            "import sys\n"
+            "from Insurance_Core.runtime import main\n"
+            f"main([{self.prefix!r}, 'car', 'age=30', 'annual_km=15000', 'car_age=5', 'exp_years=10',"
+            " 'num_accidents=0', 'vehicle_type=suv'])\n"
+            "print(sorted(m for m in ('pandas', 'sklearn', 'scipy', 'joblib') if m in sys.modules))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                             check=True).stdout.split("\n")
+        self.assertEqual(float(out[0]), CarInsurance().final_premium(30, 15000, 5, 10, 0, "suv"))
+        self.assertEqual(out[1], "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.training import Training
+from Insurance_Core import fit_cache
+from Insurance_Core.fit_cache import FitCache, default_cache
+
+
+class TestFitCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def cache(self, name, max_bytes=1 << 30):
+        return FitCache(os.path.join(self.directory, name), max_bytes)
+
+    def test_key(self):
+        key = FitCache.key(dataset="abc", params={"n": 10, "depth": None}, split=0.2)
+        self.assertEqual(key, FitCache.key(split=0.2, params={"depth": None, "n": 10}, dataset="abc"))
+        self.assertNotEqual(key, FitCache.key(dataset="abc", params={"n": 11, "depth": None}, split=0.2))
+        self.assertEqual(len(key), 64)
+
+    def test_put_get_and_corrupt_entry(self):
+        cache = self.cache("basic")
+        self.assertIsNone(cache.get("missing"))
+        cache.put("a", {"value": np.arange(5)})
+        self.assertTrue(np.array_equal(cache.get("a")["value"], np.arange(5)))
+
+        with open(os.path.join(cache.directory, "b.joblib"), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.get("b"))
+        self.assertFalse(os.path.exists(os.path.join(cache.directory, "b.joblib")))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def test_lru_eviction(self):
+        cache = self.cache("lru")
+        for key in ("a", "b", "c"):
+            cache.put(key, np.zeros(10000))
+            time.sleep(0.01)
+        cache.get("a")  # a is now the most recently used
+        cache.max_bytes = cache.size() - 1
+        self.assertEqual(cache.evict(), ["b"])
+        cache.max_bytes = 1
+        cache.put("d", np.zeros(10000))
+        self.assertEqual([key for key, _, _ in cache.entries()], ["d"])
+        self.assertEqual(cache.stats()["evictions"], 3)
+
+    def test_training_hits_cache(self):
+        cache = self.cache("training")
+        model, rmse, r2 = Training(n=15, split=0.2, cache=cache)
+        start = time.perf_counter()
+        cached, cached_rmse, cached_r2 = Training(n=15, split=0.2, cache=cache)
+        self.assertLess(time.perf_counter() - start, 5)
+
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual((cached_rmse, cached_r2), (rmse, r2))
+        self.assertIsNot(cached, model)
+        self.assertTrue(np.array_equal(cached.predict(self.data), model.predict(self.data)))
+
+        Training(n=16, split=0.2, cache=cache)
+        Training(n=15, split=0.25, cache=cache)
+        self.assertEqual(len(cache.entries()), 3)
+
+    def test_training_without_cache(self):
+        cache = self.cache("disabled")
+        Training(n=5, split=0.2, cache=False)
+        self.assertEqual(cache.entries(), [])
+
+    def test_default_cache_is_opt_in(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop(fit_cache.CACHE_ENV, None)
+            self.assertIsNone(default_cache())
+            os.environ[fit_cache.CACHE_ENV] = "off"
+            self.assertIsNone(default_cache())
+            os.environ[fit_cache.CACHE_ENV] = os.path.join(self.directory, "env")
+            self.assertEqual(default_cache().directory, os.path.join(self.directory, "env"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,10 @@
 import unittest
 import os
 import numpy as np
+import pandas as pd
 
-from Health_Insurance.result import result
+from Health_Insurance.result import result, predict_batch
+from Health_Insurance.compact import compact_path
 from Health_Insurance.training import Training, save
 
 
@@ -22,8 +24,9 @@ class TestResult(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         print("Cleaning up class resources...")
-        if os.path.exists(cls.model_path):
-            os.remove(cls.model_path)
+        for path in (cls.model_path, compact_path(cls.model_path)):
+            if os.path.exists(path):
+                os.remove(path)
 
     def setUp(self):
         print("Setting up before a test...")
@@ -69,5 +72,46 @@ class TestResult(unittest.TestCase):
 
         self.assertTrue(np.allclose(pred1, pred2))
 
+class TestPredictBatch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.model_path = "Health_Insurance/test_batch_forest.pkl"
+        model,rmse,r2 = Training(n=20, split=0.2)
+        save(model, cls.model_path)
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges").iloc[:200]
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        for path in (cls.model_path, compact_path(cls.model_path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_batch_matches_single_rows(self):
+        preds = predict_batch(self.data, path=self.model_path, chunk_size=64)
+
+        self.assertIsInstance(preds, np.ndarray)
+        self.assertEqual(len(preds), len(self.data))
+        for i in range(0, 200, 25):
+            single = result(path=self.model_path, **self.data.iloc[i].to_dict()).predict()
+            self.assertAlmostEqual(preds[i], single[0])
+
+    def test_input_types_and_casing(self):
+        expected = predict_batch(self.data, path=self.model_path)
+        records = self.data.to_dict("records")
+        shouting = [dict(r, sex=r["sex"].upper(), region=" " + r["region"].title()) for r in records]
+        columns = {c: self.data[c].to_numpy() for c in self.data.columns}
+
+        self.assertTrue(np.allclose(predict_batch(iter(records), path=self.model_path, chunk_size=7), expected))
+        self.assertTrue(np.allclose(predict_batch(shouting, path=self.model_path), expected))
+        self.assertTrue(np.allclose(predict_batch(columns, path=self.model_path), expected))
+        self.assertEqual(len(predict_batch([], path=self.model_path)), 0)
+
+    def test_missing_columns(self):
+        with self.assertRaises(ValueError):
+            predict_batch(self.data.drop(columns="bmi"), path=self.model_path)
+
 if __name__ == "__main__":
     unittest.main()
@@ -7,6 +7,7 @@ from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestRegressor
 
 from Health_Insurance.preprocessing import preprocess
+from Health_Insurance.compact import compact_path
 from Health_Insurance.training import Training, save
 
 
@@ -22,8 +23,9 @@ class TestTraining(unittest.TestCase):
     @classmethod
     def tearDownClass(cls):
         print("Cleaning up class resources...")
-        if os.path.exists(cls.model_path):
-            os.remove(cls.model_path)
+        for path in (cls.model_path, compact_path(cls.model_path)):
+            if os.path.exists(path):
+                os.remove(path)
 
     def setUp(self):
         print("Setting up before test...")
@@ -4,6 +4,7 @@ import pickle
 import numpy as np
 import pandas as pd
 from sklearn.dummy import DummyRegressor
+from sklearn.linear_model import LinearRegression
 
 from Home_Insurance.Premium_calculator import Predict
 
@@ -119,4 +120,72 @@ class TestHomePredict(unittest.TestCase):
 
         price = self.predictor.predict_price(partial_input)
         self.assertIsInstance(price, float)
-        self.assertEqual(price, self.expected_price)
\ No newline at end of file
+        self.assertEqual(price, self.expected_price)
+
+class TestHomeLinearScorer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+
+        cls.model_path = "Home_Insurance/test_linear_model.pkl"
+        cls.feature_path = "Home_Insurance/test_linear_features.pkl"
+        cls.features = [
+            "Claim_3_Years", "Owner_Employment_Status", "Accidental_Damage", "Owner_Sex", "Alarm_Present",
+            "Locks_Present", "Bedrooms", "Flooding", "Safe_Installed", "YearBuilt",
+        ]
+
+        rng = np.random.default_rng(0)
+        X = rng.integers(0, 2, (200, len(cls.features))).astype(float)
+        X[:, 6] = rng.integers(1, 7, 200)
+        X[:, 9] = rng.integers(1900, 2025, 200)
+        y = X @ rng.normal(50, 20, len(cls.features)) + 300
+
+        with open(cls.model_path, "wb") as f:
+            pickle.dump(LinearRegression().fit(X, y), f)
+        with open(cls.feature_path, "wb") as f:
+            pickle.dump(cls.features, f)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        for path in (cls.model_path, cls.feature_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def setUp(self):
+        self.predictor = Predict(self.model_path, self.feature_path)
+        self.inputs = [
+            {"Claim_3_Years": "Yes", "Owner_Employment_Status": "no", "Accidental_Damage": " YES ",
+             "Owner_Sex": "m", "Alarm_Present": "No", "Locks_Present": "Yes", "Bedrooms": 3,
+             "Flooding": "No", "Safe_Installed": "Yes", "YearBuilt": 2001, "Owner": 1},
+            {"Bedrooms": 2, "YearBuilt": 1995, "Owner_Sex": "F", "Claim_3_Years": "maybe"},
+            {"Bedrooms": "4", "YearBuilt": 1890.5, "Flooding": True, "Owner_Sex": None},
+        ]
+
+    def test_matches_reference_path(self):
+        self.assertIsNotNone(self.predictor.coef)
+        for input_dict in self.inputs:
+            price = self.predictor.predict_price(input_dict)
+
+            self.assertIsInstance(price, float)
+            self.assertAlmostEqual(price, self.predictor.predict_price_reference(input_dict), places=6)
+
+    def test_batch(self):
+        expected = [self.predictor.predict_price(d) for d in self.inputs]
+        X = self.predictor.encode_rows(self.inputs)
+
+        self.assertEqual(X.shape, (3, 10))
+        self.assertTrue(np.allclose(self.predictor.predict_batch(X), expected))
+        self.assertTrue(np.allclose(self.predictor.predict_batch(self.inputs), expected))
+        self.assertTrue(np.allclose(self.predictor.predict_batch(pd.DataFrame(self.inputs)), expected))
+        with self.assertRaises(ValueError):
+            self.predictor.predict_batch(np.zeros((2, 3)))
+
+    def test_missing_numeric_value_raises_like_sklearn(self):
+        bad = {"Bedrooms": None, "YearBuilt": 2000}
+
+        with self.assertRaises(ValueError):
+            self.predictor.predict_price_reference(bad)
+        with self.assertRaises(ValueError):
+            self.predictor.predict_price(bad)
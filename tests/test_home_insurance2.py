@@ -1,10 +1,12 @@
 import unittest
 import os
+import numpy as np
 import pandas as pd
 import pickle
 from sklearn.linear_model import LinearRegression
 
 from Home_Insurance.Risk_factor import data 
+from Home_Insurance.streaming import StreamingTrainer
 class TestHomeData(unittest.TestCase):
 
     @classmethod
@@ -64,3 +66,77 @@ class TestHomeData(unittest.TestCase):
             saved_features = pickle.load(f)
         self.assertListEqual(list(saved_features), list(self.obj.features))
 
+
+
+class TestHomeStreaming(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        rng = np.random.default_rng(3)
+        n = 1000
+        df = pd.DataFrame({
+            "Claim_3_Years": rng.choice(["Yes", "no", " YES "], n),
+            "Owner_Sex": rng.choice(["M", "f"], n),
+            "Bedrooms": rng.integers(1, 6, n).astype(float),
+            "YearBuilt": rng.integers(1950, 2020, n).astype(float),
+            "Area": rng.normal(1500, 300, n),
+        })
+        df["Annual_Premium_Price"] = 200 + 40 * df["Bedrooms"] - 0.05 * df["YearBuilt"] + 0.3 * df["Area"]
+        df["Annual_Premium_Price"] += rng.normal(0, 10, n)
+        for col in ["Bedrooms", "YearBuilt", "Annual_Premium_Price"]:
+            df.loc[rng.choice(n, 40, replace=False), col] = np.nan
+
+        cls.csv_path = "Home_Insurance/test_stream_data.csv"
+        cls.first_half = "Home_Insurance/test_stream_first.csv"
+        cls.second_half = "Home_Insurance/test_stream_second.csv"
+        cls.state_path = "Home_Insurance/test_stream_state.npz"
+        cls.bare_state_path = "Home_Insurance/test_stream_checkpoint"
+        df.to_csv(cls.csv_path, index=False)
+        df.iloc[:n // 2].to_csv(cls.first_half, index=False)
+        df.iloc[n // 2:].to_csv(cls.second_half, index=False)
+
+        reference = data(cls.csv_path)
+        reference.preprocess()
+        reference.train()
+        cls.reference = reference
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        for path in [cls.csv_path, cls.first_half, cls.second_half, cls.state_path, cls.bare_state_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_matches_in_memory_training(self):
+        obj = data(self.csv_path)
+        obj.train_streaming(chunksize=128)
+
+        self.assertListEqual(obj.features, self.reference.features)
+        np.testing.assert_allclose(obj.model.coef_, self.reference.model.coef_, rtol=1e-8, atol=1e-9)
+        self.assertAlmostEqual(obj.model.intercept_, self.reference.model.intercept_, places=6)
+
+    def test_incremental_state_equals_full_fit(self):
+        data(self.first_half).train_streaming(chunksize=100, state_path=self.state_path)
+        obj = data(self.second_half)
+        obj.train_streaming(chunksize=100, state_path=self.state_path)
+
+        np.testing.assert_allclose(obj.model.coef_, self.reference.model.coef_, rtol=1e-8, atol=1e-9)
+        X = self.reference.X
+        np.testing.assert_allclose(obj.model.predict(X), self.reference.model.predict(X), rtol=1e-9)
+
+    def test_state_path_without_suffix(self):
+        data(self.first_half).train_streaming(chunksize=100, state_path=self.bare_state_path)
+        self.assertTrue(os.path.exists(self.bare_state_path))
+        self.assertFalse(os.path.exists(self.bare_state_path + ".npz"))
+        obj = data(self.second_half)
+        obj.train_streaming(chunksize=100, state_path=self.bare_state_path)
+        np.testing.assert_allclose(obj.model.coef_, self.reference.model.coef_, rtol=1e-8, atol=1e-9)
+
+    def test_median_sketch_matches_pandas(self):
+        trainer = StreamingTrainer(max_bins=50).fit_csv(self.csv_path, chunksize=300)
+        expected = self.reference.data["Bedrooms"].median()
+        self.assertEqual(trainer.medians()["Bedrooms"], expected)
+        # Area has far more distinct values than max_bins, the sketch is approximate there
+        area = self.reference.data["Area"]
+        self.assertLess(abs(trainer.medians()["Area"] - area.median()), area.std() * 0.1)
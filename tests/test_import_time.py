@@ -0,0 +1,44 @@
+import unittest
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import BUDGETS, PROJECT_ROOT, measure_import
+
+
+class TestImportTime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Measuring import times...")
+        # the wall-clock budgets are enforced by `python -m benchmarks.import_time`, they are too noisy for a unit test
+        cls.results = [measure_import(module, repeat=1) for module in BUDGETS]
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Finished measuring import times.")
+
+    def test_no_heavy_imports(self):
+        self.assertEqual([r["module"] for r in self.results], ["Health_Insurance", "Insurance_Core.runtime"])
+        for res in self.results:
+            self.assertListEqual(res["heavy"], [])
+
+    def test_import_has_no_side_effects(self):
+        code = (
+            "import os, Health_Insurance\n"
+            "assert not os.path.exists('Health_Insurance/Test_run.pkl')\n"
+            "from Health_Insurance.result import result\n"
+            "assert Health_Insurance.result is result\n"
+            "assert callable(Health_Insurance.Training)\n"
+            "import Health_Insurance.autotune as autotune\n"
+            "assert callable(autotune.pareto_front) and callable(autotune.autotune)\n"
+        )
+        existed = os.path.exists(os.path.join(PROJECT_ROOT, "Health_Insurance", "Test_run.pkl"))
+        out = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(os.path.exists(os.path.join(PROJECT_ROOT, "Health_Insurance", "Test_run.pkl")), existed)
+
+
+if __name__ == "__main__":
+    unittest.main()
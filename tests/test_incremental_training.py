@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from Health_Insurance.training import IncrementalTraining, Training
+from Insurance_Core.fit_cache import FitCache
+
+
+class TestIncrementalTraining(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def checkpoint(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_same_forest_as_training(self):
+        model, rmse, r2, history = IncrementalTraining(n=30, step=10, checkpoint=None, cache=False)
+        full, full_rmse, full_r2 = Training(n=30, cache=False)
+
+        self.assertEqual([h["trees"] for h in history], [10, 20, 30])
+        self.assertAlmostEqual(rmse, full_rmse, places=6)
+        self.assertAlmostEqual(r2, full_r2, places=9)
+        self.assertTrue(np.array_equal(model.predict(self.data), full.predict(self.data)))
+        self.assertFalse(model.named_steps["rf"].warm_start)
+
+    def test_resume_fits_only_new_trees(self):
+        path = self.checkpoint("resume")
+        IncrementalTraining(n=20, step=10, checkpoint=path, cache=False)
+        self.assertEqual(sorted(os.listdir(path)), ["state.pkl", "trees-00000-00010.pkl", "trees-00010-00020.pkl"])
+        self.assertEqual(len(joblib.load(os.path.join(path, "trees-00010-00020.pkl"))), 10)
+
+        fitted = []
+        original = RandomForestRegressor.fit
+
+        def fit(rf, X, y, *args, **kwargs):
+            before = len(getattr(rf, "estimators_", []))
+            out = original(rf, X, y, *args, **kwargs)
+            fitted.append(len(rf.estimators_) - before)
+            return out
+
+        with mock.patch.object(RandomForestRegressor, "fit", fit):
+            model, _, _, history = IncrementalTraining(n=40, step=10, checkpoint=path, cache=False)
+        self.assertEqual(fitted, [10, 10])
+        self.assertEqual([h["trees"] for h in history], [10, 20, 30, 40])
+
+        full, _, _ = Training(n=40, cache=False)
+        self.assertTrue(np.array_equal(model.predict(self.data), full.predict(self.data)))
+
+        # a smaller forest is the first trees of the checkpoint, nothing is refitted
+        with mock.patch.object(RandomForestRegressor, "fit", side_effect=AssertionError("refitted")):
+            small, _, _, history = IncrementalTraining(n=15, step=10, checkpoint=path, cache=False)
+        self.assertEqual(len(small.named_steps["rf"].estimators_), 15)
+        self.assertEqual([h["trees"] for h in history], [10, 15])
+
+    def test_crash_keeps_last_checkpoint(self):
+        path = self.checkpoint("crash")
+        IncrementalTraining(n=10, step=10, checkpoint=path, cache=False)
+        # a shard written by a step that died before state.pkl was updated is not used
+        with open(os.path.join(path, "trees-00010-00020.pkl"), "wb") as f:
+            f.write(b"partial")
+        _, _, _, history = IncrementalTraining(n=20, step=10, checkpoint=path, cache=False)
+        self.assertEqual([h["trees"] for h in history], [10, 20])
+        self.assertEqual(len(joblib.load(os.path.join(path, "trees-00010-00020.pkl"))), 10)
+
+    def test_checkpoint_of_other_fit_is_ignored(self):
+        path = self.checkpoint("other")
+        IncrementalTraining(n=10, step=10, split=0.25, checkpoint=path, cache=False)
+        model, _, _, history = IncrementalTraining(n=10, step=10, split=0.2, checkpoint=path, cache=False)
+        full, _, _ = Training(n=10, split=0.2, cache=False)
+        self.assertEqual(len(history), 1)
+        self.assertTrue(np.array_equal(model.predict(self.data), full.predict(self.data)))
+
+    def test_early_stopping(self):
+        model, rmse, _, history = IncrementalTraining(n=200, step=10, checkpoint=None, patience=1, min_delta=0.5,
+                                                      cache=False)
+        self.assertEqual([h["trees"] for h in history], [10, 20])
+        self.assertEqual(len(model.named_steps["rf"].estimators_), 20)
+        self.assertEqual(rmse, history[-1]["rmse"])
+
+    def test_result_goes_into_fit_cache(self):
+        cache = FitCache(os.path.join(self.directory, "cache"))
+        model, rmse, r2, _ = IncrementalTraining(n=20, step=10, checkpoint=None, cache=cache)
+        cached, cached_rmse, cached_r2 = Training(n=20, cache=cache)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual((cached_rmse, cached_r2), (rmse, r2))
+        self.assertTrue(np.array_equal(cached.predict(self.data), model.predict(self.data)))
+
+    def test_invalid_step(self):
+        with self.assertRaises(ValueError):
+            IncrementalTraining(n=10, step=0, checkpoint=None, cache=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+
+from sklearn.linear_model import LinearRegression
+
+from Car_Insurance.training import CarInsurance
+from Home_Insurance.Premium_calculator import Predict
+from Insurance_Core import metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.model_path = os.path.join(cls.directory, "model.pkl")
+        cls.feature_path = os.path.join(cls.directory, "features.pkl")
+        with open(cls.model_path, "wb") as f:
+            pickle.dump(LinearRegression().fit([[0.0], [1.0]], [1.0, 3.0]), f)
+        with open(cls.feature_path, "wb") as f:
+            pickle.dump(["Bedrooms"], f)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        metrics.disable()
+        metrics.reset()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_disabled_records_nothing(self):
+        metrics.disable()
+        with metrics.timed("stage"):
+            pass
+        metrics.count("event")
+        CarInsurance().final_premium(30, 15000, 5, 10, 0, "suv")
+
+        self.assertEqual(metrics.snapshot(), {"timers": {}, "counters": {}})
+
+    def test_threads_are_merged(self):
+        def work():
+            for _ in range(100):
+                with metrics.timed("stage"):
+                    pass
+                metrics.count("event", 2)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        snap = metrics.snapshot()
+
+        self.assertEqual(snap["timers"]["stage"]["count"], 400)
+        self.assertEqual(snap["timers"]["stage"]["buckets"][-1], ["+Inf", 400])
+        self.assertEqual(snap["counters"]["event"], 800)
+
+    def test_finished_threads_are_retired(self):
+        def work():
+            with metrics.timed("stage"):
+                metrics.count("event")
+
+        for _ in range(200):
+            t = threading.Thread(target=work)
+            t.start()
+            t.join()
+        snap = metrics.snapshot()
+
+        self.assertEqual(snap["counters"]["event"], 200)
+        self.assertEqual(snap["timers"]["stage"]["count"], 200)
+        self.assertLessEqual(len(metrics._stores), 2)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {"timers": {}, "counters": {}})
+
+    def test_buckets_and_prometheus_text(self):
+        metrics.observe("stage", 3e-6)
+        metrics.observe("stage", 0.3)
+        snap = metrics.snapshot()["timers"]["stage"]
+        cumulative = dict((str(b), c) for b, c in snap["buckets"])
+        self.assertEqual((cumulative["2e-06"], cumulative["5e-06"], cumulative["0.5"]), (0, 1, 2))
+        self.assertAlmostEqual(snap["sum_seconds"], 0.300003)
+
+        text = metrics.prometheus()
+        self.assertIn('insurance_stage_seconds_bucket{stage="stage",le="5e-06"} 1', text)
+        self.assertIn('insurance_stage_seconds_bucket{stage="stage",le="+Inf"} 2', text)
+        self.assertIn('insurance_stage_seconds_count{stage="stage"} 2', text)
+
+    def test_prediction_paths_are_instrumented(self):
+        CarInsurance().final_premium(30, 15000, 5, 10, 0, "suv")
+        predictor = Predict(self.model_path, self.feature_path)
+        predictor.predict_price({"Bedrooms": 2})
+        predictor.predict_price_reference({"Bedrooms": 2})
+        snap = metrics.snapshot()
+
+        for stage in ["car.final_premium", "home.load", "home.predict.encode", "home.predict.model",
+                      "home.predict.frame", "home.predict.encoding"]:
+            self.assertIn(stage, snap["timers"])
+        self.assertEqual(snap["timers"]["home.predict.model"]["count"], 2)
+        self.assertIn("insurance_events_total", metrics.prometheus())
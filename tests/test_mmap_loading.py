@@ -0,0 +1,104 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from Health_Insurance.compact import compact_path, load_compact, mapped_forest, save_compact
+from Health_Insurance.result import result
+from Health_Insurance.training import Training, save
+from Insurance_Core.registry import mmap_load, registry
+
+
+class TestMmapLoading(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.model, _, _ = Training(n=20, split=0.2, cache=False)
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges").iloc[:50]
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        registry.invalidate()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def saved(self, name):
+        path = os.path.join(self.directory, name)
+        save(self.model, path)
+        return path
+
+    def test_save_writes_mapped_forest(self):
+        path = self.saved("forest.pkl")
+        self.assertTrue(os.path.exists(compact_path(path)))
+        forest = mapped_forest(path)
+        self.assertIsInstance(forest.threshold.base, np.memmap)
+        self.assertFalse(forest.threshold.flags.writeable)
+        self.assertIs(mapped_forest(path), forest)
+        np.testing.assert_allclose(forest.predict(self.data), self.model.predict(self.data), rtol=1e-12)
+
+        heap = load_compact(compact_path(path))
+        self.assertNotIsInstance(heap.threshold.base, np.memmap)
+        self.assertTrue(np.array_equal(heap.predict(self.data), forest.predict(self.data)))
+
+    def test_single_quote_uses_mapped_forest(self):
+        path = self.saved("quote.pkl")
+        record = self.data.iloc[3].to_dict()
+        prediction = result(path=path, **record).predict()
+        self.assertEqual(prediction.shape, (1,))
+        self.assertAlmostEqual(prediction[0], self.model.predict(self.data.iloc[[3]])[0], places=6)
+        self.assertNotIn(os.path.abspath(path), registry.stats()["artifacts"])
+
+    def test_mixed_case_quote_without_mapped_forest(self):
+        path = self.saved("mixed_case.pkl")
+        record = dict(self.data.iloc[3].to_dict(), sex=" Male", smoker="YES", region="NorthWest ")
+        mapped = result(path=path, **record).predict()
+        os.remove(compact_path(path))
+        self.assertIsNone(mapped_forest(path))
+        self.assertAlmostEqual(result(path=path, **record).predict()[0], mapped[0], places=6)
+        expected = self.model.predict(self.data.iloc[[3]].assign(sex="male", smoker="yes", region="northwest"))
+        self.assertAlmostEqual(mapped[0], expected[0], places=6)
+
+    def test_replaced_pickle_falls_back(self):
+        path = self.saved("replaced.pkl")
+        other, _, _ = Training(n=5, split=0.2, cache=False)
+        joblib.dump(other, path)
+        self.assertIsNone(mapped_forest(path))
+        record = self.data.iloc[0].to_dict()
+        self.assertAlmostEqual(result(path=path, **record).predict()[0], other.predict(self.data.iloc[[0]])[0])
+
+        os.remove(compact_path(path))
+        self.assertIsNone(mapped_forest(path))
+
+    def test_compressed_file_cannot_be_mapped(self):
+        path = os.path.join(self.directory, "compressed.npz")
+        forest = load_compact(compact_path(self.saved("plain.pkl")))
+        arrays = dict(forest.arrays(), meta=np.frombuffer(b'{"format": 1}', dtype=np.uint8))
+        np.savez_compressed(path, **arrays)
+        with self.assertRaises(ValueError):
+            load_compact(path, mmap=True)
+        save_compact(forest, path)
+        self.assertIsInstance(load_compact(path, mmap=True).value.base, np.memmap)
+
+    def test_home_model_is_mapped(self):
+        path = os.path.join(self.directory, "home.pkl")
+        joblib.dump(LinearRegression().fit([[0.0, 1.0], [1.0, 0.0], [2.0, 2.0]], [1.0, 2.0, 4.0]), path)
+        model = mmap_load(path)
+        self.assertIsInstance(model.coef_, np.memmap)
+        np.testing.assert_allclose(model.predict([[1.0, 1.0]]), joblib.load(path).predict([[1.0, 1.0]]))
+        # plain pickles written by older versions still load
+        legacy = os.path.join(self.directory, "features.pkl")
+        with open(legacy, "wb") as f:
+            pickle.dump(["Bedrooms", "Area"], f)
+        self.assertEqual(mmap_load(legacy), ["Bedrooms", "Area"])
+
+
+if __name__ == "__main__":
+    unittest.main()
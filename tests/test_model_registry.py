@@ -0,0 +1,92 @@
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from Insurance_Core.registry import ModelRegistry, registry
+from Home_Insurance.Premium_calculator import Predict
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        self.path = os.path.join(self.directory, "artifact.pkl")
+        self.write({"version": 1})
+        self.registry = ModelRegistry()
+
+    def write(self, obj):
+        with open(self.path, "wb") as f:
+            pickle.dump(obj, f)
+
+    def test_loads_once_and_shares_object(self):
+        first = self.registry.get(self.path)
+        second = self.registry.get(self.path)
+
+        self.assertIs(first, second)
+        stats = self.registry.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertGreaterEqual(stats["load_seconds"], 0)
+
+    def test_counts_concurrent_hits(self):
+        self.registry.get(self.path)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: [self.registry.get(self.path) for _ in range(500)], range(8)))
+        self.assertEqual(self.registry.stats()["hits"], 4000)
+        self.assertEqual(self.registry.stats()["misses"], 1)
+
+    def test_reloads_when_file_changes(self):
+        self.assertEqual(self.registry.get(self.path)["version"], 1)
+        self.write({"version": 2, "padding": "x"})
+
+        self.assertEqual(self.registry.get(self.path)["version"], 2)
+        self.assertEqual(self.registry.stats()["reloads"], 1)
+        with self.assertRaises(FileNotFoundError):
+            self.registry.get(os.path.join(self.directory, "missing.pkl"))
+
+    def test_hash_mode_ignores_touch(self):
+        reg = ModelRegistry(validate="hash")
+        first = reg.get(self.path)
+        os.utime(self.path, ns=(1, 1))
+
+        self.assertIs(reg.get(self.path), first)
+        self.assertEqual(reg.stats()["misses"], 1)
+        self.write({"version": 3})
+        self.assertEqual(reg.get(self.path)["version"], 3)
+
+    def test_warm_and_invalidate(self):
+        loaded = self.registry.warm([self.path, os.path.join(self.directory, "missing.pkl")])
+
+        self.assertListEqual(loaded, [self.path])
+        self.assertEqual(self.registry.stats()["artifacts"][os.path.abspath(self.path)]["loads"], 1)
+        self.registry.invalidate(self.path)
+        self.registry.get(self.path)
+        self.assertEqual(self.registry.stats()["misses"], 2)
+
+    def test_home_predictors_share_model(self):
+        features = os.path.join(self.directory, "features.pkl")
+        with open(features, "wb") as f:
+            pickle.dump(["Bedrooms"], f)
+        model = os.path.join(self.directory, "model.pkl")
+        shutil.copyfile(self.path, model)
+
+        p1 = Predict(model, features)
+        p2 = Predict(model, features)
+        self.assertIs(p1.model, p2.model)
+        self.assertIs(p1.features, registry.get(features))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.compact import compact_path, mapped_forest
+from Health_Insurance.predictor import HealthPredictor
+from Health_Insurance.result import predict_batch, predict_with_interval, result
+from Health_Insurance.training import Training, save
+from Insurance_Core.registry import registry
+
+
+class TestPredictionInterval(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.model, _, _ = Training(n=30, split=0.2, cache=False)
+        cls.model_path = os.path.join(cls.directory, "forest.pkl")
+        save(cls.model, cls.model_path)
+        cls.data = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges").iloc[:300]
+
+        # the naive way: every estimator separately
+        E = cls.model.named_steps["preprocess"].transform(cls.data)
+        cls.per_tree = np.stack([tree.predict(E) for tree in cls.model.named_steps["rf"].estimators_], axis=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        registry.invalidate()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_batch_matches_per_tree_quantiles(self):
+        mean, bounds = predict_with_interval(self.data, path=self.model_path, quantiles=(0.1, 0.5, 0.9),
+                                             chunk_size=64)
+        self.assertEqual(mean.shape, (300,))
+        self.assertEqual(bounds.shape, (300, 3))
+        np.testing.assert_allclose(mean, predict_batch(self.data, path=self.model_path), rtol=1e-9)
+        np.testing.assert_allclose(bounds, np.quantile(self.per_tree, [0.1, 0.5, 0.9], axis=1).T, rtol=1e-9)
+        self.assertTrue(np.all(bounds[:, 0] <= bounds[:, 1]) and np.all(bounds[:, 1] <= bounds[:, 2]))
+
+    def test_single_row_matches_batch(self):
+        mean, bounds = predict_with_interval(self.data, path=self.model_path)
+        for i in (0, 17, 250):
+            one, one_bounds = result(path=self.model_path, **self.data.iloc[i].to_dict()).predict_with_interval()
+            self.assertEqual(one.shape, (1,))
+            self.assertEqual(one_bounds.shape, (1, 2))
+            self.assertAlmostEqual(one[0], mean[i], places=6)
+            np.testing.assert_allclose(one_bounds[0], bounds[i], rtol=1e-9)
+
+    def test_all_forests_agree(self):
+        expected = predict_with_interval(self.data.to_dict("records"), path=self.model_path, quantiles=(0.25, 0.75))
+        predictor = HealthPredictor(self.model)
+        for forest in (predictor, predictor.compiled, mapped_forest(self.model_path)):
+            mean, bounds = forest.predict_with_interval(self.data, quantiles=(0.25, 0.75))
+            np.testing.assert_allclose(mean, expected[0], rtol=1e-9)
+            np.testing.assert_allclose(bounds, expected[1], rtol=1e-9)
+
+    def test_single_row_without_mapped_forest(self):
+        path = os.path.join(self.directory, "no_sidecar.pkl")
+        save(self.model, path)
+        os.remove(compact_path(path))
+        self.assertIsNone(mapped_forest(path))
+        record = self.data.iloc[5].to_dict()
+        expected = result(path=self.model_path, **record).predict_with_interval(quantiles=(0.5,))
+        got = result(path=path, **record).predict_with_interval(quantiles=(0.5,))
+        np.testing.assert_allclose(got[0], expected[0], rtol=1e-9)
+        np.testing.assert_allclose(got[1], expected[1], rtol=1e-9)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            predict_with_interval(self.data, path=self.model_path, quantiles=(0.1, 1.5))
+        with self.assertRaises(ValueError):
+            predict_with_interval(self.data.drop(columns="bmi"), path=self.model_path)
+        with self.assertRaises(ValueError):
+            predict_with_interval([], path=self.model_path, quantiles=[[0.5]])
+        with self.assertRaises(FileNotFoundError):
+            result(path=os.path.join(self.directory, "missing.pkl"), **self.data.iloc[0].to_dict()).predict_with_interval()
+        with self.assertRaises(FileNotFoundError):
+            predict_with_interval(self.data, path=os.path.join(self.directory, "missing.pkl"))
+        mean, bounds = predict_with_interval([], path=self.model_path)
+        self.assertEqual((mean.shape, bounds.shape), ((0,), (0, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
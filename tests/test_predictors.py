@@ -0,0 +1,120 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from Car_Insurance.predictor import CarPredictor
+from Car_Insurance.training import CarInsurance
+from Health_Insurance.predictor import HealthPredictor
+from Health_Insurance.result import predict_batch
+from Health_Insurance.training import Training, save
+from Home_Insurance.Premium_calculator import ModelFileNotFoundError, Predict
+from Home_Insurance.predictor import HomePredictor
+
+HOME_FEATURES = ["Claim_3_Years", "Owner_Employment_Status", "Accidental_Damage", "Owner_Sex", "Alarm_Present",
+                 "Locks_Present", "Bedrooms", "Flooding", "Safe_Installed", "YearBuilt"]
+
+
+class TestPredictors(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.home_model = os.path.join(cls.directory, "home.pkl")
+        cls.home_features = os.path.join(cls.directory, "features.pkl")
+        cls.health_model = os.path.join(cls.directory, "forest.pkl")
+
+        rng = np.random.default_rng(0)
+        X = rng.integers(0, 2, (50, len(HOME_FEATURES))).astype(float)
+        X[:, 6] = rng.integers(1, 6, 50)
+        X[:, 9] = rng.integers(1900, 2020, 50)
+        home = LinearRegression().fit(pd.DataFrame(X, columns=HOME_FEATURES), rng.normal(200, 20, 50))
+        with open(cls.home_model, "wb") as f:
+            pickle.dump(home, f)
+        with open(cls.home_features, "wb") as f:
+            pickle.dump(HOME_FEATURES, f)
+        model, _, _ = Training(n=10, split=0.2)
+        save(model, cls.health_model)
+
+        cls.homes = pd.DataFrame({
+            col: rng.choice(["YES", "no", " Yes", "maybe"], 200) for col in HOME_FEATURES
+        })
+        cls.homes["Owner_Sex"] = rng.choice(["M", "f", "x"], 200)
+        cls.homes["Bedrooms"] = rng.integers(1, 6, 200)
+        cls.homes["YearBuilt"] = rng.integers(1900, 2020, 200).astype(float)
+        cls.people = pd.read_csv("Health_Insurance/insurance_data.csv").drop(columns="charges")
+        cls.cars = pd.DataFrame({
+            "age": rng.integers(16, 70, 500), "annual_km": rng.integers(0, 30000, 500),
+            "car_age": rng.integers(0, 40, 500), "exp_years": rng.integers(0, 45, 500),
+            "num_accidents": rng.integers(0, 7, 500),
+            "vehicle_type": rng.choice(["sedan", "SUV", "sports", "truck", "van"], 500),
+        })
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_car_matches_car_insurance(self):
+        predictor = CarPredictor()
+        expected = CarInsurance().final_premium_batch(self.cars)
+        self.assertTrue(np.array_equal(predictor.predict_batch(self.cars), expected))
+        self.assertTrue(np.array_equal(predictor.predict_batch(self.cars.to_dict("records")), expected))
+        record = self.cars.iloc[3].to_dict()
+        record = {k: v.item() if hasattr(v, "item") else v for k, v in record.items()}
+        self.assertEqual(predictor.predict_one(record), expected[3])
+
+    def test_home_matches_predict(self):
+        predictor = HomePredictor.load(self.home_model, self.home_features)
+        reference = Predict(self.home_model, self.home_features)
+        expected = reference.predict_batch(self.homes)
+        self.assertTrue(np.array_equal(predictor.predict_batch(self.homes), expected))
+        self.assertTrue(np.array_equal(predictor.predict_batch(self.homes.to_dict("records")), expected))
+        record = self.homes.iloc[0].to_dict()
+        self.assertEqual(predictor.predict_one(record), reference.predict_price(record))
+        with self.assertRaises(ModelFileNotFoundError):
+            HomePredictor.load(os.path.join(self.directory, "missing.pkl"), self.home_features)
+
+    def test_health_matches_predict_batch(self):
+        predictor = HealthPredictor.load(self.health_model)
+        self.assertIs(HealthPredictor.load(self.health_model), predictor)
+        expected = predict_batch(self.people, self.health_model)
+        self.assertTrue(np.array_equal(predictor.predict_batch(self.people, chunk_size=300), expected))
+        self.assertAlmostEqual(predictor.predict_one(self.people.iloc[5].to_dict()), expected[5], places=6)
+
+    def test_immutable(self):
+        predictors = [CarPredictor(), HomePredictor.load(self.home_model, self.home_features),
+                      HealthPredictor.load(self.health_model)]
+        for predictor in predictors:
+            with self.assertRaises(AttributeError):
+                predictor.cache = {}
+        with self.assertRaises(ValueError):
+            predictors[1].coef[0] = 0.0
+        with self.assertRaises(ValueError):
+            predictors[2].compiled.threshold[0] = 0.0
+
+    def test_shared_between_threads(self):
+        cases = [
+            (CarPredictor(), self.cars),
+            (HomePredictor.load(self.home_model, self.home_features), self.homes),
+            (HealthPredictor.load(self.health_model), self.people),
+        ]
+        for predictor, rows in cases:
+            expected = predictor.predict_batch(rows)
+            slices = [rows.iloc[i:i + 50].reset_index(drop=True) for i in range(0, len(rows), 50)]
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(predictor.predict_batch, slices * 3))
+            self.assertTrue(np.array_equal(np.concatenate(results[:len(slices)]), expected))
+            for i, result in enumerate(results):
+                self.assertTrue(np.array_equal(result, results[i % len(slices)]))
+
+
+if __name__ == "__main__":
+    unittest.main()
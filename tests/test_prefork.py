@@ -0,0 +1,59 @@
+import unittest
+import asyncio
+import os
+import sys
+
+from Car_Insurance.training import CarInsurance
+from Insurance_Core.prefork import PreforkServer, memory_report, smaps_rollup
+from benchmarks.load_test import SAMPLES, request
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "pre-fork mode needs os.fork and /proc")
+class TestPreforkServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.server = PreforkServer(workers=2, port=0)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        cls.server.stop()
+
+    def quote(self):
+        async def run():
+            reader, writer = await asyncio.open_connection(self.server.host, self.server.port)
+            try:
+                return await request(reader, writer, self.server.host, "POST", "/quote/car", SAMPLES["car"])
+            finally:
+                writer.close()
+
+        return asyncio.run(run())
+
+    def test_workers_serve_on_the_shared_socket(self):
+        self.assertEqual(len(self.server.pids), 2)
+        for _ in range(4):
+            status, body = self.quote()
+            self.assertEqual(status, 200)
+            self.assertEqual(body["premium"], CarInsurance().final_premium(**SAMPLES["car"]))
+
+    def test_memory_report(self):
+        report = self.server.memory()
+
+        self.assertEqual([r["pid"] for r in report], [os.getpid()] + self.server.pids)
+        for worker in report[1:]:
+            self.assertGreater(worker["rss_kb"], 0)
+            # the interpreter, the imported libraries and the models are inherited from the parent
+            self.assertGreater(worker["shared_kb"], worker["private_kb"])
+            self.assertLessEqual(worker["pss_kb"], worker["rss_kb"])
+
+    def test_smaps_rollup_fields(self):
+        fields = smaps_rollup()
+        self.assertIn("Rss", fields)
+        self.assertEqual(memory_report([os.getpid()])[0]["pid"], os.getpid())
+
+    def test_only_listens_on_localhost(self):
+        with self.assertRaises(ValueError):
+            PreforkServer(host="0.0.0.0")
@@ -0,0 +1,76 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from Car_Insurance.training import CarInsurance
+from Car_Insurance.rate_cube import load_rate_cube, read_header, tables_checksum, RateCube
+from Car_Insurance.exceptions import InvalidInputError
+
+
+class TestRateCube(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Building rate cube...")
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, "rate_cube.bin")
+        cls.cube = load_rate_cube(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Removing rate cube...")
+        del cls.cube
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        self.model = CarInsurance()
+        rng = np.random.default_rng(3)
+        n = 3000
+        self.columns = [
+            rng.integers(15, 70, n),
+            rng.integers(8000, 28000, n),
+            rng.integers(0, 38, n),
+            rng.integers(0, 43, n),
+            rng.integers(0, 7, n),
+        ]
+        self.vehicle_types = rng.choice(["sedan", "SUV", "sports", "truck", "van"], n).astype(object)
+
+    def test_quote_matches_final_premium(self):
+        for i in range(0, 3000, 7):
+            args = [int(c[i]) for c in self.columns] + [self.vehicle_types[i]]
+            self.assertEqual(self.cube.quote(*args), self.model.final_premium(*args))
+        self.assertEqual(self.cube.quote(25.0, 15000, 4, 5, 1, "sedan"), self.model.final_premium(25, 15000, 4, 5, 1, "sedan"))
+        self.assertEqual(self.cube.quote(25.5, 15000, 4, 5, 1, None), self.model.final_premium(25.5, 15000, 4, 5, 1, None))
+        with self.assertRaises(InvalidInputError):
+            self.cube.quote(-3, 15000, 4, 5, 1, "sedan")
+
+    def test_quote_batch_matches_final_premium_batch(self):
+        premiums = self.cube.quote_batch(*self.columns, self.vehicle_types)
+        expected = self.model.final_premium_batch(*self.columns, self.vehicle_types)
+
+        self.assertTrue(np.array_equal(premiums, expected))
+        with self.assertRaises(InvalidInputError) as ctx:
+            self.cube.quote_batch([25, 30, 99], [15000] * 3, [4, 4, -1], [5] * 3, [1] * 3, ["sedan"] * 3)
+        self.assertListEqual(list(ctx.exception.rows), [2])
+
+    def test_header_and_memmap(self):
+        header, offset = read_header(self.path)
+
+        self.assertEqual(header["checksum"], tables_checksum())
+        self.assertEqual(header["shape"], [4, 48, 15, 36, 41, 6])
+        self.assertEqual(offset % 4096, 0)
+        self.assertIsInstance(self.cube.cents, np.memmap)
+
+    def test_rebuilt_when_base_cost_changes(self):
+        self.assertNotEqual(tables_checksum(500.0), tables_checksum())
+        path = os.path.join(self.directory, "other_cube.bin")
+        shutil.copyfile(self.path, path)
+
+        with self.assertRaises(InvalidInputError):
+            load_rate_cube(path, base_cost=500.0, rebuild=False)
+        cube = load_rate_cube(path, base_cost=500.0)
+        self.assertEqual(read_header(path)[0]["checksum"], tables_checksum(500.0))
+        self.assertEqual(cube.quote(25, 15000, 4, 5, 1, "suv"), CarInsurance(500.0).final_premium(25, 15000, 4, 5, 1, "suv"))
+        self.assertIsInstance(RateCube(path), RateCube)
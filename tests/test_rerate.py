@@ -0,0 +1,120 @@
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from Car_Insurance.training import CarInsurance
+from Insurance_Core.rerate import price_chunk, rerate
+
+
+class TestRerate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        rng = np.random.default_rng(1)
+        n = 250
+        cls.book = pd.DataFrame({
+            "age": rng.integers(18, 66, n),
+            "annual_km": rng.integers(10, 26, n) * 1000,
+            "car_age": rng.integers(0, 30, n),
+            "exp_years": rng.integers(0, 40, n),
+            "num_accidents": rng.integers(0, 5, n),
+            "vehicle_type": rng.choice(["sedan", "suv", "sports", "truck"], n),
+        })
+        cls.book.loc[7, "age"] = -1
+        cls.book_path = os.path.join(cls.directory, "book.csv")
+        cls.book.to_csv(cls.book_path, index=False)
+
+        cls.model_path = os.path.join(cls.directory, "home.pkl")
+        cls.feature_path = os.path.join(cls.directory, "features.pkl")
+        with open(cls.model_path, "wb") as f:
+            pickle.dump(LinearRegression().fit([[0.0], [1.0], [2.0]], [100.0, 150.0, 200.0]), f)
+        with open(cls.feature_path, "wb") as f:
+            pickle.dump(["Bedrooms"], f)
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def read(self, output):
+        parts = sorted(p for p in os.listdir(output) if p.startswith("part-"))
+        return pd.concat([pd.read_csv(os.path.join(output, p)) for p in parts], ignore_index=True)
+
+    def test_car_book_matches_scalar_pricing(self):
+        output = os.path.join(self.directory, "car")
+        totals = rerate(self.book_path, output, "car", chunksize=60, workers=2)
+
+        self.assertEqual(totals["rows"], 250)
+        self.assertEqual(totals["failed"], 1)
+        self.assertEqual(len(totals["partitions"]), 5)
+        result = self.read(output)
+        model = CarInsurance()
+        for i in [0, 6, 8, 249]:
+            row = self.book.iloc[i]
+            expected = model.final_premium(int(row.age), int(row.annual_km), int(row.car_age), int(row.exp_years),
+                                           int(row.num_accidents), row.vehicle_type)
+            self.assertEqual(result.premium[i], expected)
+        self.assertTrue(np.isnan(result.premium[7]))
+        self.assertIn("Cannot compute risk", result.error[7])
+
+    def test_resume_skips_finished_partitions(self):
+        output = os.path.join(self.directory, "resume")
+        rerate(self.book_path, output, "car", chunksize=100, workers=1)
+        os.remove(os.path.join(output, "part-00001.csv"))
+
+        totals = rerate(self.book_path, output, "car", chunksize=100, workers=1)
+        self.assertEqual(totals["skipped"], 2)
+        self.assertEqual(totals["rows"], 100)
+        self.assertEqual(len(self.read(output)), 250)
+
+        # other settings invalidate the old partitions
+        totals = rerate(self.book_path, output, "car", chunksize=125, workers=1)
+        self.assertEqual((totals["skipped"], totals["rows"]), (0, 250))
+        self.assertEqual(len(totals["partitions"]), 2)
+
+    def test_retrained_model_invalidates_resume(self):
+        book_path = os.path.join(self.directory, "home_book.csv")
+        pd.DataFrame({"Bedrooms": np.arange(200) % 5}).to_csv(book_path, index=False)
+        model_path = os.path.join(self.directory, "retrained.pkl")
+        with open(model_path, "wb") as f:
+            pickle.dump(LinearRegression().fit([[0.0], [1.0], [2.0]], [100.0, 150.0, 200.0]), f)
+        models = {"home": (model_path, self.feature_path)}
+        output = os.path.join(self.directory, "retrained")
+        rerate(book_path, output, "home", chunksize=100, workers=1, models=models)
+        os.remove(os.path.join(output, "part-00001.csv"))
+
+        # same size, only the mtime tells the new model apart
+        before = os.stat(model_path).st_mtime_ns
+        with open(model_path, "wb") as f:
+            pickle.dump(LinearRegression().fit([[0.0], [1.0], [2.0]], [300.0, 350.0, 400.0]), f)
+        os.utime(model_path, ns=(before + 10**9, before + 10**9))
+
+        totals = rerate(book_path, output, "home", chunksize=100, workers=1, models=models)
+        self.assertEqual((totals["skipped"], totals["rows"]), (0, 200))
+        np.testing.assert_allclose(self.read(output).premium, 300.0 + 50.0 * (np.arange(200) % 5))
+
+    def test_mixed_products_in_one_chunk(self):
+        chunk = pd.DataFrame({
+            "product": ["car", "home", "boat"],
+            "age": [30, None, None],
+            "annual_km": [15000, None, None],
+            "car_age": [5, None, None],
+            "exp_years": [10, None, None],
+            "num_accidents": [0, None, None],
+            "vehicle_type": ["suv", None, None],
+            "Bedrooms": [None, 3, None],
+        })
+        priced = price_chunk(chunk, models={"home": (self.model_path, self.feature_path)})
+
+        self.assertEqual(priced.premium[0], CarInsurance().final_premium(30, 15000, 5, 10, 0, "suv"))
+        self.assertAlmostEqual(priced.premium[1], 250.0)
+        self.assertTrue(np.isnan(priced.premium[2]))
+        self.assertEqual(list(priced.error), ["", "", "Unknown product 'boat'"])
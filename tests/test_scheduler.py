@@ -0,0 +1,133 @@
+import unittest
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from Health_Insurance.compact import mapped_forest
+from Insurance_Core.registry import ModelRegistry, registry
+from Insurance_Core.scheduler import RetrainScheduler, read_manifest
+from Home_Insurance.Premium_calculator import Predict
+
+
+class TestRetrainScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.csv_path = os.path.join(cls.directory, "home.csv")
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            "Owner_Sex": rng.choice(["M", "F"], 50),
+            "Bedrooms": rng.integers(1, 6, 50),
+        })
+        df["Annual_Premium_Price"] = 100 + 25 * df["Bedrooms"]
+        df.to_csv(cls.csv_path, index=False)
+
+        cls.model_path = os.path.join(cls.directory, "model.pkl")
+        cls.feature_path = os.path.join(cls.directory, "features.pkl")
+        cls.manifest_path = os.path.join(cls.directory, "manifest.json")
+        cls.scheduler = RetrainScheduler(
+            cls.manifest_path,
+            options={"home": {"csv": cls.csv_path}},
+            artifacts={"home": [cls.feature_path, cls.model_path], "car": [os.path.join(cls.directory, "cube.bin")]},
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        cls.scheduler.shutdown()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def leftovers(self):
+        return [name for name in os.listdir(self.directory) if name.endswith(".tmp")]
+
+    def test_fits_in_background_and_swaps_in(self):
+        # an old model keeps serving until the new one is published
+        with open(self.model_path, "wb") as f:
+            pickle.dump("old model", f)
+        registry = ModelRegistry()
+        self.assertEqual(registry.get(self.model_path), "old model")
+
+        entry = self.scheduler.submit("home").result(timeout=120)
+
+        self.assertEqual(set(entry["artifacts"]), {self.model_path, self.feature_path})
+        predictor = Predict(self.model_path, self.feature_path)
+        self.assertAlmostEqual(predictor.predict_price({"Owner_Sex": "M", "Bedrooms": 3}), 175.0, places=2)
+        self.assertEqual(registry.get(self.model_path).coef_.shape, (2,))
+        self.assertEqual(self.leftovers(), [])
+
+        version = read_manifest(self.manifest_path)["home"]["version"]
+        self.scheduler.submit("car")
+        self.scheduler.submit("home")
+        self.scheduler.wait()
+        manifest = read_manifest(self.manifest_path)
+        self.assertEqual(manifest["home"]["version"], version + 1)
+        self.assertEqual(manifest["car"]["version"], 1)
+
+    def test_failed_fit_keeps_previous_artifacts(self):
+        broken = RetrainScheduler(
+            self.manifest_path,
+            options={"home": {"csv": os.path.join(self.directory, "missing.csv")}},
+            artifacts={"home": [self.feature_path, self.model_path]},
+        )
+        with open(self.model_path, "wb") as f:
+            pickle.dump("previous", f)
+        try:
+            with self.assertRaises(FileNotFoundError):
+                broken.submit("home").result(timeout=120)
+        finally:
+            broken.shutdown()
+
+        with open(self.model_path, "rb") as f:
+            self.assertEqual(pickle.load(f), "previous")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_failed_fit_is_reported_and_not_resubmitted(self):
+        missing = [os.path.join(self.directory, "missing_features.pkl"), os.path.join(self.directory, "missing.pkl")]
+        broken = RetrainScheduler(
+            self.manifest_path,
+            options={"home": {"csv": os.path.join(self.directory, "missing.csv")}},
+            artifacts={"home": missing},
+        )
+        try:
+            with self.assertLogs("Insurance_Core.scheduler", level="ERROR"):
+                self.assertEqual(broken.ensure(["home"]), ["home"])
+                with self.assertRaises(FileNotFoundError):
+                    broken.wait(["home"])
+            self.assertIsInstance(broken.last_error("home"), FileNotFoundError)
+            failed = broken._pending["home"]
+            self.assertEqual(broken.ensure(["home"]), [])
+            self.assertIs(broken._pending["home"], failed)
+
+            # an explicit submit retries, and a published fit clears the error
+            broken.options["home"] = {"csv": self.csv_path}
+            broken.submit("home").result(timeout=120)
+            self.assertIsNone(broken.last_error("home"))
+        finally:
+            broken.shutdown()
+        self.assertEqual(self.leftovers(), [])
+
+    def test_health_publishes_compact_forest(self):
+        pickle_path = os.path.join(self.directory, "forest.pkl")
+        compact = os.path.join(self.directory, "forest.npz")
+        scheduler = RetrainScheduler(self.manifest_path, options={"health": {"trees": 5, "cache": False}},
+                                     artifacts={"health": [pickle_path, compact]})
+        try:
+            for _ in range(2):
+                entry = scheduler.submit("health").result(timeout=300)
+                self.assertEqual(set(entry["artifacts"]), {pickle_path, compact})
+                self.assertIsNotNone(mapped_forest(pickle_path))
+        finally:
+            scheduler.shutdown()
+            registry.invalidate()
+        self.assertEqual(self.leftovers(), [])
+        self.assertEqual(sorted(n for n in os.listdir(self.directory) if n.startswith(".")), [])
+
+    def test_rejects_unknown_product(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.submit("boat")
@@ -0,0 +1,156 @@
+import unittest
+import asyncio
+import functools
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from Car_Insurance.training import CarInsurance
+from Insurance_Core.service import MicroBatcher, QuoteService, quote_car, quote_home
+from benchmarks.load_test import SAMPLES, request
+
+
+class TestQuoteService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        print("Setting up class resources...")
+        cls.directory = tempfile.mkdtemp()
+        cls.model_path = os.path.join(cls.directory, "model.pkl")
+        cls.feature_path = os.path.join(cls.directory, "features.pkl")
+        model = LinearRegression().fit(np.array([[0.0, 1.0], [1.0, 2.0], [0.0, 3.0]]), [10.0, 25.0, 30.0])
+        with open(cls.model_path, "wb") as f:
+            pickle.dump(model, f)
+        with open(cls.feature_path, "wb") as f:
+            pickle.dump(["Owner_Sex", "Bedrooms"], f)
+        cls.home = model
+
+    @classmethod
+    def tearDownClass(cls):
+        print("Cleaning up class resources...")
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def serve(self, scenario, **kwargs):
+        """ Runs `scenario(call)` against a fresh service, call(method, path, payload) -> (status, body). """
+        quoters = {
+            "car": quote_car,
+            "home": functools.partial(quote_home, model_path=self.model_path, feature_path=self.feature_path),
+        }
+
+        async def run():
+            service = await QuoteService(port=0, quoters=quoters, **kwargs).start()
+            connections = []
+
+            async def call(method, path, payload=None):
+                reader, writer = await asyncio.open_connection(service.host, service.port)
+                connections.append(writer)
+                return await request(reader, writer, service.host, method, path, payload)
+
+            try:
+                return await scenario(call, service)
+            finally:
+                for writer in connections:
+                    writer.close()
+                await service.close()
+
+        return asyncio.run(run())
+
+    def test_car_and_home_quotes(self):
+        async def scenario(call, service):
+            return await call("POST", "/quote/car", SAMPLES["car"]), \
+                await call("POST", "/quote/home", {"Owner_Sex": "M", "Bedrooms": 2})
+
+        (car_status, car), (home_status, home) = self.serve(scenario)
+
+        self.assertEqual(car_status, 200)
+        self.assertEqual(car["premium"], CarInsurance().final_premium(**SAMPLES["car"]))
+        self.assertEqual(home_status, 200)
+        self.assertAlmostEqual(home["premium"], round(float(self.home.predict([[1.0, 2.0]])[0]), 2))
+
+    def test_concurrent_requests_are_batched_and_bad_rows_fail_alone(self):
+        bad = dict(SAMPLES["car"], age="old")
+
+        async def scenario(call, service):
+            payloads = [dict(SAMPLES["car"], age=20 + i) for i in range(20)] + [bad]
+            responses = await asyncio.gather(*(call("POST", "/quote/car", p) for p in payloads))
+            return responses, service.batchers["car"].stats()
+
+        responses, stats = self.serve(scenario, max_delay=0.05)
+
+        model = CarInsurance()
+        for i, (status, body) in enumerate(responses[:-1]):
+            self.assertEqual(status, 200)
+            self.assertEqual(body["premium"], model.final_premium(**dict(SAMPLES["car"], age=20 + i)))
+        self.assertEqual(responses[-1][0], 400)
+        self.assertLess(stats["batches"], 21)
+        self.assertEqual(stats["records"], 21)
+
+    def test_null_field_fails_in_a_batch_too(self):
+        async def scenario(call, service):
+            payloads = [dict(SAMPLES["car"], age=None), SAMPLES["car"]]
+            responses = await asyncio.gather(*(call("POST", "/quote/car", p) for p in payloads))
+            return responses + [await call("POST", "/quote/car", dict(SAMPLES["car"], age=None))], \
+                service.batchers["car"].stats()
+
+        (null_age, ok, alone), stats = self.serve(scenario, max_delay=0.05)
+
+        self.assertEqual(ok, (200, {"premium": CarInsurance().final_premium(**SAMPLES["car"])}))
+        self.assertEqual(null_age[0], 400)
+        self.assertEqual(null_age, alone)
+        self.assertEqual(stats["batches"], 2)
+
+    def test_list_body_and_errors(self):
+        async def scenario(call, service):
+            return [
+                await call("POST", "/quote/car", [SAMPLES["car"], dict(SAMPLES["car"], vehicle_type="truck")]),
+                await call("POST", "/quote/boat", {}),
+                await call("GET", "/quote/car"),
+                await call("POST", "/quote/car", "not a record"),
+                await call("GET", "/stats"),
+            ]
+
+        (ok, quotes), (missing, _), (method, _), (bad, _), (stats_status, stats) = self.serve(scenario)
+
+        self.assertEqual(ok, 200)
+        self.assertEqual(len(quotes["premiums"]), 2)
+        self.assertEqual((missing, method, bad, stats_status), (404, 405, 400, 200))
+        self.assertEqual(stats["car"]["records"], 2)
+
+    def test_invalid_content_length(self):
+        async def scenario(call, service):
+            statuses = []
+            for length in ("abc", "-5"):
+                reader, writer = await asyncio.open_connection(service.host, service.port)
+                writer.write(f"POST /quote/car HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+                await writer.drain()
+                statuses.append(int((await reader.readline()).split()[1]))
+                writer.close()
+            return statuses
+
+        self.assertEqual(self.serve(scenario), [400, 400])
+
+    def test_only_listens_on_localhost(self):
+        with self.assertRaises(ValueError):
+            QuoteService(host="0.0.0.0")
+
+    def test_micro_batcher_flushes_at_max_batch(self):
+        sizes = []
+
+        def fn(records):
+            sizes.append(len(records))
+            return [r * 2 for r in records]
+
+        async def run():
+            batcher = MicroBatcher(fn, max_batch=4, max_delay=0.05)
+            try:
+                return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+            finally:
+                await batcher.close()
+
+        self.assertEqual(asyncio.run(run()), [i * 2 for i in range(10)])
+        self.assertTrue(all(size <= 4 for size in sizes))
+        self.assertEqual(sum(sizes), 10)
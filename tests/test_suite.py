@@ -1,30 +1,75 @@
 
 import unittest
 
-from .test_car_insurance import TestCarInsurance
+from .test_car_insurance import TestCarInsurance, TestCarInsuranceBatch, TestRatingTable
+from .test_rate_cube import TestRateCube
 from .testHelper import TestHelper
 
 from .test_preprocessing import TestPreprocess
 from .test_health_training import TestTraining
-from .test_health_result import TestResult
+from .test_health_result import TestResult, TestPredictBatch
+from .test_import_time import TestImportTime
+from .test_compiled_forest import TestCompiledForest
 
 
-from .test_home_insurance import TestHomePredict
-from .test_home_insurance2 import TestHomeData
+from .test_home_insurance import TestHomePredict, TestHomeLinearScorer
+from .test_home_insurance2 import TestHomeData, TestHomeStreaming
+from .test_model_registry import TestModelRegistry
+from .test_threads import TestThreadBudgets
+from .test_scheduler import TestRetrainScheduler
+from .test_service import TestQuoteService
+from .test_prefork import TestPreforkServer
+from .test_rerate import TestRerate
+from .test_benchmark_suite import TestBenchmarkSuite
+from .test_metrics import TestMetrics
+from .test_export_runtime import TestExportRuntime
+from .test_predictors import TestPredictors
+from .test_datasets import TestDatasets
+from .test_fit_cache import TestFitCache
+from .test_incremental_training import TestIncrementalTraining
+from .test_autotune import TestAutotune
+from .test_compact import TestCompactForest
+from .test_mmap_loading import TestMmapLoading
+from .test_prediction_interval import TestPredictionInterval
 
 def suite():
     loader = unittest.defaultTestLoader
     test_suite = unittest.TestSuite()
     
     test_suite.addTests(loader.loadTestsFromTestCase(TestCarInsurance))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCarInsuranceBatch))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestRatingTable))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestRateCube))
     test_suite.addTests(loader.loadTestsFromTestCase(TestHelper))
     
     test_suite.addTests(loader.loadTestsFromTestCase(TestPreprocess))
     test_suite.addTests(loader.loadTestsFromTestCase(TestTraining))
     test_suite.addTests(loader.loadTestsFromTestCase(TestResult))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPredictBatch))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestImportTime))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCompiledForest))
 	
     test_suite.addTests(loader.loadTestsFromTestCase(TestHomePredict))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestHomeLinearScorer))
     test_suite.addTests(loader.loadTestsFromTestCase(TestHomeData))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestHomeStreaming))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestModelRegistry))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestThreadBudgets))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestRetrainScheduler))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestQuoteService))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPreforkServer))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestRerate))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBenchmarkSuite))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestMetrics))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestExportRuntime))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPredictors))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestDatasets))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestFitCache))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestIncrementalTraining))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestAutotune))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCompactForest))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestMmapLoading))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestPredictionInterval))
 
     return test_suite
 
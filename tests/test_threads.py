@@ -0,0 +1,61 @@
+import unittest
+import os
+import threading
+import time
+from unittest import mock
+
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from Insurance_Core import threads
+from Insurance_Core.threads import ThreadCap, set_serving_budget, serving_jobs, training_jobs, model_jobs
+
+
+class TestThreadBudgets(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Pipeline(steps=[("scale", StandardScaler()), ("rf", RandomForestRegressor(n_jobs=-1))])
+
+    def test_serving_budget_resets_pickled_n_jobs(self):
+        with mock.patch.dict(os.environ, {threads.SERVE_JOBS_ENV: ""}):
+            set_serving_budget(self.model)
+
+        self.assertEqual(self.model.named_steps["rf"].n_jobs, 1)
+        self.assertEqual(model_jobs(self.model), 1)
+        set_serving_budget(self.model, n_jobs=10 ** 6)
+        self.assertEqual(self.model.named_steps["rf"].n_jobs, threads.thread_cap.capacity)
+
+    def test_environment_overrides(self):
+        with mock.patch.dict(os.environ, {threads.SERVE_JOBS_ENV: "1", threads.TRAIN_JOBS_ENV: "3"}):
+            self.assertEqual(serving_jobs(), 1)
+            self.assertEqual(training_jobs(), 3)
+            self.assertEqual(training_jobs(2), 2)
+        with mock.patch.dict(os.environ, {threads.TRAIN_JOBS_ENV: "many"}):
+            with self.assertRaises(ValueError):
+                training_jobs()
+
+    def test_cap_is_shared(self):
+        cap = ThreadCap(2)
+        peak = []
+
+        def work():
+            with cap.reserve(1):
+                peak.append(cap.in_use())
+                time.sleep(0.02)
+
+        workers = [threading.Thread(target=work) for _ in range(6)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+
+        self.assertEqual(len(peak), 6)
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(cap.in_use(), 0)
+        with cap.reserve(99) as granted:
+            self.assertEqual(granted, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()